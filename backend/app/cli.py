@@ -0,0 +1,169 @@
+"""Command-line bulk parser for backfilling invoice archives without the HTTP API.
+
+Run from `backend/`:
+
+    python -m app.cli archive/ exports.jsonl dump.txt -o parsed.ndjson --checkpoint parsed.ckpt
+
+Inputs may be directories (`--glob` files, one document each), JSONL files
+(`--text-field`, optional `--id-field`) or concatenated text files split on
+`--separator`. Throughput is reported on stderr. Re-running the same command
+after an interruption resumes from the checkpoint.
+"""
+
+from __future__ import annotations
+
+import argparse
+import codecs
+import os
+import sys
+from typing import IO
+
+from app.parser.extractor import ExtractionLimits, configure_extraction_limits
+from app.services.bulk import (
+    CHECKPOINT_VERSION,
+    CSV_HEADERS,
+    INPUT_FORMATS,
+    OUTPUT_FORMATS,
+    BulkOptions,
+    BulkStats,
+    Progress,
+    iter_documents,
+    load_checkpoint,
+    run_bulk,
+    run_fingerprint,
+    save_checkpoint,
+)
+
+
+DEFAULT_LIMITS = ExtractionLimits()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__.split("\n\n")[0])
+    parser.add_argument("inputs", nargs="+", help="directories, .jsonl files or concatenated text files")
+    parser.add_argument("--input-format", choices=INPUT_FORMATS, default="auto")
+    parser.add_argument("--glob", default="*.txt", help="file pattern inside directories")
+    parser.add_argument("--separator", default=r"\f", help=r"document separator in text files (escapes allowed)")
+    parser.add_argument("--text-field", default="content", help="JSONL field holding the invoice text")
+    parser.add_argument("--id-field", default=None, help="JSONL field used as the document id")
+    parser.add_argument("-o", "--output", default="-", help="output file, `-` for stdout")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="ndjson")
+    parser.add_argument("--unordered", action="store_true", help="write documents as they finish")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="0 or 1 parses inline")
+    parser.add_argument("--chunk-size", type=int, default=256, help="documents per worker task")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file; requires --output")
+    parser.add_argument(
+        "--flush-seconds", type=float, default=10.0, help="flush, checkpoint and report throughput this often"
+    )
+    parser.add_argument("--max-line-chars", type=int, default=DEFAULT_LIMITS.max_line_chars)
+    parser.add_argument("--max-line-run", type=int, default=DEFAULT_LIMITS.max_line_run)
+    # The CPU budget depends on load, so it is off by default: resumed and repeated runs
+    # then write the same output. The line gate still bounds the cost of each line.
+    parser.add_argument("--document-budget-ms", type=int, default=0, help="per-document CPU budget, 0 = none")
+    return parser
+
+
+def _open_output(path: str, offset: int, header: bytes) -> IO[bytes]:
+    """Open the output for writing from `offset`, discarding anything written after the checkpoint."""
+    if path == "-":
+        sys.stdout.buffer.write(header)
+        return sys.stdout.buffer
+    if offset == 0:
+        output = open(path, "wb")
+        output.write(header)
+        return output
+    output = open(path, "r+b")
+    output.seek(0, os.SEEK_END)
+    if output.tell() < offset:
+        output.close()
+        raise SystemExit(f"{path} is shorter than its checkpoint ({offset} bytes); delete the checkpoint.")
+    output.truncate(offset)
+    output.seek(offset)
+    return output
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.checkpoint and args.output == "-":
+        raise SystemExit("--checkpoint needs --output: stdout cannot be resumed.")
+    separator = codecs.decode(args.separator, "unicode_escape")
+    configure_extraction_limits(
+        ExtractionLimits(
+            max_line_chars=args.max_line_chars,
+            max_line_run=args.max_line_run,
+            document_budget=args.document_budget_ms / 1000,
+        )
+    )
+    options = BulkOptions(output_format=args.format, text_field=args.text_field, id_field=args.id_field)
+    fingerprint = run_fingerprint(
+        args.inputs,
+        pattern=args.glob,
+        input_format=args.input_format,
+        separator=separator,
+        options=list(options),
+        limits=[args.max_line_chars, args.max_line_run, args.document_budget_ms],
+    )
+
+    state = None
+    if args.checkpoint:
+        try:
+            state = load_checkpoint(args.checkpoint, fingerprint)
+        except ValueError as exc:
+            raise SystemExit(str(exc)) from exc
+    state = state or {
+        "output_offset": 0, "watermark": 0, "done": [],
+        "documents": 0, "items": 0, "errors": 0, "truncated": 0, "gated": 0,
+    }
+    progress = Progress(state["watermark"], state["done"])
+    stats = BulkStats(state["documents"], state["items"], state["errors"], state["truncated"], state["gated"])
+    if state["watermark"] or state["done"]:
+        print(f"resuming after {stats.documents} documents", file=sys.stderr)
+
+    header = ",".join(CSV_HEADERS).encode("utf-8") + b"\r\n" if args.format == "csv" else b""
+    output = _open_output(args.output, state["output_offset"], header)
+
+    def on_flush(progress: Progress, stats: BulkStats) -> None:
+        if args.checkpoint:
+            os.fsync(output.fileno())
+            save_checkpoint(
+                args.checkpoint,
+                {
+                    "version": CHECKPOINT_VERSION,
+                    "fingerprint": fingerprint,
+                    "output_offset": output.tell(),
+                    "watermark": progress.watermark,
+                    "done": sorted(progress.done),
+                    "documents": stats.documents,
+                    "items": stats.items,
+                    "errors": stats.errors,
+                    "truncated": stats.truncated,
+                    "gated": stats.gated,
+                },
+            )
+        print(stats.summary(), file=sys.stderr)
+
+    refs = iter_documents(args.inputs, args.input_format, pattern=args.glob, separator=separator)
+    try:
+        run_bulk(
+            refs,
+            output,
+            options,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            ordered=not args.unordered,
+            progress=progress,
+            stats=stats,
+            on_flush=on_flush,
+            flush_seconds=args.flush_seconds,
+        )
+    except KeyboardInterrupt:
+        print("interrupted; re-run the same command to resume", file=sys.stderr)
+        return 130
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
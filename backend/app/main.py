@@ -2,37 +2,261 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import binascii
+import codecs
 import hashlib
+import hmac
 import importlib.util
-import json
-from io import BytesIO
+import os
+import threading
+from collections.abc import Container, Iterator
+from contextlib import asynccontextmanager
+from tempfile import SpooledTemporaryFile
 
-from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi import FastAPI, File, Header, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 
 from app.middleware.payload_limit import PayloadLimitMiddleware
-from app.middleware.rate_limit import FixedWindowRateLimitMiddleware
-from app.parser import extract_items
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.parser import configure_line_cache, get_line_cache
+from app.parser.extractor import (
+    CHUNK_CHARS,
+    TIME_BUDGET_EXCEEDED,
+    BatchExtractor,
+    ExtractionLimits,
+    ItemStream,
+    ParsedLine,
+    configure_extraction_limits,
+)
 from app.schemas import (
     ExportXlsxRequest,
     HealthResponse,
+    JobRequest,
+    JobStatus,
+    MetricsResponse,
     ParseImageResponse,
+    ParseImagesResponse,
     ParseRequest,
     ParseResponse,
-    ParseResult,
-    ParsedItem,
+    ParseSessionPatch,
+    ParseSessionRequest,
+    ParseSessionResponse,
+    ParseStreamTrailer,
+    ParseUploadTrailer,
+    PurgeResponse,
+)
+from app.services.excel import CHUNK_SIZE, SPOOL_MAX_BYTES, XLSX_MEDIA_TYPE, iter_xlsx_chunks
+from app.services.jobs import FAILED, SUCCEEDED, Job, JobKind, JobOutput, JobRunner, SQLiteJobStore
+from app.services.ocr import (
+    OCRInputError,
+    OCRUnavailableError,
+    PREPROCESS_TIMINGS,
+    configure_ocr_engine,
+    configure_preprocessing,
+    count_image_pages,
+    extract_text_from_image_bytes,
+    ocr_settings_key,
+)
+from app.services.ocr_cache import OCRCache, ocr_cache_key
+from app.services.ocr_pool import OCRExecutor, OCRQueueFullError, OCRTimeoutError
+from app.services.parse_cache import ParseCache, parse_cache_key
+from app.services.parse_pool import BatchStats, ParsePool
+from app.services.parse_session import (
+    ParseSession,
+    SessionConflictError,
+    SessionEditError,
+    SessionStore,
+    SessionTooLargeError,
+)
+from app.services.preprocess import PreprocessConfig
+from app.services.rate_limit_store import FileRateLimitStore, MemoryRateLimitStore
+from app.services.request_id import RequestIdHasher
+from app.services.result_store import MemoryResultStore, SQLiteResultStore
+from app.services.serialize import dump_json, result_payload
+from app.services.text_export import (
+    CSV_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    accepts_gzip,
+    gzip_chunks,
+    iter_csv_chunks,
+    iter_ndjson_chunks,
 )
-from app.services.excel import build_xlsx_bytes
-from app.services.ocr import OCRInputError, OCRUnavailableError, extract_text_from_image_bytes
 
 MAX_CHARS_PER_ITEM = 50_000
 MULTIPART_AVAILABLE = importlib.util.find_spec("multipart") is not None
 
-app = FastAPI(title="Smart Invoice Parser", version="1.0.0")
+# Opt-in per-line result cache; 0 disables it.
+LINE_CACHE_SIZE = int(os.getenv("LINE_CACHE_SIZE", "0"))
+# Worker processes for batch parsing; 0 or 1 parses inline on the request thread.
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0"))
+# Inputs per IPC round trip; 0 picks about four chunks per worker.
+PARSE_CHUNK_SIZE = int(os.getenv("PARSE_CHUNK_SIZE", "0"))
+# Extraction limits: lines longer than PARSE_MAX_LINE_CHARS or with a digit/whitespace run
+# longer than PARSE_MAX_LINE_RUN are skipped; CPU budget per input document (0 = none).
+PARSE_MAX_LINE_CHARS = int(os.getenv("PARSE_MAX_LINE_CHARS", "512"))
+PARSE_MAX_LINE_RUN = int(os.getenv("PARSE_MAX_LINE_RUN", "64"))
+PARSE_DOCUMENT_BUDGET_MS = int(os.getenv("PARSE_DOCUMENT_BUDGET_MS", "1000"))
+# Raw-body /parse/upload: byte limit and CPU budget for the whole document (0 = none).
+PARSE_UPLOAD_MAX_BYTES = int(os.getenv("PARSE_UPLOAD_MAX_BYTES", str(64 * 1024 * 1024)))
+PARSE_UPLOAD_BUDGET_MS = int(os.getenv("PARSE_UPLOAD_BUDGET_MS", "30000"))
+# Whole-response /parse cache keyed by inputs + parser fingerprint, bounded by body bytes; 0 disables it.
+PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# OCR runs on its own threads: concurrent jobs, waiting jobs beyond that, per-job timeout.
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "2"))
+OCR_QUEUE_SIZE = int(os.getenv("OCR_QUEUE_SIZE", "8"))
+OCR_TIMEOUT_SECONDS = float(os.getenv("OCR_TIMEOUT_SECONDS", "60"))
+OCR_RETRY_AFTER_SECONDS = int(os.getenv("OCR_RETRY_AFTER_SECONDS", "5"))
+# auto (warm in-process tesserocr when installed), tesserocr or pytesseract.
+OCR_ENGINE = os.getenv("OCR_ENGINE", "auto")
+# Image preprocessing before OCR; binarize and deskew are opt-in.
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "1") == "1"
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "300"))
+OCR_BINARIZE = os.getenv("OCR_BINARIZE", "0") == "1"
+OCR_DESKEW = os.getenv("OCR_DESKEW", "0") == "1"
+# OCR text cache: in-memory entries, optional disk directory and byte limit, TTL (0 = none).
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "256"))
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", "")
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+OCR_CACHE_TTL_SECONDS = float(os.getenv("OCR_CACHE_TTL_SECONDS", "0"))
+# Upload limits for image routes, separate from the 200 KB cap on JSON routes.
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+IMAGE_BATCH_MAX_BYTES = int(os.getenv("IMAGE_BATCH_MAX_BYTES", str(50 * 1024 * 1024)))
+# /parse-images: files and total pages per request, pages OCR'd concurrently per request.
+IMAGE_BATCH_MAX_FILES = int(os.getenv("IMAGE_BATCH_MAX_FILES", "20"))
+IMAGE_BATCH_MAX_PAGES = int(os.getenv("IMAGE_BATCH_MAX_PAGES", "50"))
+IMAGE_BATCH_CONCURRENCY = int(os.getenv("IMAGE_BATCH_CONCURRENCY", "4"))
+# Per-IP token bucket: average rate, burst size (defaults to the per-minute rate) and
+# state store: "memory" (per worker) or "file:<path>" shared by every worker on the host.
+RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", "120"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "0")) or None
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory")
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "1000000"))
+# Parse results kept for GET /export/{request_id}.xlsx: "memory" (per worker) or
+# "sqlite:<path>" shared by every worker on the host; entry cap and TTL (0 = none).
+RESULT_STORE = os.getenv("RESULT_STORE", "memory")
+RESULT_STORE_SIZE = int(os.getenv("RESULT_STORE_SIZE", "256"))
+RESULT_STORE_TTL_SECONDS = float(os.getenv("RESULT_STORE_TTL_SECONDS", "3600"))
+# Memory store: total JSON bytes kept. SQLite store: largest single response kept.
+RESULT_STORE_MAX_BYTES = int(os.getenv("RESULT_STORE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Incremental parse sessions (per worker): session cap, total characters held, idle TTL.
+PARSE_SESSION_MAX = int(os.getenv("PARSE_SESSION_MAX", "1000"))
+PARSE_SESSION_MAX_CHARS = int(os.getenv("PARSE_SESSION_MAX_CHARS", "16000000"))
+PARSE_SESSION_TTL_SECONDS = float(os.getenv("PARSE_SESSION_TTL_SECONDS", "900"))
+# Background jobs (POST /jobs): SQLite file, worker threads, concurrent OCR jobs, lease after
+# which a job left running by a dead process is resumed, retention of finished jobs, body limit.
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_OCR_CONCURRENCY = int(os.getenv("JOB_OCR_CONCURRENCY", "1"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", "86400"))
+JOB_MAX_BYTES = int(os.getenv("JOB_MAX_BYTES", str(100 * 1024 * 1024)))
+# Inputs of a job that share one line memo; a fresh memo per window keeps it bounded.
+JOB_MEMO_INPUTS = 64
+# Shared secret for /admin routes (X-Admin-Token); admin routes are disabled when empty.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+configure_line_cache(LINE_CACHE_SIZE)
+extraction_limits = configure_extraction_limits(
+    ExtractionLimits(
+        max_line_chars=PARSE_MAX_LINE_CHARS,
+        max_line_run=PARSE_MAX_LINE_RUN,
+        document_budget=PARSE_DOCUMENT_BUDGET_MS / 1000,
+    )
+)
+parse_pool = ParsePool(
+    workers=PARSE_WORKERS,
+    chunk_size=PARSE_CHUNK_SIZE,
+    line_cache_size=LINE_CACHE_SIZE,
+    limits=extraction_limits,
+)
+parse_cache = ParseCache(max_bytes=PARSE_CACHE_MAX_BYTES)
+parse_sessions = SessionStore(
+    max_sessions=PARSE_SESSION_MAX,
+    max_chars=PARSE_SESSION_MAX_CHARS,
+    ttl_seconds=PARSE_SESSION_TTL_SECONDS,
+)
+configure_preprocessing(
+    PreprocessConfig(
+        enabled=OCR_PREPROCESS,
+        target_dpi=OCR_TARGET_DPI,
+        binarize=OCR_BINARIZE,
+        deskew=OCR_DESKEW,
+    )
+)
+ocr_engine = configure_ocr_engine(OCR_ENGINE, size=OCR_WORKERS)
+ocr_executor = OCRExecutor(
+    workers=OCR_WORKERS,
+    max_queue=OCR_QUEUE_SIZE,
+    timeout=OCR_TIMEOUT_SECONDS,
+    retry_after=OCR_RETRY_AFTER_SECONDS,
+)
+ocr_cache = OCRCache(
+    memory_entries=OCR_CACHE_SIZE,
+    disk_dir=OCR_CACHE_DIR or None,
+    disk_max_bytes=OCR_CACHE_MAX_BYTES,
+    ttl_seconds=OCR_CACHE_TTL_SECONDS,
+)
+
+if RATE_LIMIT_STORE.startswith("file:"):
+    rate_limit_store = FileRateLimitStore(RATE_LIMIT_STORE[len("file:"):], slots=RATE_LIMIT_MAX_CLIENTS)
+else:
+    rate_limit_store = MemoryRateLimitStore(max_clients=RATE_LIMIT_MAX_CLIENTS)
+
+if RESULT_STORE.startswith("sqlite:"):
+    result_store = SQLiteResultStore(
+        RESULT_STORE[len("sqlite:"):],
+        max_entries=RESULT_STORE_SIZE,
+        ttl_seconds=RESULT_STORE_TTL_SECONDS,
+        max_entry_bytes=RESULT_STORE_MAX_BYTES,
+    )
+else:
+    result_store = MemoryResultStore(
+        max_entries=RESULT_STORE_SIZE, ttl_seconds=RESULT_STORE_TTL_SECONDS, max_bytes=RESULT_STORE_MAX_BYTES
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the OCR engine and resume queued jobs on startup; release workers and OCR resources on shutdown."""
+    if ocr_engine is not None:
+        try:
+            ocr_engine.warm()
+        except OCRUnavailableError:
+            pass
+    if JOB_STORE_PATH:
+        _jobs()[1].start()
+    yield
+    if job_runner is not None:
+        job_runner.shutdown()
+        job_store.close()
+    parse_pool.shutdown()
+    ocr_executor.shutdown()
+    if ocr_engine is not None:
+        ocr_engine.close()
+
 
-app.add_middleware(PayloadLimitMiddleware, max_bytes=200_000)
-app.add_middleware(FixedWindowRateLimitMiddleware, requests_per_minute=120)
+app = FastAPI(title="Smart Invoice Parser", version="1.0.0", lifespan=lifespan)
+
+app.add_middleware(
+    PayloadLimitMiddleware,
+    max_bytes=200_000,
+    route_limits={
+        "/parse/upload": PARSE_UPLOAD_MAX_BYTES,
+        "/jobs": JOB_MAX_BYTES,
+        "/parse-image": IMAGE_MAX_BYTES,
+        "/parse-images": IMAGE_BATCH_MAX_BYTES,
+    },
+)
+app.add_middleware(
+    RateLimitMiddleware,
+    requests_per_minute=RATE_LIMIT_PER_MINUTE,
+    burst=RATE_LIMIT_BURST,
+    store=rate_limit_store,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
@@ -48,15 +272,42 @@ def health() -> HealthResponse:
     return HealthResponse()
 
 
-def stable_request_id(payload: dict) -> str:
-    """Build a deterministic SHA256 hash for a JSON-serializable payload."""
-    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
-    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+@app.get("/metrics", response_model=MetricsResponse)
+def metrics() -> MetricsResponse:
+    """Return in-process cache and OCR queue counters for monitoring."""
+    line_cache = get_line_cache()
+    return MetricsResponse(
+        line_cache=line_cache.stats() if line_cache else None,
+        parse_cache=parse_cache.stats() if parse_cache.enabled else None,
+        parse_dedupe=parse_pool.stats(),
+        parse_sessions=parse_sessions.stats(),
+        jobs=job_runner.stats() if job_runner is not None else None,
+        ocr=ocr_executor.stats(),
+        ocr_cache=ocr_cache.stats() if ocr_cache.enabled else None,
+        preprocess=PREPROCESS_TIMINGS.stats(),
+    )
 
 
-@app.post("/parse", response_model=ParseResponse)
-def parse_invoice(request: ParseRequest) -> ParseResponse:
-    """Parse one or many text inputs into structured invoice line items."""
+@app.delete("/admin/ocr-cache", response_model=PurgeResponse)
+def purge_ocr_cache(x_admin_token: str | None = Header(default=None)) -> PurgeResponse:
+    """Drop every cached OCR result from memory and disk."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled.")
+    if not hmac.compare_digest((x_admin_token or "").encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
+    return PurgeResponse(removed=ocr_cache.purge())
+
+
+def _parse_hasher(request: ParseRequest) -> RequestIdHasher:
+    """Start a request-id hash seeded with the text inputs of a parse request."""
+    hasher = RequestIdHasher("parse")
+    hasher.add_value(request.content)
+    hasher.add_texts(request.contents)
+    return hasher
+
+
+def _request_inputs(request: ParseRequest | JobRequest) -> list[str]:
+    """Return the request texts, rejecting any input above `MAX_CHARS_PER_ITEM`."""
     inputs = [request.content] if request.content is not None else request.contents or []
 
     for idx, text in enumerate(inputs):
@@ -65,36 +316,323 @@ def parse_invoice(request: ParseRequest) -> ParseResponse:
                 status_code=413,
                 detail=f"Input at index {idx} exceeds max character limit ({MAX_CHARS_PER_ITEM}).",
             )
+    return inputs
 
-    results: list[ParseResult] = []
-    for i, text in enumerate(inputs):
-        parsed = extract_items(text)
-        results.append(
-            ParseResult(
-                input_index=i,
-                items=[ParsedItem(**item.__dict__) for item in parsed],
-            )
+
+def _warning_payload(warnings: dict[int, dict[str, int]]) -> list[dict]:
+    """Return `ParseWarning`-shaped dicts ordered by input index."""
+    return [
+        {"input_index": index, "code": code, "lines": lines}
+        for index in sorted(warnings)
+        for code, lines in warnings[index].items()
+    ]
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Return True when an `If-None-Match` header value matches `etag` (weak comparison).
+
+    `*` is not honoured: the ETag is derived from the request body, so it
+    cannot vouch for a response the client has never received.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@app.post("/parse", response_model=ParseResponse)
+def parse_invoice(request: ParseRequest, if_none_match: str | None = Header(default=None)) -> Response:
+    """Parse one or many text inputs into structured invoice line items.
+
+    The response carries an `ETag` derived from the inputs and the parser
+    fingerprint, so it is known before parsing: a matching `If-None-Match`
+    gets `304`, and a cached body is returned without parsing again. Freshly
+    parsed responses report deduplicated inputs and lines in
+    `X-Duplicate-Inputs` and `X-Duplicate-Lines`. Inputs cut short by the
+    extraction time budget are listed in `warnings`; such responses are
+    neither cached nor given an `ETag`.
+    """
+    inputs = _request_inputs(request)
+
+    cache_key = parse_cache_key(request.content, request.contents)
+    headers = {"ETag": f'"{cache_key}"'}
+    if _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    cached = parse_cache.get(cache_key) if parse_cache.enabled else None
+    if cached is not None:
+        if cached.request_id not in result_store:
+            result_store.put_rendered(cached.request_id, cached.results_json())
+        return Response(cached.body, media_type="application/json", headers=headers)
+
+    hasher = _parse_hasher(request)
+
+    batch_stats = BatchStats()
+    results: list[dict] = []
+    for i, parsed in enumerate(parse_pool.parse_many(inputs, batch_stats)):
+        hasher.add_result(i, parsed)
+        results.append(result_payload(i, parsed))
+    headers["X-Duplicate-Inputs"] = str(batch_stats.duplicate_inputs)
+    headers["X-Duplicate-Lines"] = str(batch_stats.duplicate_lines)
+    warnings = _warning_payload(batch_stats.warnings)
+
+    request_id = hasher.hexdigest()
+    # Rendered directly: items are already typed, so skip response-model validation.
+    # The results array is rendered once and shared by the body, the store and the cache.
+    results_json = dump_json(results)
+    result_store.put_rendered(request_id, results_json)
+    head = f'{{"request_id":{dump_json(request_id)},"results":'.encode("utf-8")
+    rendered_results = results_json.encode("utf-8")
+    body = head + rendered_results + f',"warnings":{dump_json(warnings)}}}'.encode("utf-8")
+    if any(warning["code"] == TIME_BUDGET_EXCEEDED for warning in warnings):
+        # Where the budget ran out depends on load, so the body is not a function of the key.
+        del headers["ETag"]
+    elif parse_cache.enabled:
+        parse_cache.put(cache_key, request_id, body, (len(head), len(head) + len(rendered_results)))
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.post("/parse/stream")
+def parse_invoice_stream(request: ParseRequest) -> StreamingResponse:
+    """Stream one `ParseResult` per NDJSON line as soon as each input is parsed.
+
+    The last line is a `ParseStreamTrailer` carrying the same `request_id`
+    that `/parse` returns for this request. Rendered lines are kept for the
+    result store only while they fit its `max_entry_bytes`; past that the
+    stream is not stored and memory stays flat.
+    """
+    inputs = _request_inputs(request)
+
+    def ndjson_lines():
+        hasher = _parse_hasher(request)
+        batch_stats = BatchStats()
+        kept: list[str] | None = []
+        kept_bytes = 2  # the enclosing brackets
+        for i, parsed in enumerate(parse_pool.iter_many(inputs, batch_stats)):
+            hasher.add_result(i, parsed)
+            line = dump_json(result_payload(i, parsed))
+            if kept is not None:
+                kept_bytes += len(line) + 1
+                if kept_bytes > result_store.max_entry_bytes:
+                    kept = None
+                else:
+                    kept.append(line)
+            yield line + "\n"
+
+        request_id = hasher.hexdigest()
+        if kept is not None:
+            result_store.put_rendered(request_id, "[" + ",".join(kept) + "]")
+        trailer = ParseStreamTrailer(
+            request_id=request_id,
+            result_count=len(inputs),
+            warnings=_warning_payload(batch_stats.warnings),
         )
+        yield trailer.model_dump_json() + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
 
+def _session_response(
+    session: ParseSession, lines: list[int] | None = None, status_code: int = 200
+) -> Response:
+    """Render a session's state; `lines=None` lists every line that has items."""
+    if lines is None:
+        lines = [index for index, (items, _) in enumerate(session.results) if items]
+    warnings = session.warnings()
     payload = {
-        "content": request.content,
-        "contents": request.contents,
-        "results": [result.model_dump() for result in results],
+        "session_id": session.session_id,
+        "request_id": session.request_id,
+        "line_count": len(session.lines),
+        "lines": [
+            {"line": index, "items": [item.to_dict() for item in items]}
+            for index, items in session.line_items(lines)
+        ],
+        "warnings": _warning_payload({0: warnings} if warnings else {}),
     }
-    request_id = stable_request_id(payload)
-    return ParseResponse(request_id=request_id, results=results)
+    return Response(dump_json(payload), status_code=status_code, media_type="application/json")
+
+
+def _live_session(session_id: str) -> ParseSession:
+    session = parse_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session_id.")
+    return session
+
+
+def _session_edit_error(exc: SessionEditError) -> HTTPException:
+    return HTTPException(status_code=413 if isinstance(exc, SessionTooLargeError) else 422, detail=str(exc))
+
+
+@app.post("/parse/sessions", response_model=ParseSessionResponse, status_code=201)
+def create_parse_session(request: ParseSessionRequest) -> Response:
+    """Parse a document and keep it server-side for incremental edits.
+
+    The `request_id` is the one `/parse` returns for the same `content`
+    (with line breaks normalized to `\n`).
+    """
+    try:
+        session = parse_sessions.create(request.content, MAX_CHARS_PER_ITEM)
+    except SessionEditError as exc:
+        raise _session_edit_error(exc) from exc
+    return _session_response(session, status_code=201)
+
+
+@app.get("/parse/sessions/{session_id}", response_model=ParseSessionResponse)
+def get_parse_session(session_id: str) -> Response:
+    """Return every line that has items, for a client re-syncing after a conflict."""
+    return _session_response(_live_session(session_id))
+
+
+@app.patch("/parse/sessions/{session_id}", response_model=ParseSessionResponse)
+def edit_parse_session(session_id: str, request: ParseSessionPatch) -> Response:
+    """Apply line edits and return only the re-parsed lines.
+
+    Edits must be made against the session's current `request_id`
+    (`base_request_id`); otherwise nothing is applied and the answer is `409`.
+    """
+    session = _live_session(session_id)
+    edits = [(edit.start, edit.delete, edit.insert) for edit in request.edits]
+    with session.lock:
+        try:
+            changed = session.apply(request.base_request_id, edits)
+        except SessionConflictError as exc:
+            raise HTTPException(
+                status_code=409,
+                detail="Session has changed since base_request_id; fetch it again.",
+                headers={"X-Request-Id": str(exc)},
+            ) from exc
+        except SessionEditError as exc:
+            raise _session_edit_error(exc) from exc
+        parse_sessions.put(session)
+        return _session_response(session, changed)
+
+
+@app.delete("/parse/sessions/{session_id}", status_code=204)
+def delete_parse_session(session_id: str) -> Response:
+    """End a session and release its memory."""
+    if not parse_sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail="Unknown or expired session_id.")
+    return Response(status_code=204)
+
+
+@app.post("/parse/upload")
+async def parse_upload(request: Request) -> StreamingResponse:
+    """Parse one large plain-text document sent as the raw request body.
+
+    The body is decoded as UTF-8 and parsed chunk by chunk while it is still
+    arriving, with `PARSE_UPLOAD_BUDGET_MS` of CPU for the whole document.
+    The response is NDJSON: one `ParsedItem` per line, then a
+    `ParseUploadTrailer`. Items are spooled (to disk beyond `SPOOL_MAX_BYTES`)
+    so neither the body nor the results are held in memory; they are not
+    kept in the result store.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    stream = ItemStream(budget=PARSE_UPLOAD_BUDGET_MS / 1000)
+    body_digest = hashlib.sha256()
+    hasher = RequestIdHasher("upload")
+    hasher.begin_result(0)
+    spool = SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    item_count = 0
+
+    def write_items(items: list[ParsedLine]) -> None:
+        nonlocal item_count
+        for item in items:
+            hasher.add_item(item)
+            spool.write((dump_json(item.to_dict()) + "\n").encode("utf-8"))
+        item_count += len(items)
+
+    def feed(text: str, final: bool = False) -> None:
+        write_items(stream.feed(text))
+        if final:
+            write_items(stream.close())
+
+    try:
+        # Decoded text is batched to about CHUNK_CHARS per worker-thread hop.
+        pending: list[str] = []
+        pending_chars = 0
+        async for chunk in request.stream():
+            body_digest.update(chunk)
+            text = decoder.decode(chunk)
+            pending.append(text)
+            pending_chars += len(text)
+            if pending_chars >= CHUNK_CHARS:
+                await run_in_threadpool(feed, "".join(pending))
+                pending.clear()
+                pending_chars = 0
+        pending.append(decoder.decode(b"", final=True))
+        await run_in_threadpool(feed, "".join(pending), True)
+    except BaseException:
+        spool.close()
+        raise
+
+    hasher.end_result()
+    hasher.add_value(body_digest.hexdigest())
+    trailer = ParseUploadTrailer(
+        request_id=hasher.hexdigest(),
+        item_count=item_count,
+        warnings=_warning_payload({0: stream.warnings} if stream.warnings else {}),
+    )
+
+    def ndjson_chunks() -> Iterator[bytes]:
+        with spool:
+            spool.seek(0)
+            while chunk := spool.read(CHUNK_SIZE):
+                yield chunk
+        yield (trailer.model_dump_json() + "\n").encode("utf-8")
+
+    return StreamingResponse(ndjson_chunks(), media_type=NDJSON_MEDIA_TYPE)
+
+
+IMAGE_TYPES = {"image/png", "image/jpeg", "image/jpg", "image/webp"}
+BATCH_IMAGE_TYPES = IMAGE_TYPES | {"image/tiff"}
+
+
+def _ocr_page_key(image_digest: str, page: int) -> str:
+    page_digest = image_digest if page == 0 else f"{image_digest}#{page}"
+    return ocr_cache_key(page_digest, ocr_settings_key())
+
+
+async def _ocr_page(image_bytes: bytes, image_digest: str, page: int = 0) -> str:
+    """OCR one image page through the OCR cache and the bounded OCR executor."""
+    cache_key = _ocr_page_key(image_digest, page)
+    # A hit skips decoding and OCR entirely and takes no OCR worker slot.
+    text = ocr_cache.get(cache_key) if ocr_cache.enabled else None
+    if text is None:
+        text = await ocr_executor.run(extract_text_from_image_bytes, image_bytes, page)
+        if ocr_cache.enabled:
+            ocr_cache.put(cache_key, text)
+    return text
+
+
+def _ocr_http_error(exc: Exception) -> HTTPException:
+    """Map OCR service errors onto HTTP errors."""
+    if isinstance(exc, OCRInputError):
+        return HTTPException(status_code=422, detail=str(exc))
+    if isinstance(exc, OCRQueueFullError):
+        return HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(ocr_executor.retry_after)},
+        )
+    if isinstance(exc, OCRTimeoutError):
+        return HTTPException(status_code=504, detail=str(exc))
+    return HTTPException(status_code=503, detail=str(exc))
+
+
+OCR_ERRORS = (OCRInputError, OCRUnavailableError, OCRQueueFullError, OCRTimeoutError)
 
 
 if MULTIPART_AVAILABLE:
 
     @app.post("/parse-image", response_model=ParseImageResponse)
-    async def parse_invoice_image(file: UploadFile = File(...)) -> ParseImageResponse:
+    async def parse_invoice_image(file: UploadFile = File(...)) -> Response:
         """Run OCR on an uploaded image, then parse extracted text into line items."""
         if not file.filename:
             raise HTTPException(status_code=400, detail="Missing file name.")
 
-        allowed_types = {"image/png", "image/jpeg", "image/jpg", "image/webp"}
-        if file.content_type not in allowed_types:
+        if file.content_type not in IMAGE_TYPES:
             raise HTTPException(
                 status_code=415,
                 detail="Unsupported file type. Allowed: PNG, JPG, JPEG, WEBP.",
@@ -104,31 +642,127 @@ if MULTIPART_AVAILABLE:
         if not image_bytes:
             raise HTTPException(status_code=400, detail="Uploaded file is empty.")
 
+        image_digest = hashlib.sha256(image_bytes).hexdigest()
         try:
-            text = extract_text_from_image_bytes(image_bytes)
-        except OCRInputError as exc:
-            raise HTTPException(status_code=422, detail=str(exc)) from exc
-        except OCRUnavailableError as exc:
-            raise HTTPException(status_code=503, detail=str(exc)) from exc
-
-        parsed = extract_items(text)
-        result = ParseResult(
-            input_index=0,
-            items=[ParsedItem(**item.__dict__) for item in parsed],
-        )
+            text = await _ocr_page(image_bytes, image_digest)
+        except OCR_ERRORS as exc:
+            raise _ocr_http_error(exc) from exc
 
-        payload = {
-            "filename": file.filename,
-            "content_sha256": hashlib.sha256(image_bytes).hexdigest(),
-            "results": [result.model_dump()],
-        }
-        request_id = stable_request_id(payload)
-        return ParseImageResponse(
-            request_id=request_id,
-            extracted_text=text,
-            filename=file.filename,
-            results=[result],
-        )
+        def parse_text() -> bytes:
+            parsed, warnings = BatchExtractor().extract(text)
+
+            hasher = RequestIdHasher("image")
+            hasher.add_value(file.filename)
+            hasher.add_value(image_digest)
+            hasher.add_result(0, parsed)
+            request_id = hasher.hexdigest()
+            results = [result_payload(0, parsed)]
+            result_store.put(request_id, results)
+            return dump_json(
+                {
+                    "request_id": request_id,
+                    "results": results,
+                    "warnings": _warning_payload({0: warnings} if warnings else {}),
+                    "extracted_text": text,
+                    "filename": file.filename,
+                }
+            ).encode("utf-8")
+
+        # Extraction may spend the whole document budget; keep it off the event loop.
+        return Response(await run_in_threadpool(parse_text), media_type="application/json")
+
+    @app.post("/parse-images", response_model=ParseImagesResponse)
+    async def parse_invoice_images(files: list[UploadFile] = File(...)) -> Response:
+        """OCR every page of several uploaded images concurrently and parse each page.
+
+        Pages are numbered across the request through `input_index`, so the
+        flattened pages can be passed to `/export/xlsx` unchanged. Pages cut short
+        by the extraction time budget or with gated lines are listed in `warnings`.
+        """
+        if len(files) > IMAGE_BATCH_MAX_FILES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Too many files. Maximum allowed is {IMAGE_BATCH_MAX_FILES}.",
+            )
+
+        uploads: list[tuple[str, bytes, str, int]] = []
+        for file in files:
+            if not file.filename:
+                raise HTTPException(status_code=400, detail="Missing file name.")
+            if file.content_type not in BATCH_IMAGE_TYPES:
+                raise HTTPException(
+                    status_code=415,
+                    detail=f"Unsupported file type for {file.filename}. Allowed: PNG, JPG, JPEG, WEBP, TIFF.",
+                )
+            image_bytes = await file.read()
+            if not image_bytes:
+                raise HTTPException(status_code=400, detail=f"Uploaded file {file.filename} is empty.")
+            try:
+                page_count = count_image_pages(image_bytes)
+            except OCRInputError as exc:
+                raise HTTPException(status_code=422, detail=f"{file.filename}: {exc}") from exc
+            digest = hashlib.sha256(image_bytes).hexdigest()
+            uploads.append((file.filename, image_bytes, digest, page_count))
+
+        total_pages = sum(page_count for *_, page_count in uploads)
+        if total_pages > IMAGE_BATCH_MAX_PAGES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Too many pages ({total_pages}). Maximum allowed is {IMAGE_BATCH_MAX_PAGES}.",
+            )
+
+        limit = asyncio.Semaphore(IMAGE_BATCH_CONCURRENCY)
+
+        async def ocr_limited(image_bytes: bytes, digest: str, page: int) -> str:
+            async with limit:
+                return await _ocr_page(image_bytes, digest, page)
+
+        tasks = [
+            asyncio.ensure_future(ocr_limited(image_bytes, digest, page))
+            for _, image_bytes, digest, page_count in uploads
+            for page in range(page_count)
+        ]
+        try:
+            texts = await asyncio.gather(*tasks)
+        except OCR_ERRORS as exc:
+            for task in tasks:
+                task.cancel()
+            raise _ocr_http_error(exc) from exc
+
+        def parse_pages() -> bytes:
+            hasher = RequestIdHasher("images")
+            payload_files = []
+            page_texts = iter(texts)
+            extractor = BatchExtractor()
+            results: list[dict] = []
+            warnings: dict[int, dict[str, int]] = {}
+            input_index = 0
+            for file_index, (filename, _, digest, page_count) in enumerate(uploads):
+                hasher.add_value(filename)
+                hasher.add_value(digest)
+                pages = []
+                for page in range(page_count):
+                    text = next(page_texts)
+                    parsed, page_warnings = extractor.extract(text)
+                    if page_warnings:
+                        warnings[input_index] = page_warnings
+                    hasher.add_result(input_index, parsed)
+                    payload = result_payload(input_index, parsed)
+                    results.append(payload)
+                    pages.append({**payload, "page_index": page, "extracted_text": text})
+                    input_index += 1
+                payload_files.append(
+                    {"file_index": file_index, "filename": filename, "page_count": page_count, "pages": pages}
+                )
+
+            request_id = hasher.hexdigest()
+            result_store.put(request_id, results)
+            return dump_json(
+                {"request_id": request_id, "files": payload_files, "warnings": _warning_payload(warnings)}
+            ).encode("utf-8")
+
+        # Up to one document budget of CPU per page; keep it off the event loop.
+        return Response(await run_in_threadpool(parse_pages), media_type="application/json")
 
 else:
 
@@ -140,13 +774,277 @@ else:
             detail="python-multipart is not installed. Install backend requirements to enable image upload.",
         )
 
+    @app.post("/parse-images", response_model=ParseImagesResponse)
+    async def parse_invoice_images_unavailable() -> ParseImagesResponse:
+        """Return a clear error when image upload dependency is not installed."""
+        raise HTTPException(
+            status_code=503,
+            detail="python-multipart is not installed. Install backend requirements to enable image upload.",
+        )
+
+
+def _run_parse_job(job: Job, done: Container[int]) -> Iterator[JobOutput]:
+    """Parse each text input of a `parse` job that has no stored result yet."""
+    payload = job.payload
+    inputs = [payload["content"]] if payload["content"] is not None else payload["contents"]
+    for index, text in enumerate(inputs):
+        if index % JOB_MEMO_INPUTS == 0:
+            extractor = BatchExtractor()
+        if index not in done:
+            items, warnings = extractor.extract(text)
+            yield index, result_payload(index, items), warnings
+
+
+def _finish_parse_job(job: Job, results: list[dict]) -> str:
+    """Same request id as `/parse` for the same inputs; results become exportable."""
+    hasher = RequestIdHasher("parse")
+    hasher.add_value(job.payload["content"])
+    hasher.add_texts(job.payload["contents"])
+    for result in results:
+        hasher.add_result(result["input_index"], result["items"])
+    request_id = hasher.hexdigest()
+    result_store.put(request_id, results)
+    return request_id
+
+
+def _run_ocr_job(job: Job, done: Container[int]) -> Iterator[JobOutput]:
+    """OCR and parse every image page of an `ocr` job that has no stored result yet.
+
+    Runs on a job worker thread, so OCR is called directly (through the OCR
+    cache) instead of through the async OCR executor; `JOB_OCR_CONCURRENCY`
+    bounds how many OCR jobs run at once.
+    """
+    index = 0
+    for image in job.payload["images"]:
+        image_bytes = None
+        for page in range(image["page_count"]):
+            if index % JOB_MEMO_INPUTS == 0:
+                extractor = BatchExtractor()
+            if index not in done:
+                if image_bytes is None:
+                    image_bytes = base64.b64decode(image["data"])
+                cache_key = _ocr_page_key(image["digest"], page)
+                text = ocr_cache.get(cache_key) if ocr_cache.enabled else None
+                if text is None:
+                    text = extract_text_from_image_bytes(image_bytes, page)
+                    if ocr_cache.enabled:
+                        ocr_cache.put(cache_key, text)
+                items, warnings = extractor.extract(text)
+                yield index, result_payload(index, items), warnings
+            index += 1
+
+
+def _finish_ocr_job(job: Job, results: list[dict]) -> str:
+    """Same request id as `/parse-images` for the same files; results become exportable."""
+    hasher = RequestIdHasher("images")
+    pages = iter(results)
+    for image in job.payload["images"]:
+        hasher.add_value(image["filename"])
+        hasher.add_value(image["digest"])
+        for _ in range(image["page_count"]):
+            result = next(pages)
+            hasher.add_result(result["input_index"], result["items"])
+    request_id = hasher.hexdigest()
+    result_store.put(request_id, results)
+    return request_id
+
+
+JOB_KINDS = {
+    "parse": JobKind(run=_run_parse_job, finish=_finish_parse_job),
+    "ocr": JobKind(run=_run_ocr_job, finish=_finish_ocr_job, concurrency=JOB_OCR_CONCURRENCY),
+}
+# Opened on first use (or at startup when configured), never at import time.
+job_store: SQLiteJobStore | None = None
+job_runner: JobRunner | None = None
+_jobs_lock = threading.Lock()
+
+
+def _jobs() -> tuple[SQLiteJobStore, JobRunner]:
+    """Return the job store and runner, opening them on first use; `503` without `JOB_STORE_PATH`."""
+    global job_store, job_runner
+    if job_runner is None:
+        if not JOB_STORE_PATH:
+            raise HTTPException(status_code=503, detail="Background jobs are disabled; set JOB_STORE_PATH.")
+        with _jobs_lock:
+            if job_runner is None:
+                job_store = SQLiteJobStore(
+                    JOB_STORE_PATH, lease_seconds=JOB_LEASE_SECONDS, ttl_seconds=JOB_TTL_SECONDS
+                )
+                job_runner = JobRunner(job_store, JOB_KINDS, workers=JOB_WORKERS)
+    return job_store, job_runner
+
+
+def _ocr_job_images(request: JobRequest) -> list[dict]:
+    """Validate the images of an OCR job and record their digests and page counts."""
+    images = []
+    for image in request.images or []:
+        try:
+            image_bytes = base64.b64decode(image.data, validate=True)
+        except binascii.Error as exc:
+            raise HTTPException(status_code=422, detail=f"{image.filename}: invalid base64 data.") from exc
+        if not image_bytes:
+            raise HTTPException(status_code=400, detail=f"Uploaded file {image.filename} is empty.")
+        try:
+            page_count = count_image_pages(image_bytes)
+        except OCRInputError as exc:
+            raise HTTPException(status_code=422, detail=f"{image.filename}: {exc}") from exc
+        images.append(
+            {
+                "filename": image.filename,
+                "data": image.data,
+                "digest": hashlib.sha256(image_bytes).hexdigest(),
+                "page_count": page_count,
+            }
+        )
+    return images
+
+
+def _job_status(job: Job, offset: int | None = None, status_code: int = 200) -> Response:
+    """Render a job's progress, with its stored results from `offset` on when given."""
+    payload = {
+        "job_id": job.job_id,
+        "kind": job.kind,
+        "status": job.status,
+        "priority": job.priority,
+        "total": job.total,
+        "completed": job.completed,
+        "request_id": job.request_id,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+        "results": _jobs()[0].results(job.job_id, offset) if offset is not None else [],
+        "warnings": _warning_payload(_jobs()[0].warnings(job.job_id)) if offset is not None else [],
+    }
+    return Response(dump_json(payload), status_code=status_code, media_type="application/json")
+
+
+def _known_job(job_id: str) -> Job:
+    job = _jobs()[0].get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job_id.")
+    return job
+
+
+@app.post("/jobs", response_model=JobStatus, status_code=202)
+def submit_job(request: JobRequest) -> Response:
+    """Queue a parse or OCR batch and return its job id at once.
+
+    Inputs are validated up front (text length per input, decodable images);
+    the work runs on background workers by priority and survives a restart.
+    """
+    if request.kind == "parse":
+        inputs = _request_inputs(request)
+        payload = {"content": request.content, "contents": request.contents}
+        total = len(inputs)
+    else:
+        images = _ocr_job_images(request)
+        payload = {"images": images}
+        total = sum(image["page_count"] for image in images)
+    store, runner = _jobs()
+    job = store.submit(request.kind, payload, total, priority=request.priority)
+    runner.start()
+    return _job_status(job, status_code=202)
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+def get_job(job_id: str, offset: int = Query(default=0, ge=0)) -> Response:
+    """Report progress with the results finished so far (from the `offset`-th result on)."""
+    return _job_status(_known_job(job_id), offset)
+
+
+@app.get("/jobs/{job_id}/result", response_model=ParseResponse)
+def get_job_result(job_id: str) -> Response:
+    """Return the final `ParseResponse` of a succeeded job; `409` while it is unfinished or failed."""
+    job = _known_job(job_id)
+    if job.status == FAILED:
+        raise HTTPException(status_code=409, detail=f"Job failed: {job.error}")
+    if job.status != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status} ({job.completed}/{job.total}).")
+    body = {
+        "request_id": job.request_id,
+        "results": _jobs()[0].results(job_id),
+        "warnings": _warning_payload(_jobs()[0].warnings(job_id)),
+    }
+    return Response(dump_json(body), media_type="application/json")
+
 
 @app.post("/export/xlsx")
 def export_xlsx(request: ExportXlsxRequest) -> StreamingResponse:
-    """Export parsed results to an in-memory Excel file and stream it to the client."""
-    xlsx_bytes = build_xlsx_bytes(request.results)
+    """Export parsed results to a write-only Excel workbook streamed to the client in chunks."""
     return StreamingResponse(
-        BytesIO(xlsx_bytes),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        iter_xlsx_chunks(request.results),
+        media_type=XLSX_MEDIA_TYPE,
         headers={"Content-Disposition": "attachment; filename=parsed_results.xlsx"},
     )
+
+
+def _text_export(
+    chunks: Iterator[bytes], media_type: str, filename: str, accept_encoding: str | None
+) -> StreamingResponse:
+    """Stream a text export, gzip-compressed on the fly when the client accepts it."""
+    headers = {"Content-Disposition": f"attachment; filename={filename}", "Vary": "Accept-Encoding"}
+    if accepts_gzip(accept_encoding):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+@app.post("/export/csv")
+def export_csv(
+    request: ExportXlsxRequest, accept_encoding: str | None = Header(default=None)
+) -> StreamingResponse:
+    """Export parsed results as CSV rows in `HEADERS` order, streamed in chunks."""
+    return _text_export(
+        iter_csv_chunks(request.results), CSV_MEDIA_TYPE, "parsed_results.csv", accept_encoding
+    )
+
+
+@app.post("/export/ndjson")
+def export_ndjson(
+    request: ExportXlsxRequest, accept_encoding: str | None = Header(default=None)
+) -> StreamingResponse:
+    """Export parsed results as one JSON object per item per line, streamed in chunks."""
+    return _text_export(
+        iter_ndjson_chunks(request.results), NDJSON_MEDIA_TYPE, "parsed_results.ndjson", accept_encoding
+    )
+
+
+def _stored_results(request_id: str) -> list[dict]:
+    """Return the stored results of an earlier parse response, or raise 404."""
+    results = result_store.get(request_id)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired request_id.")
+    return results
+
+
+@app.get("/export/{request_id}.xlsx")
+def export_stored_xlsx(request_id: str) -> StreamingResponse:
+    """Export the stored results of an earlier parse response, without a request body."""
+    return StreamingResponse(
+        iter_xlsx_chunks(_stored_results(request_id)),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={request_id}.xlsx"},
+    )
+
+
+@app.get("/export/{request_id}.csv")
+def export_stored_csv(
+    request_id: str, accept_encoding: str | None = Header(default=None)
+) -> StreamingResponse:
+    """CSV counterpart of `GET /export/{request_id}.xlsx`."""
+    return _text_export(
+        iter_csv_chunks(_stored_results(request_id)), CSV_MEDIA_TYPE, f"{request_id}.csv", accept_encoding
+    )
+
+
+@app.get("/export/{request_id}.ndjson")
+def export_stored_ndjson(
+    request_id: str, accept_encoding: str | None = Header(default=None)
+) -> StreamingResponse:
+    """NDJSON counterpart of `GET /export/{request_id}.xlsx`."""
+    return _text_export(
+        iter_ndjson_chunks(_stored_results(request_id)),
+        NDJSON_MEDIA_TYPE,
+        f"{request_id}.ndjson",
+        accept_encoding,
+    )
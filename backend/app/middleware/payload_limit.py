@@ -2,37 +2,87 @@
 
 from __future__ import annotations
 
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import HTTPException
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
-class PayloadLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, max_bytes: int = 200_000):
-        """Initialize request body size guard with a maximum number of bytes."""
-        super().__init__(app)
+class PayloadTooLargeError(HTTPException):
+    """Raised from `receive` once the streamed body crosses the route's byte limit."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            status_code=413,
+            detail=f"Payload too large. Maximum allowed is {max_bytes} bytes.",
+        )
+
+
+class PayloadLimitMiddleware:
+    """Reject oversized bodies without buffering them.
+
+    A declared `Content-Length` above the limit is refused before the app runs.
+    Otherwise body chunks are counted as the app receives them and the request
+    is aborted with 413 as soon as the running total crosses the limit.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int = 200_000, route_limits: dict[str, int] | None = None):
+        """Initialize request body size guard; `route_limits` overrides `max_bytes` per exact path."""
+        self.app = app
         self.max_bytes = max_bytes
+        self.route_limits = dict(route_limits or {})
+
+    def limit_for(self, path: str) -> int:
+        """Return the byte limit that applies to `path`."""
+        return self.route_limits.get(path, self.max_bytes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_bytes = self.limit_for(scope["path"])
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    break
+                if declared > max_bytes:
+                    await self._reject(scope, receive, send, max_bytes)
+                    return
+                break
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    raise PayloadTooLargeError(max_bytes)
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except PayloadTooLargeError:
+            # Normally turned into a 413 by FastAPI's exception handling; this
+            # covers apps or code paths that let the error escape.
+            if response_started:
+                raise
+            await self._reject(scope, receive, send, max_bytes)
 
-    async def dispatch(self, request, call_next):
-        """Reject requests larger than `max_bytes` with HTTP 413."""
-        content_length = request.headers.get("content-length")
-        if content_length:
-            try:
-                if int(content_length) > self.max_bytes:
-                    return JSONResponse(
-                        status_code=413,
-                        content={
-                            "detail": f"Payload too large. Maximum allowed is {self.max_bytes} bytes."
-                        },
-                    )
-            except ValueError:
-                pass
-
-        body = await request.body()
-        if len(body) > self.max_bytes:
-            return JSONResponse(
-                status_code=413,
-                content={"detail": f"Payload too large. Maximum allowed is {self.max_bytes} bytes."},
-            )
-
-        request._body = body
-        return await call_next(request)
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, max_bytes: int) -> None:
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": f"Payload too large. Maximum allowed is {max_bytes} bytes."},
+        )
+        await response(scope, receive, send)
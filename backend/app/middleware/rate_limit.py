@@ -1,47 +1,75 @@
-"""ASGI middleware implementing in-memory fixed-window IP rate limiting."""
+"""ASGI middleware implementing per-IP GCRA (token bucket) rate limiting."""
 
 from __future__ import annotations
 
-import time
-from collections import defaultdict, deque
+import math
 
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.services.rate_limit_store import GCRARateLimiter, RateLimitDecision, RateLimitStore
 
-class FixedWindowRateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, requests_per_minute: int = 60):
-        """Initialize fixed-window per-IP limiter with requests-per-minute threshold."""
-        super().__init__(app)
+
+def rate_limit_headers(decision: RateLimitDecision) -> dict[str, str]:
+    """Return `X-RateLimit-*` headers (plus `Retry-After` when rejected) for a decision."""
+    headers = {
+        "X-RateLimit-Limit": str(decision.limit),
+        "X-RateLimit-Remaining": str(decision.remaining),
+        "X-RateLimit-Reset": str(math.ceil(decision.reset_after)),
+    }
+    if not decision.allowed:
+        headers["Retry-After"] = str(max(1, math.ceil(decision.retry_after)))
+    return headers
+
+
+class RateLimitMiddleware:
+    """Per-IP token bucket applied before the app runs; adds `X-RateLimit-*` headers."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        requests_per_minute: int = 60,
+        burst: int | None = None,
+        store: RateLimitStore | None = None,
+    ):
+        """Initialize per-IP limiter: average `requests_per_minute`, bursts up to `burst`."""
+        self.app = app
         self.requests_per_minute = requests_per_minute
-        self.hits: dict[str, deque[float]] = defaultdict(deque)
+        self.limiter = GCRARateLimiter(requests_per_minute, burst=burst, store=store)
 
-    def _client_ip(self, request) -> str:
+    def _client_ip(self, scope: Scope) -> str:
         """Resolve client IP from X-Forwarded-For (first hop) or socket address."""
         # Trust first X-Forwarded-For hop when present. In production,
         # restrict trusted proxy sources to avoid spoofing.
-        forwarded = request.headers.get("x-forwarded-for")
-        if forwarded:
-            return forwarded.split(",")[0].strip()
-        if request.client and request.client.host:
-            return request.client.host
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        if client and client[0]:
+            return client[0]
         return "unknown"
 
-    async def dispatch(self, request, call_next):
-        """Apply fixed-window rate checks and return HTTP 429 when limit is exceeded."""
-        ip = self._client_ip(request)
-        now = time.time()
-        window_start = now - 60
-
-        bucket = self.hits[ip]
-        while bucket and bucket[0] < window_start:
-            bucket.popleft()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Apply the client's bucket and return HTTP 429 with `Retry-After` when it is empty."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        if len(bucket) >= self.requests_per_minute:
-            return JSONResponse(
+        decision = self.limiter.hit(self._client_ip(scope))
+        headers = rate_limit_headers(decision)
+        if not decision.allowed:
+            response = JSONResponse(
                 status_code=429,
                 content={"detail": "Rate limit exceeded. Try again later."},
+                headers=headers,
             )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
 
-        bucket.append(now)
-        return await call_next(request)
+        await self.app(scope, receive, send_with_headers)
@@ -1,5 +1,6 @@
 """Public parser package exports."""
 
-from app.parser.extractor import extract_items
+from app.parser.extractor import configure_line_cache, extract_items, get_line_cache, iter_items
+from app.parser.regex_patterns import parser_fingerprint
 
-__all__ = ["extract_items"]
+__all__ = ["configure_line_cache", "extract_items", "get_line_cache", "iter_items", "parser_fingerprint"]
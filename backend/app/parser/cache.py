@@ -0,0 +1,73 @@
+"""Bounded, thread-safe LRU cache for per-line extraction results."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class LineCache(Generic[T]):
+    """Size-bounded LRU mapping from stripped line text to an extraction result.
+
+    `None` results (noise or unmatched lines) are cached as well. Values are
+    shared between callers, so only immutable results should be stored.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        """Create an empty cache holding at most `maxsize` entries."""
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, T | None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, key: str, compute: Callable[[str], T | None]) -> T | None:
+        """Return the cached value for `key`, computing and storing it on a miss."""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        # Compute outside the lock; a concurrent miss on the same key only
+        # duplicates work, the stored value is identical.
+        value = compute(key)
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return hit, miss and eviction counters plus current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
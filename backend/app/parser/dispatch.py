@@ -0,0 +1,224 @@
+"""Compiled dispatch layer that picks the winning regex pattern for one line.
+
+Instead of running every entry of `PATTERNS` and sorting fully built candidates,
+the dispatcher checks a cheap prefilter per pattern, tries patterns in order of
+observed hit rate, scores matches as plain tuples and stops as soon as no
+remaining pattern can beat the current best. Ties are still broken by the
+original `PATTERNS` order, so the winner is the same one the "try everything and
+sort" resolution would pick.
+"""
+
+from __future__ import annotations
+
+import re
+import string
+from typing import Any
+
+from app.parser.postprocess import (
+    clean_price,
+    compute_confidence,
+    maybe_number,
+    normalize_name,
+    normalize_unit,
+)
+from app.parser.regex_patterns import PATTERN_PREFILTERS, PATTERNS, Prefilter
+
+UNIT_PRICE_PATTERNS = frozenset({"paren_qty_at_price", "qty_price_slash_unit"})
+TOTAL_PRICE_PATTERNS = frozenset({"dash_price_paren_qty", "fallback_name_price"})
+QTY_DEPENDENT_PATTERNS = frozenset({"name_qty_unit_price"})
+
+# Number of dispatched lines between two re-orderings by hit count.
+REORDER_INTERVAL = 4096
+
+# Non-ASCII characters that case-fold onto ASCII letters under re.IGNORECASE
+# (dotted/dotless i, long s, Kelvin sign). Literal prefilters are skipped for
+# lines containing them so they never reject a line the regex would match.
+_CASEFOLD_TRAPS = re.compile("[İıſK]")
+_ASCII_LETTERS = frozenset(string.ascii_letters)
+
+# (product_name, quantity, unit, price, price_type, derived_unit_price, confidence)
+Fields = tuple[Any, ...]
+
+
+def price_type_for(pattern_name: str, qty: float | None) -> str | None:
+    """Return whether a pattern's price is a line total or a unit price."""
+    if pattern_name in UNIT_PRICE_PATTERNS:
+        return "unit"
+    if pattern_name in TOTAL_PRICE_PATTERNS:
+        return "total"
+    if pattern_name in QTY_DEPENDENT_PATTERNS:
+        return "total" if qty and qty > 1 else "unit"
+    return None
+
+
+def resolve_fields(pattern_name: str, groups: dict[str, str | None]) -> Fields:
+    """Normalize raw regex groups into output fields and compute confidence."""
+    name = normalize_name(groups.get("name"))
+    qty = maybe_number(groups.get("qty"))
+    unit = normalize_unit(groups.get("unit") or groups.get("price_unit"))
+    price = clean_price(groups.get("price"))
+    price_type = price_type_for(pattern_name, qty)
+
+    derived_unit_price = None
+    if price is not None and qty and qty > 0 and price_type == "total":
+        derived_unit_price = round(price / qty, 4)
+
+    fields = {
+        "product_name": name,
+        "quantity": qty,
+        "unit": unit,
+        "price": price,
+        "price_type": price_type,
+    }
+    confidence = compute_confidence(fields, pattern_name)
+    return (name, qty, unit, price, price_type, derived_unit_price, confidence)
+
+
+def populated_count(fields: Fields) -> int:
+    """Count populated scoring fields, used as the first confidence tie-breaker."""
+    count = 0
+    for value in fields[:5]:
+        if value is not None and value != "":
+            count += 1
+    return count
+
+
+def _contains_required(lowered: str, required: tuple[tuple[str, ...], ...]) -> bool:
+    """Return True when every literal group has at least one hit in `lowered`."""
+    for group in required:
+        for literal in group:
+            if literal in lowered:
+                break
+        else:
+            return False
+    return True
+
+
+class _Route:
+    """One pattern together with its prefilter, ranking data and score bound."""
+
+    __slots__ = ("name", "pattern", "rank", "required", "hint", "tail", "bound", "hits")
+
+    def __init__(self, rank: int, name: str, pattern: re.Pattern[str], prefilter: Prefilter):
+        self.name = name
+        self.pattern = pattern
+        self.rank = rank
+        self.required = prefilter.required
+        self.hint = prefilter.hint
+        self.tail = prefilter.tail
+        self.hits = 0
+
+        # Best (confidence, populated, -rank) key any match of this pattern can reach.
+        groups = pattern.groupindex
+        best_case = {
+            "product_name": "name" in groups or None,
+            "quantity": 1.0 if "qty" in groups else None,
+            "unit": "unit" in groups or "price_unit" in groups or None,
+            "price": 1.0 if "price" in groups else None,
+            "price_type": price_type_for(name, 2.0),
+        }
+        populated = sum(value is not None for value in best_case.values())
+        self.bound = (compute_confidence(best_case, name), populated, -rank)
+
+
+class PatternDispatcher:
+    """Select the best-scoring pattern match for a line with minimal regex work.
+
+    Hit counters are updated without locking; under concurrent use a few counts
+    may be lost, which only affects the try order, never the selected result.
+    """
+
+    def __init__(
+        self,
+        patterns: list[tuple[str, re.Pattern[str]]] = PATTERNS,
+        prefilters: dict[str, Prefilter] = PATTERN_PREFILTERS,
+        reorder_interval: int = REORDER_INTERVAL,
+    ):
+        """Compile routes for `patterns`; patterns without a prefilter always run."""
+        self._routes = [
+            _Route(rank, name, pattern, prefilters.get(name, Prefilter()))
+            for rank, (name, pattern) in enumerate(patterns)
+        ]
+        self.reorder_interval = reorder_interval
+        self._lines = 0
+        self._plan = self._build_plan(self._routes)
+
+    @staticmethod
+    def _build_plan(routes: list[_Route]) -> tuple[tuple[_Route, tuple], ...]:
+        """Pair each route with the highest score bound among it and later routes."""
+        plan = []
+        suffix_bound: tuple = (-1.0, 0, 0)
+        for route in reversed(routes):
+            suffix_bound = max(suffix_bound, route.bound)
+            plan.append((route, suffix_bound))
+        plan.reverse()
+        return tuple(plan)
+
+    @property
+    def order(self) -> list[str]:
+        """Pattern names in the order they are currently tried."""
+        return [route.name for route, _ in self._plan]
+
+    def hit_counts(self) -> dict[str, int]:
+        """Return how often each pattern matched a dispatched line."""
+        return {route.name: route.hits for route in self._routes}
+
+    def reorder(self) -> None:
+        """Try frequently matching patterns first; ties keep `PATTERNS` order."""
+        ranked = sorted(self._routes, key=lambda route: (-route.hits, route.rank))
+        self._plan = self._build_plan(ranked)
+
+    def select(self, line: str) -> tuple[str, Fields] | None:
+        """Return `(pattern_name, fields)` of the winning match, or None."""
+        self._lines += 1
+        if self.reorder_interval and self._lines % self.reorder_interval == 0:
+            self.reorder()
+
+        literals_ok = line.isascii() or _CASEFOLD_TRAPS.search(line) is None
+        lowered: str | None = None
+        last: str | None = None
+
+        best_key: tuple | None = None
+        best: tuple[str, Fields] | None = None
+
+        for route, suffix_bound in self._plan:
+            if best_key is not None:
+                if suffix_bound < best_key:
+                    break
+                if route.bound < best_key:
+                    continue
+
+            if route.required and literals_ok:
+                if lowered is None:
+                    lowered = line.lower()
+                if not _contains_required(lowered, route.required):
+                    continue
+
+            tail = route.tail
+            if tail:
+                if last is None:
+                    last = line.rstrip()[-1:]
+                if tail == "price":
+                    if not (last.isdecimal() or last == ","):
+                        continue
+                elif tail == "word":
+                    if literals_ok and last not in _ASCII_LETTERS:
+                        continue
+                elif last != tail:
+                    continue
+
+            if route.hint is not None and route.hint.search(line) is None:
+                continue
+
+            match = route.pattern.match(line)
+            if not match:
+                continue
+            route.hits += 1
+
+            fields = resolve_fields(route.name, match.groupdict())
+            key = (fields[6], populated_count(fields), -route.rank)
+            if best_key is None or key > best_key:
+                best_key = key
+                best = (route.name, fields)
+
+        return best
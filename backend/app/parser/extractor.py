@@ -3,21 +3,23 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from typing import NamedTuple, Protocol
 
-from app.parser.postprocess import (
-    clean_price,
-    compute_confidence,
-    maybe_number,
-    normalize_name,
-    normalize_unit,
-)
-from app.parser.regex_patterns import NOISE_PATTERNS, PATTERNS
+from app.parser.cache import LineCache
+from app.parser.dispatch import PatternDispatcher
+from app.parser.regex_patterns import NOISE_PATTERNS
 
 
-@dataclass
-class ParsedLine:
-    """Internal parsed representation for one candidate invoice line."""
+class ParsedLine(NamedTuple):
+    """Internal parsed representation for one candidate invoice line.
+
+    An immutable tuple subclass: results can be shared safely through the line
+    cache, instances carry no per-instance `__dict__`, and construction runs in C,
+    which matters for large batches.
+    """
 
     product_name: str | None
     quantity: float | None
@@ -28,73 +30,186 @@ class ParsedLine:
     raw_line: str
     confidence: float
 
+    def to_dict(self) -> dict[str, str | float | None]:
+        """Return fields in `ParsedItem` order, ready for JSON serialization."""
+        return {
+            "product_name": self.product_name,
+            "quantity": self.quantity,
+            "unit": self.unit,
+            "price": self.price,
+            "price_type": self.price_type,
+            "derived_unit_price": self.derived_unit_price,
+            "raw_line": self.raw_line,
+            "confidence": self.confidence,
+        }
+
+
+def _split_raw_line(line: str, result: list[str]) -> None:
+    """Append the candidate lines of one stripped, non-empty raw line to `result`."""
+    # If a line likely contains multiple items separated by commas/semicolons,
+    # split only when each part still looks product-like.
+    if ";" in line:
+        parts = [p.strip() for p in line.split(";") if p.strip()]
+        result.extend(parts)
+        return
+
+    if ", " in line and sum(ch.isdigit() for ch in line) >= 2:
+        parts = [p.strip() for p in line.split(", ") if p.strip()]
+        product_like_parts = [p for p in parts if any(c.isalpha() for c in p)]
+        if len(product_like_parts) > 1:
+            result.extend(product_like_parts)
+            return
+
+    result.append(line)
+
+
+# Longest raw line (between newlines) a `LineSplitter` buffers. Longer lines are
+# dropped and counted instead, which keeps streaming extraction in bounded memory;
+# JSON inputs (at most `MAX_CHARS_PER_ITEM` characters) never reach it.
+MAX_RAW_LINE_CHARS = 64 * 1024
+
+
+class LineSplitter:
+    """Incremental `split_candidate_lines`: feed text chunks, get back complete candidate lines.
+
+    Only the unfinished last line of the text seen so far is buffered, so a
+    line split across chunk boundaries (including a `\r\n` pair) comes out
+    exactly as if the whole text had been split at once.
+    """
+
+    def __init__(self, max_raw_line_chars: int = MAX_RAW_LINE_CHARS):
+        self.max_raw_line_chars = max_raw_line_chars
+        self.dropped_lines = 0
+        self._partial: list[str] = []
+        self._partial_chars = 0
+        self._dropping = False
+
+    def feed(self, text: str) -> list[str]:
+        """Return the candidate lines completed by `text`."""
+        text = text.replace("\r", "\n")
+        head, newline, tail = text.rpartition("\n")
+        result: list[str] = []
+        if newline:
+            if self._dropping:
+                self._dropping = False
+                head = head.partition("\n")[2]
+            else:
+                self._partial.append(head)
+                head = "".join(self._partial)
+            self._partial = []
+            self._partial_chars = 0
+            for line in head.split("\n"):
+                line = line.strip()
+                if line:
+                    _split_raw_line(line, result)
+        self._buffer(tail)
+        return result
+
+    def close(self) -> list[str]:
+        """Return the candidate lines of the final, unterminated line."""
+        result: list[str] = []
+        line = "".join(self._partial).strip()
+        self._partial = []
+        self._partial_chars = 0
+        if line and not self._dropping:
+            _split_raw_line(line, result)
+        self._dropping = False
+        return result
+
+    def _buffer(self, text: str) -> None:
+        if self._dropping or not text:
+            return
+        self._partial.append(text)
+        self._partial_chars += len(text)
+        if self._partial_chars > self.max_raw_line_chars:
+            self._partial = []
+            self._partial_chars = 0
+            self._dropping = True
+            self.dropped_lines += 1
+
 
 def split_candidate_lines(content: str) -> list[str]:
     """Split raw text into candidate lines, including basic multi-item line handling."""
-    normalized = content.replace("\r", "\n")
-    raw_lines = [line.strip() for line in normalized.split("\n") if line.strip()]
+    splitter = LineSplitter()
+    return splitter.feed(content) + splitter.close()
 
-    result: list[str] = []
-    for line in raw_lines:
-        # If a line likely contains multiple items separated by commas/semicolons,
-        # split only when each part still looks product-like.
-        if ";" in line:
-            parts = [p.strip() for p in line.split(";") if p.strip()]
-            result.extend(parts)
-            continue
 
-        if ", " in line and sum(ch.isdigit() for ch in line) >= 2:
-            parts = [p.strip() for p in line.split(", ") if p.strip()]
-            product_like_parts = [p for p in parts if any(c.isalpha() for c in p)]
-            if len(product_like_parts) > 1:
-                result.extend(product_like_parts)
-                continue
+TOO_SHORT = "too_short"
+NO_LETTERS = "no_letters"
 
-        result.append(line)
 
-    return result
+def compile_noise_classifier(noise_patterns: list[tuple[str, re.Pattern[str]]]) -> re.Pattern[str]:
+    """Merge noise rules into one alternation with a named branch per rule.
 
+    A leading branch matches lines without any letters, so one `search` call
+    covers every rule. Rules starting with a word boundary share one word-boundary
+    check so the engine rejects most positions before trying any branch.
+    """
+    bounded: list[str] = []
+    others: list[str] = []
+    for name, pattern in noise_patterns:
+        if pattern.pattern.startswith(r"\b"):
+            bounded.append(f"(?P<{name}>{pattern.pattern[2:]})")
+        else:
+            others.append(f"(?P<{name}>{pattern.pattern})")
 
-def is_noise_line(line: str) -> bool:
-    """Return True when a line looks like metadata/noise instead of a product line."""
+    branches = [rf"(?P<{NO_LETTERS}>\A[\W\d_]*\Z)"]
+    if bounded:
+        branches.append(r"\b(?:" + "|".join(bounded) + ")")
+    branches.extend(others)
+    return re.compile("|".join(branches), re.IGNORECASE)
+
+
+NOISE_CLASSIFIER = compile_noise_classifier(NOISE_PATTERNS)
+
+
+def classify_noise(line: str) -> str | None:
+    """Return the name of the noise rule a line triggers, or None for product-like lines."""
     lowered = line.lower().strip()
     if len(lowered) < 3:
-        return True
-    if all(not ch.isalpha() for ch in lowered):
-        return True
-    return any(pattern.search(lowered) for pattern in NOISE_PATTERNS)
-
-
-def _extract_with_pattern(line: str, pattern_name: str, match: re.Match[str]) -> ParsedLine:
-    """Map a regex match into normalized fields and compute confidence."""
-    groups = match.groupdict()
-
-    name = normalize_name(groups.get("name"))
-    qty = maybe_number(groups.get("qty"))
-    unit = normalize_unit(groups.get("unit") or groups.get("price_unit"))
-    price = clean_price(groups.get("price"))
-
-    price_type: str | None = None
-    if pattern_name in {"paren_qty_at_price", "qty_price_slash_unit"}:
-        price_type = "unit"
-    elif pattern_name in {"dash_price_paren_qty", "fallback_name_price"}:
-        price_type = "total"
-    elif pattern_name == "name_qty_unit_price":
-        price_type = "total" if qty and qty > 1 else "unit"
-
-    derived_unit_price = None
-    if price is not None and qty and qty > 0 and price_type == "total":
-        derived_unit_price = round(price / qty, 4)
-
-    fields = {
-        "product_name": name,
-        "quantity": qty,
-        "unit": unit,
-        "price": price,
-        "price_type": price_type,
-    }
-    confidence = compute_confidence(fields, pattern_name)
+        return TOO_SHORT
+
+    match = NOISE_CLASSIFIER.search(lowered)
+    if match:
+        return match.lastgroup
 
+    # `[\W\d_]` treats a few non-letter symbols (superscripts, fractions) as word
+    # characters; confirm letters are really present for non-ASCII lines.
+    if not lowered.isascii() and not any(map(str.isalpha, lowered)):
+        return NO_LETTERS
+    return None
+
+
+def is_noise_line(line: str) -> bool:
+    """Return True when a line looks like metadata/noise instead of a product line."""
+    return classify_noise(line) is not None
+
+
+def noise_statistics(lines: Iterable[str]) -> Counter[str]:
+    """Count how many lines each noise rule filtered out."""
+    stats: Counter[str] = Counter()
+    for line in lines:
+        rule = classify_noise(line)
+        if rule is not None:
+            stats[rule] += 1
+    return stats
+
+
+DISPATCHER = PatternDispatcher()
+
+
+def extract_from_line(line: str) -> ParsedLine | None:
+    """Parse one candidate line and resolve pattern conflicts by confidence score."""
+    if is_noise_line(line):
+        return None
+
+    # Conflict resolution: the dispatcher keeps the highest-confidence candidate.
+    # If tie, it prefers the one with more populated fields then earlier pattern order.
+    selected = DISPATCHER.select(line)
+    if selected is None:
+        return None
+
+    _, (name, qty, unit, price, price_type, derived_unit_price, confidence) = selected
     return ParsedLine(
         product_name=name,
         quantity=qty,
@@ -107,50 +222,262 @@ def _extract_with_pattern(line: str, pattern_name: str, match: re.Match[str]) ->
     )
 
 
-def extract_from_line(line: str) -> ParsedLine | None:
-    """Parse one candidate line and resolve pattern conflicts by confidence score."""
-    if is_noise_line(line):
-        return None
+_line_cache: LineCache[ParsedLine] | None = None
 
-    candidates: list[ParsedLine] = []
 
-    for pattern_name, pattern in PATTERNS:
-        match = pattern.match(line)
-        if not match:
-            continue
-        candidates.append(_extract_with_pattern(line, pattern_name, match))
+def configure_line_cache(maxsize: int | None) -> LineCache[ParsedLine] | None:
+    """Enable the per-line result cache with `maxsize` entries, or disable it with 0/None."""
+    global _line_cache
+    _line_cache = LineCache(maxsize) if maxsize else None
+    return _line_cache
 
-    if not candidates:
-        return None
 
-    # Conflict resolution: keep the highest-confidence candidate.
-    # If tie, prefer the one with more populated fields then earlier pattern order.
-    best = sorted(
-        candidates,
-        key=lambda c: (
-            c.confidence,
-            sum(
-                value is not None and value != ""
-                for value in [
-                    c.product_name,
-                    c.quantity,
-                    c.unit,
-                    c.price,
-                    c.price_type,
-                ]
-            ),
-        ),
-        reverse=True,
-    )[0]
-    return best
+def get_line_cache() -> LineCache[ParsedLine] | None:
+    """Return the active per-line result cache, if enabled."""
+    return _line_cache
+
+
+def cached_extract_from_line(line: str) -> ParsedLine | None:
+    """Run `extract_from_line` through the line cache when it is enabled."""
+    cache = _line_cache
+    if cache is None:
+        return extract_from_line(line)
+
+    key = line.strip()
+    parsed = cache.get_or_compute(key, extract_from_line)
+    if parsed is not None and key != line:
+        # Matching ignores surrounding whitespace; only `raw_line` differs.
+        parsed = parsed._replace(raw_line=line)
+    return parsed
+
+
+class ExtractionLimits(NamedTuple):
+    """Bounds on the work one line and one document may cost.
+
+    Every pattern pairs a lazy product name with scans anchored at the end of
+    the line, so matching time grows superlinearly with line length and with
+    long runs of digits or whitespace. Lines over `max_line_chars`, or with a
+    digit/comma or whitespace run longer than `max_line_run`, are skipped before
+    any pattern runs. A document stops after `document_budget` CPU seconds
+    (0 disables the budget) and keeps the items found so far.
+    """
+
+    max_line_chars: int = 512
+    max_line_run: int = 64
+    document_budget: float = 1.0
+
+
+LINE_TOO_LONG = "line_too_long"
+LINE_TOO_COMPLEX = "line_too_complex"
+TIME_BUDGET_EXCEEDED = "time_budget_exceeded"
+
+
+def _compile_run_check(max_run: int) -> re.Pattern[str]:
+    return re.compile(rf"[\d,]{{{max_run + 1},}}|\s{{{max_run + 1},}}")
+
+
+_limits = ExtractionLimits()
+_long_run = _compile_run_check(_limits.max_line_run)
+
+
+def configure_extraction_limits(limits: ExtractionLimits) -> ExtractionLimits:
+    """Set the line gate and document time budget used by every extraction path."""
+    global _limits, _long_run
+    _limits = limits
+    _long_run = _compile_run_check(limits.max_line_run)
+    return _limits
+
+
+def get_extraction_limits() -> ExtractionLimits:
+    """Return the active extraction limits."""
+    return _limits
+
+
+def gate_line(line: str) -> str | None:
+    """Return why a line is too expensive to match (a warning code), or None."""
+    if len(line) > _limits.max_line_chars:
+        return LINE_TOO_LONG
+    if _long_run.search(line) is not None:
+        return LINE_TOO_COMPLEX
+    return None
 
 
 def extract_items(content: str) -> list[ParsedLine]:
-    """Run the full extraction pipeline on input text and return parsed product lines."""
-    lines = split_candidate_lines(content)
-    items: list[ParsedLine] = []
-    for line in lines:
-        parsed = extract_from_line(line)
-        if parsed:
-            items.append(parsed)
-    return items
+    """Run the full extraction pipeline on input text and return parsed product lines.
+
+    Lines rejected by the active line gate are skipped, but the document time
+    budget does not apply, so the result is never cut short. Use
+    `BatchExtractor.extract` for bounded extraction that reports both.
+    """
+    return list(iter_items(content))
+
+
+class TextReader(Protocol):
+    """Text file-like object (`io.TextIOBase`, `io.StringIO`, ...)."""
+
+    def read(self, size: int = -1, /) -> str: ...
+
+
+# Characters read per `read()` call when `iter_items` is given a file-like object.
+CHUNK_CHARS = 64 * 1024
+
+
+def _iter_chunks(source: str | TextReader | Iterable[str], chunk_size: int) -> Iterator[str]:
+    if isinstance(source, str):
+        yield source
+    elif hasattr(source, "read"):
+        while chunk := source.read(chunk_size):
+            yield chunk
+    else:
+        yield from source
+
+
+def iter_items(source: str | TextReader | Iterable[str], chunk_size: int = CHUNK_CHARS) -> Iterator[ParsedLine]:
+    """Lazily yield parsed product lines from a string, a text file-like object or str chunks.
+
+    File-like objects are read `chunk_size` characters at a time and iterables
+    are consumed one chunk at a time; only the current chunk and the unfinished
+    line are held, so memory stays bounded however large the document. Gated
+    lines are skipped, but the document time budget does not apply: a stream
+    has no way to report where it stopped, so it always runs to the end. Use
+    `ItemStream` directly for bounded extraction with warnings.
+    """
+    stream = ItemStream(BatchExtractor(memoize=False), budget=0)
+    for chunk in _iter_chunks(source, chunk_size):
+        yield from stream.feed(chunk)
+    yield from stream.close()
+
+
+_UNSEEN = object()
+
+
+class BatchExtractor:
+    """Run `extract_items` over several documents, extracting each distinct line once.
+
+    Invoices in one batch repeat lines (the same products, headers and totals),
+    so results are memoized by exact line text for the lifetime of the batch
+    (`memoize=False` turns this off for unbounded streams). `lines` and
+    `duplicate_lines` count candidate lines seen and memo hits; `gated_lines`
+    and `truncated_documents` count work skipped by the limits.
+    """
+
+    def __init__(self, memoize: bool = True) -> None:
+        self._memo: dict[str, ParsedLine | None] | None = {} if memoize else None
+        self.lines = 0
+        self.duplicate_lines = 0
+        self.gated_lines = 0
+        self.truncated_documents = 0
+
+    def parse_line(self, line: str, warnings: dict[str, int]) -> ParsedLine | None:
+        """Parse one candidate line through the memo and the line gate."""
+        memo = self._memo
+        if memo is not None:
+            parsed = memo.get(line, _UNSEEN)
+            if parsed is not _UNSEEN:
+                self.duplicate_lines += 1
+                return parsed
+        reason = gate_line(line)
+        if reason is not None:
+            warnings[reason] = warnings.get(reason, 0) + 1
+            self.gated_lines += 1
+            return None
+        parsed = cached_extract_from_line(line)
+        if memo is not None:
+            memo[line] = parsed
+        return parsed
+
+    def extract(self, content: str) -> tuple[list[ParsedLine], dict[str, int]]:
+        """Return the items of one document and warning counts by code.
+
+        Gated lines are counted under `LINE_TOO_LONG` / `LINE_TOO_COMPLEX`;
+        when the time budget runs out, `TIME_BUDGET_EXCEEDED` holds the number
+        of lines left unparsed and the items found so far are returned.
+        """
+        stream = ItemStream(self)
+        items = stream.feed(content)
+        items.extend(stream.close())
+        return items, stream.warnings
+
+    def extract_items(self, content: str) -> list[ParsedLine]:
+        """Same result as the module-level `extract_items`, sharing work across calls.
+
+        Like it, this runs without the time budget; `extract` applies it.
+        """
+        stream = ItemStream(self, budget=0)
+        items = stream.feed(content)
+        items.extend(stream.close())
+        return items
+
+    def counts(self) -> dict[str, int]:
+        """Return the line and document counters."""
+        return {
+            "lines": self.lines,
+            "duplicate_lines": self.duplicate_lines,
+            "gated_lines": self.gated_lines,
+            "truncated_documents": self.truncated_documents,
+        }
+
+
+class ItemStream:
+    """Push-style extraction of one document that arrives as text chunks.
+
+    `feed` and `close` return the items completed by each chunk and fill
+    `warnings` like `BatchExtractor.extract`. The CPU budget (default: the
+    active `document_budget`) is charged per call from that call's own thread,
+    so successive chunks may be fed from different worker threads.
+    """
+
+    def __init__(self, extractor: BatchExtractor | None = None, budget: float | None = None):
+        self.extractor = extractor if extractor is not None else BatchExtractor(memoize=False)
+        self.budget = _limits.document_budget if budget is None else budget
+        self.warnings: dict[str, int] = {}
+        self.truncated = False
+        self._splitter = LineSplitter()
+        self._dropped = 0
+        self._spent = 0.0
+
+    def feed(self, text: str) -> list[ParsedLine]:
+        """Parse the candidate lines completed by `text`."""
+        return self._extract(self._splitter.feed(text))
+
+    def close(self) -> list[ParsedLine]:
+        """Parse the final, unterminated line."""
+        return self._extract(self._splitter.close())
+
+    def _extract(self, lines: list[str]) -> list[ParsedLine]:
+        extractor = self.extractor
+        warnings = self.warnings
+        dropped = self._splitter.dropped_lines - self._dropped
+        if dropped:
+            self._dropped += dropped
+            warnings[LINE_TOO_LONG] = warnings.get(LINE_TOO_LONG, 0) + dropped
+            extractor.gated_lines += dropped
+        extractor.lines += len(lines)
+        if self.truncated:
+            if lines:
+                warnings[TIME_BUDGET_EXCEEDED] += len(lines)
+            return []
+
+        started = time.thread_time()
+        deadline = started + self.budget - self._spent if self.budget else None
+        items: list[ParsedLine] = []
+        for position, line in enumerate(lines):
+            if deadline is not None and time.thread_time() > deadline:
+                warnings[TIME_BUDGET_EXCEEDED] = len(lines) - position
+                extractor.truncated_documents += 1
+                self.truncated = True
+                break
+            parsed = extractor.parse_line(line, warnings)
+            if parsed:
+                items.append(parsed)
+        self._spent += time.thread_time() - started
+        return items
+
+
+def extract_batch(
+    contents: list[str],
+) -> tuple[list[tuple[list[ParsedLine], dict[str, int]]], dict[str, int]]:
+    """Parse `contents` with one `BatchExtractor`; returns `(items, warnings)` per document and counters."""
+    extractor = BatchExtractor()
+    results = [extractor.extract(content) for content in contents]
+    return results, extractor.counts()
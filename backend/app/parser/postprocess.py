@@ -4,6 +4,9 @@ from __future__ import annotations
 import re
 from typing import Any
 
+_CURRENCY_RE = re.compile(r"(?i)(rs\.?|pkr|usd|\$)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 UNIT_MAP = {
     "kg": "kg",
@@ -35,7 +38,7 @@ def clean_price(value: str | None) -> float | None:
     """Normalize currency/commas in a price string and return a float when valid."""
     if not value:
         return None
-    cleaned = re.sub(r"(?i)(rs\.?|pkr|usd|\$)", "", value)
+    cleaned = _CURRENCY_RE.sub("", value)
     cleaned = cleaned.replace(",", "").strip()
     try:
         return float(cleaned)
@@ -55,7 +58,7 @@ def normalize_name(name: str | None) -> str | None:
     """Trim punctuation/extra spaces and return a clean product name."""
     if not name:
         return None
-    normalized = re.sub(r"\s+", " ", name).strip(" -:,.\t")
+    normalized = _WHITESPACE_RE.sub(" ", name).strip(" -:,.\t")
     return normalized if normalized else None
 
 
@@ -88,3 +91,4 @@ def compute_confidence(fields: dict[str, Any], pattern_name: str) -> float:
         score += 0.05
 
     return max(0.0, min(1.0, round(score, 3)))
+
@@ -1,7 +1,9 @@
 """Regex definitions and noise filters used by the extraction engine."""
 
 from __future__ import annotations
+import hashlib
 import re
+from dataclasses import dataclass
 
 
 # Order matters: more explicit patterns first.
@@ -65,10 +67,73 @@ PATTERNS: list[tuple[str, re.Pattern[str]]] = [
 ]
 
 
-NOISE_PATTERNS: list[re.Pattern[str]] = [
-    re.compile(r"\binvoice\s*(no|#|number)?\b", re.IGNORECASE),
-    re.compile(r"\b(ntn|strn|tax|vat|gst)\b", re.IGNORECASE),
-    re.compile(r"\btotal\s*(amount|due|tax)?\b", re.IGNORECASE),
-    re.compile(r"\baddress\b", re.IGNORECASE),
-    re.compile(r"^\s*\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\s*$", re.IGNORECASE),
+# Named like PATTERNS so the combined noise classifier can report which rule fired.
+NOISE_PATTERNS: list[tuple[str, re.Pattern[str]]] = [
+    ("invoice_number", re.compile(r"\binvoice\s*(no|#|number)?\b", re.IGNORECASE)),
+    ("tax_id", re.compile(r"\b(ntn|strn|tax|vat|gst)\b", re.IGNORECASE)),
+    ("total", re.compile(r"\btotal\s*(amount|due|tax)?\b", re.IGNORECASE)),
+    ("address", re.compile(r"\baddress\b", re.IGNORECASE)),
+    ("date", re.compile(r"^\s*\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\s*$", re.IGNORECASE)),
 ]
+
+
+@dataclass(frozen=True)
+class Prefilter:
+    """Cheap necessary conditions a line must meet before a pattern is run.
+
+    `required` holds groups of literals searched in the lowercased line; every
+    group needs at least one hit. `hint` is a short regex that must be found
+    somewhere in the line. `tail` constrains the last non-space character:
+    `"price"` (decimal digit or comma), `"word"` (ASCII letter) or a literal.
+    """
+
+    required: tuple[tuple[str, ...], ...] = ()
+    hint: re.Pattern[str] | None = None
+    tail: str = ""
+
+
+_PRICE_AFTER_SEPARATOR = re.compile(r"[\-–:]\s*(?:rs\.?|pkr|\$)?\s*[\d,]", re.IGNORECASE)
+# The `<price>/<unit>` tail `qty_price_slash_unit` must end with. Checking it up
+# front keeps that pattern's nested lazy scans from running (superlinearly) on
+# lines that can never match.
+_PRICE_PER_UNIT_TAIL = re.compile(r"[\d,]\s*/\s*[A-Za-z]+\s*$", re.IGNORECASE)
+
+# Keep in sync with PATTERNS: a prefilter may only reject lines that the
+# pattern itself could never match (see `app.parser.dispatch`).
+PATTERN_PREFILTERS: dict[str, Prefilter] = {
+    "qty_price_slash_unit": Prefilter(
+        required=(("qty", "quantity"), ("/",)), hint=_PRICE_PER_UNIT_TAIL, tail="word"
+    ),
+    "paren_qty_at_price": Prefilter(required=(("(",), ("@",)), tail=")"),
+    "dash_price_paren_qty": Prefilter(
+        required=(("(",),), hint=_PRICE_AFTER_SEPARATOR, tail=")"
+    ),
+    "name_qty_unit_price": Prefilter(hint=re.compile(r"\s\d"), tail="price"),
+    "fallback_name_price": Prefilter(hint=_PRICE_AFTER_SEPARATOR, tail="price"),
+}
+
+
+# Bump when extraction output changes for reasons the tables above do not
+# capture (postprocessing, confidence scoring, line splitting).
+PARSER_VERSION = 1
+
+
+def parser_fingerprint(
+    patterns: list[tuple[str, re.Pattern[str]]] | None = None,
+    noise_patterns: list[tuple[str, re.Pattern[str]]] | None = None,
+) -> str:
+    """Return a short hash of `PARSER_VERSION`, `PATTERNS` and `NOISE_PATTERNS`.
+
+    Anything cached by parser output is keyed with this value, so editing a
+    pattern (its source or flags) or the noise rules invalidates it.
+    """
+    digest = hashlib.sha256(f"parser/v{PARSER_VERSION}".encode("utf-8"))
+    tables = (
+        PATTERNS if patterns is None else patterns,
+        NOISE_PATTERNS if noise_patterns is None else noise_patterns,
+    )
+    for table in tables:
+        digest.update(b"\x00table")
+        for name, pattern in table:
+            digest.update(f"\x00{name}\x00{pattern.flags}\x00{pattern.pattern}".encode("utf-8"))
+    return digest.hexdigest()[:16]
@@ -43,11 +43,78 @@ class ParseResult(BaseModel):
     items: list[ParsedItem]
 
 
+class ParseWarning(BaseModel):
+    """Extraction limit hit while parsing one input.
+
+    `line_too_long` / `line_too_complex` count lines skipped by the per-line gate;
+    `time_budget_exceeded` means the input was cut short and `lines` were not parsed.
+    """
+
+    input_index: int
+    code: Literal["line_too_long", "line_too_complex", "time_budget_exceeded"]
+    lines: int
+
+
 class ParseResponse(BaseModel):
     """Standard parse response containing deterministic request id and results."""
 
     request_id: str
     results: list[ParseResult]
+    warnings: list[ParseWarning] = []
+
+
+class ParseStreamTrailer(BaseModel):
+    """Final NDJSON line of `/parse/stream` with the deterministic request id."""
+
+    request_id: str
+    result_count: int
+    warnings: list[ParseWarning] = []
+
+
+class ParseUploadTrailer(BaseModel):
+    """Final NDJSON line of `/parse/upload`, after one `ParsedItem` per line."""
+
+    request_id: str
+    item_count: int
+    warnings: list[ParseWarning] = []
+
+
+class ParseSessionRequest(BaseModel):
+    """Document that opens an incremental parse session."""
+
+    content: str
+
+
+class LineEdit(BaseModel):
+    """Replace `delete` lines at `start` with `insert` (line indices after earlier edits)."""
+
+    start: int = Field(ge=0)
+    delete: int = Field(default=0, ge=0)
+    insert: list[str] = []
+
+
+class ParseSessionPatch(BaseModel):
+    """Line edits made against the session state identified by `base_request_id`."""
+
+    base_request_id: str
+    edits: list[LineEdit]
+
+
+class SessionLineResult(BaseModel):
+    """Items parsed from one raw line of a session document."""
+
+    line: int
+    items: list[ParsedItem]
+
+
+class ParseSessionResponse(BaseModel):
+    """Session state after a create or edit; `lines` holds only re-parsed lines on edits."""
+
+    session_id: str
+    request_id: str
+    line_count: int
+    lines: list[SessionLineResult]
+    warnings: list[ParseWarning] = []
 
 
 class ParseImageResponse(ParseResponse):
@@ -57,6 +124,77 @@ class ParseImageResponse(ParseResponse):
     filename: str
 
 
+class ImagePageResult(ParseResult):
+    """Parsed items for one page; `input_index` numbers pages across the request."""
+
+    page_index: int
+    extracted_text: str
+
+
+class ImageFileResult(BaseModel):
+    """OCR and parse results for every page of one uploaded file."""
+
+    file_index: int
+    filename: str
+    page_count: int
+    pages: list[ImagePageResult]
+
+
+class ParseImagesResponse(BaseModel):
+    """Response of `/parse-images` with per-file and per-page results.
+
+    `warnings` use the request-wide page `input_index`.
+    """
+
+    request_id: str
+    files: list[ImageFileResult]
+    warnings: list[ParseWarning] = []
+
+
+class JobImage(BaseModel):
+    """One image of an OCR job, base64-encoded."""
+
+    filename: str
+    data: str = Field(description="Base64-encoded PNG, JPEG, WEBP or (multi-page) TIFF")
+
+
+class JobRequest(BaseModel):
+    """Background job: `parse` takes `content` or `contents`, `ocr` takes `images`."""
+
+    kind: Literal["parse", "ocr"]
+    priority: int = Field(default=0, description="Higher runs first")
+    content: str | None = None
+    contents: list[str] | None = None
+    images: list[JobImage] | None = None
+
+    @model_validator(mode="after")
+    def validate_inputs(cls, values: "JobRequest") -> "JobRequest":
+        """Ensure the inputs match the job kind."""
+        if values.kind == "parse":
+            if (values.content is None) == (values.contents is None) or values.images is not None:
+                raise ValueError("Parse jobs take either 'content' or 'contents'.")
+        elif not values.images or values.content is not None or values.contents is not None:
+            raise ValueError("OCR jobs take a non-empty 'images' list.")
+        return values
+
+
+class JobStatus(BaseModel):
+    """Progress of a background job; `results` holds the inputs finished so far from `offset` on."""
+
+    job_id: str
+    kind: Literal["parse", "ocr"]
+    status: Literal["queued", "running", "succeeded", "failed"]
+    priority: int
+    total: int
+    completed: int
+    request_id: str | None = None
+    error: str | None = None
+    created_at: float
+    updated_at: float
+    results: list[ParseResult] = []
+    warnings: list[ParseWarning] = []
+
+
 class ExportXlsxRequest(BaseModel):
     """Request schema for exporting parsed results to an Excel file."""
 
@@ -67,3 +205,22 @@ class HealthResponse(BaseModel):
     """Simple health-check response model."""
 
     status: str = "ok"
+
+
+class MetricsResponse(BaseModel):
+    """In-process counters; sections are `null` when the feature is disabled."""
+
+    line_cache: dict[str, int] | None = None
+    parse_cache: dict[str, float] | None = None
+    parse_dedupe: dict[str, int] | None = None
+    parse_sessions: dict[str, int] | None = None
+    jobs: dict[str, int] | None = None
+    ocr: dict[str, float] | None = None
+    ocr_cache: dict[str, float] | None = None
+    preprocess: dict[str, float] | None = None
+
+
+class PurgeResponse(BaseModel):
+    """Number of entries removed by an admin cache purge."""
+
+    removed: int
@@ -0,0 +1,415 @@
+"""Offline bulk parsing of archived invoice text, for backfills outside the HTTP API.
+
+Documents come from directories (one file per document), JSONL files (one
+object per line) or concatenated text files (documents separated by a
+separator string). JSONL and concatenated files are scanned through `mmap`
+and only byte spans are sent to worker processes, which map the files
+themselves; each worker parses a chunk of documents with one
+`BatchExtractor` and returns the rendered output bytes.
+
+Output is NDJSON (one `ParseResult` per document plus its `document` id) or
+CSV (one row per item), in input order or in completion order. With a
+checkpoint file, the output offset, the index below which every document is
+written (`watermark`) and the written documents above it (`done`) are saved
+after each flush, so an interrupted run resumes by truncating the output to
+that offset and skipping the documents already written.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import json
+import mmap
+import multiprocessing
+import os
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, as_completed, wait
+from pathlib import Path
+from typing import IO, Any, NamedTuple
+
+from app.parser import parser_fingerprint
+from app.parser.extractor import (
+    TIME_BUDGET_EXCEEDED,
+    BatchExtractor,
+    ExtractionLimits,
+    configure_extraction_limits,
+    get_extraction_limits,
+)
+from app.services.excel import HEADERS
+from app.services.serialize import dump_json
+
+INPUT_FORMATS = ("auto", "dir", "jsonl", "text")
+OUTPUT_FORMATS = ("ndjson", "csv")
+CSV_HEADERS = ["input_index", "document", *HEADERS[1:]]
+CHECKPOINT_VERSION = 2
+
+
+class DocumentRef(NamedTuple):
+    """Where one document's text lives: a whole file, or a byte span of a mapped file."""
+
+    index: int
+    document: str
+    kind: str  # "file", "jsonl" or "text"
+    path: str
+    start: int = 0
+    end: int = 0
+
+
+class BulkOptions(NamedTuple):
+    """Per-document options shared with the worker processes."""
+
+    output_format: str = "ndjson"
+    text_field: str = "content"
+    id_field: str | None = None
+
+
+class ChunkResult(NamedTuple):
+    """Rendered output of one chunk of documents and its counters."""
+
+    indices: list[int]
+    body: bytes
+    items: int
+    errors: int
+    bytes_read: int
+    truncated: int = 0  # documents cut short by the time budget
+    gated: int = 0  # documents with lines skipped by the line gate
+
+
+def _map(path: Path) -> mmap.mmap | None:
+    with path.open("rb") as handle:
+        try:
+            return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+
+
+def _spans(data: mmap.mmap, separator: bytes, keep_empty: bool = False) -> Iterator[tuple[int, int]]:
+    """Yield the `(start, end)` spans of `data` between separators, skipping empty ones unless asked."""
+    start = 0
+    size = len(data)
+    while start < size:
+        end = data.find(separator, start)
+        if end < 0:
+            end = size
+        if end > start or keep_empty:
+            yield start, end
+        start = end + len(separator)
+
+
+def detect_format(path: Path) -> str:
+    """Guess the input format of one path: directory, JSONL (by suffix) or concatenated text."""
+    if path.is_dir():
+        return "dir"
+    if path.suffix.lower() in (".jsonl", ".ndjson"):
+        return "jsonl"
+    return "text"
+
+
+def iter_documents(
+    paths: Iterable[str | Path],
+    input_format: str = "auto",
+    pattern: str = "*.txt",
+    separator: str = "\f",
+    start_index: int = 0,
+) -> Iterator[DocumentRef]:
+    """Enumerate the documents of every input path, numbered in a stable order.
+
+    Directories are walked recursively in sorted order (files matching
+    `pattern`), JSONL files yield one document per non-blank line and text
+    files one per non-empty `separator`-delimited span.
+    """
+    index = start_index
+    sep = separator.encode("utf-8")
+    for raw_path in paths:
+        path = Path(raw_path)
+        kind = detect_format(path) if input_format == "auto" else input_format
+        if kind == "dir":
+            for file in sorted(path.rglob(pattern)):
+                if file.is_file():
+                    yield DocumentRef(index, str(file.relative_to(path)), "file", str(file))
+                    index += 1
+            continue
+        data = _map(path)
+        if data is None:
+            continue
+        with data:
+            if kind == "jsonl":
+                for line_number, (start, end) in enumerate(_spans(data, b"\n", keep_empty=True), start=1):
+                    if data[start:end].strip():
+                        yield DocumentRef(index, f"{path.name}:{line_number}", "jsonl", str(path), start, end)
+                        index += 1
+            else:
+                for number, (start, end) in enumerate(_spans(data, sep)):
+                    yield DocumentRef(index, f"{path.name}#{number}", "text", str(path), start, end)
+                    index += 1
+
+
+_mapped: dict[str, mmap.mmap] = {}
+
+
+def _load(ref: DocumentRef, options: BulkOptions) -> tuple[str, str, str | None, int]:
+    """Return `(document id, text, error, bytes read)` for one document."""
+    if ref.kind == "file":
+        data = Path(ref.path).read_bytes()
+    else:
+        mapped = _mapped.get(ref.path)
+        if mapped is None:
+            mapped = _mapped[ref.path] = _map(Path(ref.path))
+        data = mapped[ref.start:ref.end]
+    text = data.decode("utf-8", errors="replace")
+    if ref.kind != "jsonl":
+        return ref.document, text, None, len(data)
+    try:
+        record = json.loads(text)
+        document = str(record[options.id_field]) if options.id_field else ref.document
+        content = record[options.text_field]
+    except (ValueError, KeyError, TypeError) as exc:
+        return ref.document, "", f"{type(exc).__name__}: {exc}", len(data)
+    if not isinstance(content, str):
+        return document, "", f"Field {options.text_field!r} is not a string.", len(data)
+    return document, content, None, len(data)
+
+
+def parse_chunk(refs: list[DocumentRef], options: BulkOptions) -> ChunkResult:
+    """Parse a chunk of documents and render them in the output format."""
+    extractor = BatchExtractor()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n") if options.output_format == "csv" else None
+    item_fields = HEADERS[1:]
+    item_count = errors = bytes_read = truncated = gated = 0
+    for ref in refs:
+        document, text, error, size = _load(ref, options)
+        bytes_read += size
+        items, warnings = extractor.extract(text) if error is None else ([], {})
+        item_count += len(items)
+        errors += error is not None
+        truncated += TIME_BUDGET_EXCEEDED in warnings
+        gated += any(code != TIME_BUDGET_EXCEEDED for code in warnings)
+        if writer is not None:
+            for item in items:
+                writer.writerow([ref.index, document, *[getattr(item, field) for field in item_fields]])
+            continue
+        record: dict[str, Any] = {
+            "input_index": ref.index,
+            "document": document,
+            "items": [item.to_dict() for item in items],
+        }
+        if warnings:
+            record["warnings"] = warnings
+        if error is not None:
+            record["error"] = error
+        buffer.write(dump_json(record) + "\n")
+    return ChunkResult(
+        [ref.index for ref in refs],
+        buffer.getvalue().encode("utf-8"),
+        item_count,
+        errors,
+        bytes_read,
+        truncated,
+        gated,
+    )
+
+
+def _init_worker(limits: ExtractionLimits) -> None:
+    configure_extraction_limits(limits)
+
+
+def _chunks(refs: Iterable[DocumentRef], size: int) -> Iterator[list[DocumentRef]]:
+    chunk: list[DocumentRef] = []
+    for ref in refs:
+        chunk.append(ref)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Progress:
+    """Which documents are written: everything below `watermark`, plus `done` above it."""
+
+    def __init__(self, watermark: int = 0, done: Iterable[int] = ()):
+        self.watermark = watermark
+        self.done = set(done)
+
+    def is_done(self, index: int) -> bool:
+        return index < self.watermark or index in self.done
+
+    def mark(self, indices: Iterable[int]) -> None:
+        self.done.update(indices)
+        while self.watermark in self.done:
+            self.done.remove(self.watermark)
+            self.watermark += 1
+
+
+class BulkStats:
+    """Running totals and throughput of one run."""
+
+    def __init__(
+        self,
+        documents: int = 0,
+        items: int = 0,
+        errors: int = 0,
+        truncated: int = 0,
+        gated: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.documents = documents
+        self.items = items
+        self.errors = errors
+        self.truncated = truncated
+        self.gated = gated
+        self.bytes_read = 0
+        self.new_documents = 0
+        self._clock = clock
+        self.started = clock()
+
+    def add(self, result: ChunkResult) -> None:
+        self.documents += len(result.indices)
+        self.new_documents += len(result.indices)
+        self.items += result.items
+        self.errors += result.errors
+        self.truncated += result.truncated
+        self.gated += result.gated
+        self.bytes_read += result.bytes_read
+
+    def summary(self) -> str:
+        elapsed = max(self._clock() - self.started, 1e-9)
+        return (
+            f"{self.documents} documents, {self.items} items, {self.errors} errors,"
+            f" {self.truncated} truncated, {self.gated} with gated lines;"
+            f" {self.new_documents / elapsed:.0f} docs/s, {self.bytes_read / elapsed / 1024 / 1024:.1f} MiB/s"
+            f" over {elapsed:.1f} s"
+        )
+
+
+def _input_state(path: Path, pattern: str) -> list[Any]:
+    """Size and mtime of an input file, or of every matching file under a directory."""
+    if path.is_dir():
+        files = [file for file in sorted(path.rglob(pattern)) if file.is_file()]
+        return [[str(file.relative_to(path)), *_input_state(file, pattern)] for file in files]
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def run_fingerprint(paths: Iterable[str | Path], pattern: str = "*.txt", **options: Any) -> str:
+    """Identify a run's inputs, options and parser version; a checkpoint only resumes the same run.
+
+    Inputs are identified by path, size and mtime (directories by their matching
+    file listing), so adding, removing or changing a document, which would shift
+    the document indices, invalidates the checkpoint.
+    """
+    inputs = [[str(Path(path).resolve()), _input_state(Path(path), pattern)] for path in paths]
+    spec = {"inputs": inputs, "pattern": pattern, "parser": parser_fingerprint(), **options}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def load_checkpoint(path: str | Path, fingerprint: str) -> dict[str, Any] | None:
+    """Return the saved state for `fingerprint`, None without a checkpoint, ValueError for another run."""
+    try:
+        state = json.loads(Path(path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    if state.get("version") != CHECKPOINT_VERSION or state.get("fingerprint") != fingerprint:
+        raise ValueError(f"Checkpoint {path} belongs to a different run; delete it to start over.")
+    return state
+
+
+def save_checkpoint(path: str | Path, state: dict[str, Any]) -> None:
+    """Write the checkpoint atomically (temp file, then rename)."""
+    target = Path(path)
+    temp = target.with_name(target.name + ".tmp")
+    temp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(temp, target)
+
+
+def run_bulk(
+    refs: Iterable[DocumentRef],
+    output: IO[bytes],
+    options: BulkOptions = BulkOptions(),
+    workers: int = 0,
+    chunk_size: int = 256,
+    ordered: bool = True,
+    progress: Progress | None = None,
+    stats: BulkStats | None = None,
+    on_flush: Callable[[Progress, BulkStats], None] | None = None,
+    flush_seconds: float = 10.0,
+    start_method: str = "spawn",
+) -> BulkStats:
+    """Parse every document not yet in `progress` and write it to `output`.
+
+    `on_flush` is called after the output is flushed (every `flush_seconds`,
+    and once at the end or on interruption) with the written progress; it is
+    where checkpoints are saved and throughput is reported.
+    """
+    progress = progress or Progress()
+    stats = stats or BulkStats()
+    chunks = _chunks((ref for ref in refs if not progress.is_done(ref.index)), chunk_size)
+    flush_at = time.monotonic() + flush_seconds
+
+    def write(result: ChunkResult) -> None:
+        nonlocal flush_at
+        output.write(result.body)
+        progress.mark(result.indices)
+        stats.add(result)
+        if time.monotonic() >= flush_at:
+            flush()
+            flush_at = time.monotonic() + flush_seconds
+
+    def flush() -> None:
+        output.flush()
+        if on_flush is not None:
+            on_flush(progress, stats)
+
+    try:
+        if workers <= 1:
+            for chunk in chunks:
+                write(parse_chunk(chunk, options))
+        else:
+            _run_pool(chunks, options, workers, ordered, start_method, write)
+    finally:
+        flush()
+    return stats
+
+
+def _run_pool(
+    chunks: Iterator[list[DocumentRef]],
+    options: BulkOptions,
+    workers: int,
+    ordered: bool,
+    start_method: str,
+    write: Callable[[ChunkResult], None],
+) -> None:
+    """Keep about four chunks per worker in flight and write results in input or completion order."""
+    window = workers * 4
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(start_method),
+        initializer=_init_worker,
+        initargs=(get_extraction_limits(),),
+    )
+    try:
+        if ordered:
+            queue: deque[Future[ChunkResult]] = deque()
+            for chunk in chunks:
+                queue.append(executor.submit(parse_chunk, chunk, options))
+                if len(queue) >= window:
+                    write(queue.popleft().result())
+            while queue:
+                write(queue.popleft().result())
+        else:
+            pending: set[Future[ChunkResult]] = set()
+            for chunk in chunks:
+                pending.add(executor.submit(parse_chunk, chunk, options))
+                if len(pending) >= window:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        write(future.result())
+            for future in as_completed(pending):
+                write(future.result())
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
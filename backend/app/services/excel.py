@@ -1,14 +1,28 @@
-"""Excel export service for converting parsed results into XLSX bytes."""
+"""Excel export service for converting parsed results into XLSX files.
+
+Workbooks are written with openpyxl's write-only mode: rows are serialized as
+they are appended instead of being kept as cell objects, column widths and
+number formats are fixed up front, and the finished file is spooled (in memory
+while small, on disk beyond `SPOOL_MAX_BYTES`) and then sent in chunks.
+
+An XLSX file is a zip archive whose directory is written last, so the whole
+workbook is built before the first byte goes out: the response is chunked,
+not streamed as rows are produced. Memory stays flat; time to first byte does not.
+"""
 
 from __future__ import annotations
 
-from io import BytesIO
+from collections.abc import Iterable, Iterator, Mapping
+from tempfile import SpooledTemporaryFile
+from typing import IO, Any
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
 
 from app.schemas import ParseResult
 
-
 HEADERS = [
     "input_index",
     "product_name",
@@ -21,31 +35,81 @@ HEADERS = [
     "confidence",
 ]
 
+COLUMN_WIDTHS = [12, 28, 10, 8, 14, 11, 18, 48, 11]
+# Number formats for numeric columns, by header name.
+NUMBER_FORMATS = {
+    "price": "#,##0.00",
+    "derived_unit_price": "#,##0.00##",
+    "confidence": "0.00",
+}
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_BYTES = 1024 * 1024
 
-def build_xlsx_bytes(results: list[ParseResult]) -> bytes:
-    """Create an XLSX workbook from parsed results and return it as bytes."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "parsed_items"
 
-    ws.append(HEADERS)
+ExportResults = Iterable[ParseResult | Mapping[str, Any]]
 
+
+def iter_rows(results: ExportResults) -> Iterator[list]:
+    """Yield one export row per parsed item, in `HEADERS` order.
+
+    Results may be `ParseResult` models (request bodies) or the plain
+    `ParseResult`-shaped dicts kept by the result store.
+    """
+    item_fields = HEADERS[1:]
     for group in results:
-        for item in group.items:
-            ws.append(
-                [
-                    group.input_index,
-                    item.product_name,
-                    item.quantity,
-                    item.unit,
-                    item.price,
-                    item.price_type,
-                    item.derived_unit_price,
-                    item.raw_line,
-                    item.confidence,
-                ]
-            )
-
-    output = BytesIO()
+        if isinstance(group, Mapping):
+            input_index = group["input_index"]
+            for item in group["items"]:
+                yield [input_index, *[item.get(field) for field in item_fields]]
+        else:
+            input_index = group.input_index
+            for item in group.items:
+                yield [input_index, *[getattr(item, field) for field in item_fields]]
+
+
+def write_xlsx(results: ExportResults, output: IO[bytes]) -> None:
+    """Write parsed results as a write-only XLSX workbook into `output`."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("parsed_items")
+    for index, width in enumerate(COLUMN_WIDTHS, start=1):
+        ws.column_dimensions[get_column_letter(index)].width = width
+    ws.freeze_panes = "A2"
+
+    header_font = Font(bold=True)
+    header = []
+    for title in HEADERS:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = header_font
+        header.append(cell)
+    ws.append(header)
+
+    # Write-only rows are serialized on append, so one styled cell per column can be reused.
+    formatted = {}
+    for name, number_format in NUMBER_FORMATS.items():
+        cell = WriteOnlyCell(ws)
+        cell.number_format = number_format
+        formatted[HEADERS.index(name)] = cell
+
+    for row in iter_rows(results):
+        for column, cell in formatted.items():
+            value = row[column]
+            if value is not None:
+                cell.value = value
+                row[column] = cell
+        ws.append(row)
+
     wb.save(output)
-    return output.getvalue()
+
+
+def iter_xlsx_chunks(results: ExportResults, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Build the whole workbook into a spooled temp file, then yield it in `chunk_size` pieces.
+
+    Nothing is yielded until the workbook is complete (chunked output, not true streaming).
+    """
+    with SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as spool:
+        write_xlsx(results, spool)
+        spool.seek(0)
+        while chunk := spool.read(chunk_size):
+            yield chunk
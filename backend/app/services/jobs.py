@@ -0,0 +1,370 @@
+"""Background jobs for batches too large for one HTTP request, persisted in SQLite.
+
+`SQLiteJobStore` keeps each job (kind, priority, status, JSON payload) and its
+per-input results in one local SQLite file, so progress survives a restart:
+a job is resumed from the first input that has no stored result. Running jobs
+hold a lease that the runner renews on a heartbeat while an input is being
+processed; a job whose lease expired (its process died) is queued again by
+the next claim. Storing a result is idempotent, so a job that was re-claimed
+while its first worker was still busy finishes cleanly on both.
+
+`JobRunner` runs jobs on a small thread pool, highest priority first (oldest
+first within a priority), with an optional concurrency limit per job kind.
+No broker is involved: workers claim jobs straight from the store.
+"""
+
+from __future__ import annotations
+
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Container, Iterator
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from app.services.serialize import dump_json
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class Job(NamedTuple):
+    """One row of the job table.
+
+    `payload` is the decoded JSON the job was submitted with. Only `claim` loads
+    it; status reads leave it `None`, since it can hold megabytes of images.
+    """
+
+    job_id: str
+    kind: str
+    priority: int
+    status: str
+    total: int
+    completed: int
+    payload: dict[str, Any] | None
+    request_id: str | None
+    error: str | None
+    created_at: float
+    updated_at: float
+
+
+# (input index, `ParseResult`-shaped dict, warning counts by code) for one processed input.
+JobOutput = tuple[int, dict[str, Any], dict[str, int]]
+
+
+class JobKind(NamedTuple):
+    """How to run one kind of job.
+
+    `run(job, done)` yields a `JobOutput` for every input index not in `done`,
+    in order; `finish(job, results)` returns the request id of the complete,
+    ordered results. `concurrency` caps running jobs of this kind (0 = workers).
+    """
+
+    run: Callable[[Job, Container[int]], Iterator[JobOutput]]
+    finish: Callable[[Job, list[dict[str, Any]]], str]
+    concurrency: int = 0
+
+
+_JOB_COLUMNS = "job_id, kind, priority, status, total, completed, request_id, error, created_at, updated_at"
+
+
+class SQLiteJobStore:
+    """Jobs and their per-input results in one SQLite file."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        lease_seconds: float = 120,
+        ttl_seconds: float = 86400,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Open (or create) the database at `path`; finished jobs are kept `ttl_seconds` (0 = forever)."""
+        self.lease_seconds = lease_seconds
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # WAL with NORMAL sync survives application crashes; only an OS crash can drop the last commits.
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, priority INTEGER NOT NULL, status TEXT NOT NULL, "
+            "total INTEGER NOT NULL, completed INTEGER NOT NULL DEFAULT 0, payload TEXT NOT NULL, "
+            "request_id TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, created_at)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS job_results ("
+            "job_id TEXT NOT NULL, input_index INTEGER NOT NULL, result TEXT NOT NULL, warnings TEXT NOT NULL, "
+            "PRIMARY KEY (job_id, input_index))"
+        )
+
+    def submit(self, kind: str, payload: dict[str, Any], total: int, priority: int = 0) -> Job:
+        """Queue a new job with `total` inputs and return it."""
+        now = self._clock()
+        job_id = secrets.token_hex(16)
+        with self._lock:
+            with self._db:
+                self._db.execute("BEGIN IMMEDIATE")
+                if self.ttl_seconds:
+                    self._purge(now - self.ttl_seconds)
+                self._db.execute(
+                    "INSERT INTO jobs (job_id, kind, priority, status, total, payload, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, kind, priority, QUEUED, total, dump_json(payload), now, now),
+                )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Job | None:
+        """Return a job, or None when unknown (or purged)."""
+        with self._lock:
+            row = self._db.execute(f"SELECT {_JOB_COLUMNS} FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return _job(row) if row is not None else None
+
+    def claim(self, kinds: list[str]) -> Job | None:
+        """Mark the next queued job of one of `kinds` as running and return it.
+
+        Running jobs whose lease expired are queued again first.
+        """
+        if not kinds:
+            return None
+        now = self._clock()
+        placeholders = ", ".join("?" * len(kinds))
+        with self._lock:
+            with self._db:
+                self._db.execute("BEGIN IMMEDIATE")
+                self._db.execute(
+                    "UPDATE jobs SET status = ? WHERE status = ? AND updated_at <= ?",
+                    (QUEUED, RUNNING, now - self.lease_seconds),
+                )
+                row = self._db.execute(
+                    f"SELECT {_JOB_COLUMNS}, payload FROM jobs WHERE status = ? AND kind IN ({placeholders}) "
+                    "ORDER BY priority DESC, created_at, rowid LIMIT 1",
+                    (QUEUED, *kinds),
+                ).fetchone()
+                if row is None:
+                    return None
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?", (RUNNING, now, row[0])
+                )
+        return _job(row[:-1], json.loads(row[-1]))._replace(status=RUNNING, updated_at=now)
+
+    def add_results(self, job_id: str, outputs: list[JobOutput]) -> None:
+        """Store processed inputs in one transaction, count them as completed and renew the lease.
+
+        Inputs that already have a stored result (written by another worker
+        that claimed the job after a lapsed lease) are skipped, not counted twice.
+        """
+        rows = [(job_id, index, dump_json(result), dump_json(warnings)) for index, result, warnings in outputs]
+        with self._lock:
+            with self._db:
+                self._db.execute("BEGIN IMMEDIATE")
+                inserted = self._db.executemany(
+                    "INSERT OR IGNORE INTO job_results (job_id, input_index, result, warnings) VALUES (?, ?, ?, ?)",
+                    rows,
+                ).rowcount
+                self._db.execute(
+                    "UPDATE jobs SET completed = completed + ?, updated_at = ? WHERE job_id = ?",
+                    (inserted, self._clock(), job_id),
+                )
+
+    def renew(self, job_id: str) -> None:
+        """Extend the lease of a running job without storing anything."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET updated_at = ? WHERE job_id = ? AND status = ?", (self._clock(), job_id, RUNNING)
+            )
+
+    def done_indices(self, job_id: str) -> set[int]:
+        """Return the input indices that already have a stored result."""
+        with self._lock:
+            rows = self._db.execute("SELECT input_index FROM job_results WHERE job_id = ?", (job_id,)).fetchall()
+        return {row[0] for row in rows}
+
+    def results(self, job_id: str, offset: int = 0) -> list[dict[str, Any]]:
+        """Return stored results ordered by input index, skipping the first `offset`."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT result FROM job_results WHERE job_id = ? ORDER BY input_index LIMIT -1 OFFSET ?",
+                (job_id, offset),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def warnings(self, job_id: str) -> dict[int, dict[str, int]]:
+        """Return non-empty warning counts by input index."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT input_index, warnings FROM job_results WHERE job_id = ? AND warnings != '{}' "
+                "ORDER BY input_index",
+                (job_id,),
+            ).fetchall()
+        return {row[0]: json.loads(row[1]) for row in rows}
+
+    def finish(self, job_id: str, request_id: str) -> None:
+        self._set_status(job_id, SUCCEEDED, request_id=request_id)
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._set_status(job_id, FAILED, error=error)
+
+    def release(self, job_id: str) -> None:
+        """Queue a running job again (on shutdown), keeping its stored results."""
+        self._set_status(job_id, QUEUED)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _set_status(
+        self, job_id: str, status: str, request_id: str | None = None, error: str | None = None
+    ) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, request_id = ?, error = ?, updated_at = ? WHERE job_id = ?",
+                (status, request_id, error, self._clock(), job_id),
+            )
+
+    def _purge(self, cutoff: float) -> None:
+        """Delete finished jobs last updated before `cutoff`; caller holds the lock in a transaction."""
+        self._db.execute(
+            "DELETE FROM job_results WHERE job_id IN ("
+            "SELECT job_id FROM jobs WHERE status IN (?, ?) AND updated_at < ?)",
+            (SUCCEEDED, FAILED, cutoff),
+        )
+        self._db.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?", (SUCCEEDED, FAILED, cutoff)
+        )
+
+
+def _job(row: tuple, payload: dict[str, Any] | None = None) -> Job:
+    return Job(*row[:6], payload, *row[6:])
+
+
+class JobRunner:
+    """Thread pool that claims jobs from a `SQLiteJobStore` and runs them to completion."""
+
+    def __init__(
+        self,
+        store: SQLiteJobStore,
+        kinds: dict[str, JobKind],
+        workers: int = 2,
+        poll_seconds: float = 1.0,
+        flush_seconds: float = 0.5,
+        heartbeat_seconds: float | None = None,
+    ):
+        """Run up to `workers` jobs at once; idle workers re-check the store every `poll_seconds`.
+
+        Results are written in one transaction per `flush_seconds` of work per
+        job (and at the end), which bounds both commit overhead and lost work.
+        A running job's lease is renewed every `heartbeat_seconds` (default: a
+        third of the store's lease), so one slow input does not let it lapse.
+        """
+        self.store = store
+        self.kinds = kinds
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.flush_seconds = flush_seconds
+        self.heartbeat_seconds = store.lease_seconds / 3 if heartbeat_seconds is None else heartbeat_seconds
+        self._running: dict[str, int] = dict.fromkeys(kinds, 0)
+        self._wakeup = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._stopping = False
+
+    def start(self) -> None:
+        """Start missing worker threads and wake idle ones; call after submitting a job."""
+        with self._wakeup:
+            self._stopping = False
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.workers:
+                name = f"job-worker-{len(self._threads)}"
+                thread = threading.Thread(target=self._work, name=name, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            self._wakeup.notify_all()
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of running jobs per kind."""
+        with self._wakeup:
+            return dict(self._running)
+
+    def shutdown(self, timeout: float | None = 10) -> None:
+        """Stop after each worker's current input; unfinished jobs are released back to the queue."""
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def run_pending(self) -> int:
+        """Run queued jobs on the calling thread until none is left; return how many ran."""
+        count = 0
+        while (job := self._claim()) is not None:
+            self._run(job)
+            count += 1
+        return count
+
+    def _claim(self) -> Job | None:
+        with self._wakeup:
+            kinds = [
+                kind
+                for kind, spec in self.kinds.items()
+                if not spec.concurrency or self._running[kind] < spec.concurrency
+            ]
+            job = self.store.claim(kinds)
+            if job is not None:
+                self._running[job.kind] += 1
+            return job
+
+    def _work(self) -> None:
+        while True:
+            job = self._claim()
+            if job is None:
+                with self._wakeup:
+                    if self._stopping:
+                        return
+                    self._wakeup.wait(self.poll_seconds)
+                    if self._stopping:
+                        return
+                continue
+            self._run(job)
+
+    def _heartbeat(self, job_id: str, stop: threading.Event) -> None:
+        while not stop.wait(self.heartbeat_seconds):
+            self.store.renew(job_id)
+
+    def _run(self, job: Job) -> None:
+        spec = self.kinds[job.kind]
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job.job_id, stop_heartbeat), name=f"job-heartbeat-{job.job_id[:8]}",
+            daemon=True,
+        )
+        heartbeat.start()
+        pending: list[JobOutput] = []
+        flush_at = time.monotonic() + self.flush_seconds
+        try:
+            for output in spec.run(job, self.store.done_indices(job.job_id)):
+                pending.append(output)
+                if self._stopping or time.monotonic() >= flush_at:
+                    self.store.add_results(job.job_id, pending)
+                    pending = []
+                    flush_at = time.monotonic() + self.flush_seconds
+                if self._stopping:
+                    self.store.release(job.job_id)
+                    return
+            if pending:
+                self.store.add_results(job.job_id, pending)
+            self.store.finish(job.job_id, spec.finish(job, self.store.results(job.job_id)))
+        except Exception as exc:  # noqa: BLE001 - any handler error fails only this job
+            self.store.fail(job.job_id, f"{type(exc).__name__}: {exc}")
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+            with self._wakeup:
+                self._running[job.kind] -= 1
+                # A finished job may free a per-kind slot another worker is waiting for.
+                self._wakeup.notify_all()
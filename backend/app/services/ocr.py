@@ -1,11 +1,30 @@
-"""OCR service helpers for extracting text from uploaded invoice images."""
+"""OCR service helpers for extracting text from uploaded invoice images.
+
+Text recognition goes through a pluggable `OCREngine`:
+
+- `TesserocrEngine` keeps warm in-process Tesseract handles (language model
+  loaded once) in a small pool, one per concurrent OCR worker.
+- `PytesseractEngine` is the fallback; it starts a `tesseract` subprocess and
+  writes temp files for every image.
+
+`configure_ocr_engine("auto")` picks tesserocr when it is installed. Images go
+through `services.preprocess` first (see `configure_preprocessing`).
+"""
 
 from __future__ import annotations
 
 import io
+import queue
+import threading
+from typing import Protocol
 
 from PIL import Image, UnidentifiedImageError
 
+from app.services.preprocess import PreprocessConfig, StepTimings, preprocess_image
+
+OCR_LANGUAGE = "eng"
+ENGINE_CHOICES = ("auto", "tesserocr", "pytesseract")
+
 
 class OCRUnavailableError(RuntimeError):
     """Raised when OCR dependencies or engine are unavailable."""
@@ -19,27 +38,215 @@ class OCRInputError(ValueError):
     pass
 
 
-def extract_text_from_image_bytes(image_bytes: bytes) -> str:
-    """Extract text from image bytes using Tesseract OCR."""
+class OCREngine(Protocol):
+    """Backend that turns a decoded image into raw text."""
+
+    name: str
+
+    def image_to_text(self, image: Image.Image) -> str:
+        """Return the recognized text of `image`."""
+
+    def warm(self) -> None:
+        """Load models ahead of the first request."""
+
+    def close(self) -> None:
+        """Release engine resources."""
+
+
+class PytesseractEngine:
+    """Fallback engine: one `tesseract` subprocess per image via pytesseract."""
+
+    name = "pytesseract"
+
+    def __init__(self, language: str = OCR_LANGUAGE):
+        """Import pytesseract; raises `OCRUnavailableError` when it is missing."""
+        try:
+            import pytesseract
+        except ModuleNotFoundError as exc:
+            raise OCRUnavailableError(
+                "pytesseract is not installed. Install backend requirements to enable image parsing."
+            ) from exc
+        self._pytesseract = pytesseract
+        self.language = language
+
+    def image_to_text(self, image: Image.Image) -> str:
+        try:
+            return self._pytesseract.image_to_string(image, lang=self.language)
+        except self._pytesseract.TesseractNotFoundError as exc:
+            raise OCRUnavailableError(
+                "Tesseract OCR engine is not installed or not in PATH. "
+                "Install it to enable image parsing."
+            ) from exc
+
+    def warm(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class TesserocrEngine:
+    """Persistent engine: a pool of initialized `tesserocr.PyTessBaseAPI` handles.
+
+    A handle is not thread-safe, so each OCR call checks one out of the pool and
+    returns it afterwards. Handles are created lazily up to `size` and reused,
+    so the language model is loaded once per handle instead of once per image.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, size: int = 2, language: str = OCR_LANGUAGE):
+        """Import tesserocr; raises `OCRUnavailableError` when it is missing."""
+        try:
+            import tesserocr
+        except ModuleNotFoundError as exc:
+            raise OCRUnavailableError("tesserocr is not installed.") from exc
+        self._tesserocr = tesserocr
+        self.size = max(1, size)
+        self.language = language
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+
+    def _new_handle(self):
+        try:
+            return self._tesserocr.PyTessBaseAPI(lang=self.language)
+        except RuntimeError as exc:
+            raise OCRUnavailableError(
+                f"Tesseract could not load language data for {self.language!r}."
+            ) from exc
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if not create:
+            return self._idle.get()
+        try:
+            return self._new_handle()
+        except BaseException:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def image_to_text(self, image: Image.Image) -> str:
+        api = self._checkout()
+        try:
+            api.SetImage(image)
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+            self._idle.put(api)
+
+    def warm(self) -> None:
+        """Create every handle up front so no request pays the model load."""
+        handles = [self._checkout() for _ in range(self.size)]
+        for api in handles:
+            self._idle.put(api)
+
+    def close(self) -> None:
+        with self._lock:
+            while True:
+                try:
+                    api = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                api.End()
+                self._created -= 1
+
+
+def create_ocr_engine(name: str = "auto", size: int = 2) -> OCREngine:
+    """Build the engine `name`; `auto` prefers tesserocr and falls back to pytesseract."""
+    if name not in ENGINE_CHOICES:
+        raise ValueError(f"Unknown OCR engine {name!r}; expected one of {', '.join(ENGINE_CHOICES)}.")
+    if name in ("auto", "tesserocr"):
+        try:
+            return TesserocrEngine(size=size)
+        except OCRUnavailableError:
+            if name == "tesserocr":
+                raise
+    return PytesseractEngine()
+
+
+_engine: OCREngine | None = None
+
+
+def configure_ocr_engine(engine: str | OCREngine = "auto", size: int = 2) -> OCREngine | None:
+    """Install the process-wide OCR engine by name or instance.
+
+    When the named engine's dependencies are missing the engine stays unset and
+    `extract_text_from_image_bytes` reports OCR as unavailable.
+    """
+    global _engine
+    previous = _engine
+    if isinstance(engine, str):
+        try:
+            _engine = create_ocr_engine(engine, size=size)
+        except OCRUnavailableError:
+            _engine = None
+    else:
+        _engine = engine
+    if previous is not None and previous is not _engine:
+        previous.close()
+    return _engine
+
+
+def get_ocr_engine() -> OCREngine:
+    """Return the configured OCR engine, creating the default one on first use."""
+    global _engine
+    if _engine is None:
+        _engine = create_ocr_engine()
+    return _engine
+
+
+_preprocess_config = PreprocessConfig()
+PREPROCESS_TIMINGS = StepTimings()
+
+
+def configure_preprocessing(config: PreprocessConfig) -> None:
+    """Install the preprocessing applied to every image before OCR."""
+    global _preprocess_config
+    _preprocess_config = config
+
+
+def get_preprocess_config() -> PreprocessConfig:
+    """Return the preprocessing applied to every image before OCR."""
+    return _preprocess_config
+
+
+def ocr_settings_key() -> str:
+    """Describe the OCR settings that affect recognized text, for cache keys."""
+    engine = get_ocr_engine()
+    return f"{engine.name}:{getattr(engine, 'language', '')}:{_preprocess_config.fingerprint()}"
+
+
+def count_image_pages(image_bytes: bytes) -> int:
+    """Return the number of frames (pages) in an image; multi-page TIFFs have several."""
     try:
-        import pytesseract
-        from pytesseract import TesseractNotFoundError
-    except ModuleNotFoundError as exc:
-        raise OCRUnavailableError(
-            "pytesseract is not installed. Install backend requirements to enable image parsing."
-        ) from exc
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            return getattr(image, "n_frames", 1)
+    except (UnidentifiedImageError, OSError) as exc:
+        raise OCRInputError("Unsupported or invalid image file.") from exc
+
+
+def extract_text_from_image_bytes(image_bytes: bytes, page: int = 0) -> str:
+    """Extract text from one page (frame) of image bytes with the configured OCR engine."""
+    engine = get_ocr_engine()
 
     try:
         image = Image.open(io.BytesIO(image_bytes))
-    except UnidentifiedImageError as exc:
+        if page:
+            image.seek(page)
+        image, timings = preprocess_image(image, _preprocess_config)
+    except EOFError as exc:
+        raise OCRInputError(f"Image has no page {page}.") from exc
+    except (UnidentifiedImageError, OSError) as exc:
         raise OCRInputError("Unsupported or invalid image file.") from exc
+    PREPROCESS_TIMINGS.record(timings)
 
-    try:
-        text = pytesseract.image_to_string(image)
-    except TesseractNotFoundError as exc:
-        raise OCRUnavailableError(
-            "Tesseract OCR engine is not installed or not in PATH. "
-            "Install it to enable image parsing."
-        ) from exc
-
-    return text.strip()
+    return engine.image_to_text(image).strip()
@@ -0,0 +1,217 @@
+"""Content-addressed OCR text cache: in-memory LRU in front of an optional disk store.
+
+Entries are keyed by `ocr_cache_key(image_sha256, settings)` so a change of OCR
+engine, language or preprocessing never serves stale text. Disk entries are one
+small file each (`<dir>/<key[:2]>/<key>.txt`, first line is the store time),
+written atomically; when the directory grows past `disk_max_bytes` the least
+recently used files are removed until it is back under 90% of the limit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+# After a size-triggered eviction the disk tier is trimmed to this share of its limit.
+DISK_LOW_WATERMARK = 0.9
+
+
+def ocr_cache_key(image_digest: str, settings: str) -> str:
+    """Combine the image SHA-256 and the OCR settings into one cache key."""
+    return hashlib.sha256(f"{image_digest}\x00{settings}".encode("utf-8")).hexdigest()
+
+
+class OCRCache:
+    """Two-tier OCR text cache with TTL, size-based disk eviction and hit counters."""
+
+    def __init__(
+        self,
+        memory_entries: int = 256,
+        disk_dir: str | os.PathLike[str] | None = None,
+        disk_max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Configure both tiers; `memory_entries=0` or `disk_dir=None` disables a tier, `ttl_seconds=0` never expires."""
+        self.memory_entries = memory_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._disk_bytes: int | None = None
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.memory_entries > 0 or self.disk_dir is not None
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return bool(self.ttl_seconds) and self._clock() - stored_at > self.ttl_seconds
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.txt"
+
+    def _remember(self, key: str, stored_at: float, text: str) -> None:
+        """Insert into the memory tier; caller holds the lock."""
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = (stored_at, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> str | None:
+        """Return cached text for `key`, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._is_expired(entry[0]):
+                    self._memory.move_to_end(key)
+                    self._memory_hits += 1
+                    return entry[1]
+                # Both tiers share the store time, so the disk copy is stale too.
+                del self._memory[key]
+                if self.disk_dir is not None:
+                    self._remove_file(self._path(key))
+                self._expired += 1
+                self._misses += 1
+                return None
+
+            text = self._read_disk(key)
+            if text is None:
+                self._misses += 1
+            else:
+                self._disk_hits += 1
+            return text
+
+    def _read_disk(self, key: str) -> str | None:
+        """Read and promote a disk entry; caller holds the lock."""
+        if self.disk_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            raw = path.read_text(encoding="utf-8")
+        except (FileNotFoundError, UnicodeDecodeError):
+            return None
+        header, _, text = raw.partition("\n")
+        try:
+            stored_at = float(header)
+        except ValueError:
+            stored_at = 0.0
+        if self._is_expired(stored_at):
+            self._remove_file(path)
+            self._expired += 1
+            return None
+        try:
+            os.utime(path)  # recency for LRU eviction
+        except OSError:
+            pass
+        self._remember(key, stored_at, text)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """Store OCR text under `key` in every enabled tier."""
+        stored_at = self._clock()
+        with self._lock:
+            self._remember(key, stored_at, text)
+            if self.disk_dir is not None:
+                self._write_disk(key, f"{stored_at:.3f}\n{text}".encode("utf-8"))
+
+    def _write_disk(self, key: str, payload: bytes) -> None:
+        """Atomically write one entry and evict if the tier is over its limit; caller holds the lock."""
+        total = self._disk_usage()
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            total -= path.stat().st_size
+        except FileNotFoundError:
+            pass
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(payload)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self._disk_bytes = total + len(payload)
+        if self._disk_bytes > self.disk_max_bytes:
+            self._evict_disk(int(self.disk_max_bytes * DISK_LOW_WATERMARK))
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        """Return `(mtime, size, path)` for every disk entry."""
+        entries = []
+        for path in self.disk_dir.glob("*/*.txt"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _disk_usage(self) -> int:
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, size, _ in self._entries()) if self.disk_dir.exists() else 0
+        return self._disk_bytes
+
+    def _remove_file(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        if self._disk_bytes is not None:
+            self._disk_bytes -= size
+
+    def _evict_disk(self, target_bytes: int) -> None:
+        """Drop least recently used disk entries until usage is at most `target_bytes`."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target_bytes:
+                break
+            path.unlink(missing_ok=True)
+            self._memory.pop(path.stem, None)
+            total -= size
+            self._evictions += 1
+        self._disk_bytes = total
+
+    def purge(self) -> int:
+        """Remove every entry from both tiers and return how many keys were dropped."""
+        with self._lock:
+            keys = set(self._memory)
+            self._memory.clear()
+            if self.disk_dir is not None and self.disk_dir.exists():
+                for _, _, path in self._entries():
+                    keys.add(path.stem)
+                    path.unlink(missing_ok=True)
+                self._disk_bytes = 0
+            return len(keys)
+
+    def stats(self) -> dict[str, float]:
+        """Return hit/miss counters, hit rate and tier sizes."""
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            lookups = hits + self._misses
+            return {
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "expired": self._expired,
+                "evictions": self._evictions,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes or 0,
+            }
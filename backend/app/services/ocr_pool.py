@@ -0,0 +1,135 @@
+"""Bounded OCR worker pool that keeps blocking Tesseract calls off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class OCRQueueFullError(RuntimeError):
+    """Raised when every OCR worker is busy and the wait queue is full."""
+
+    pass
+
+
+class OCRTimeoutError(RuntimeError):
+    """Raised when an OCR job does not finish within the per-job timeout."""
+
+    pass
+
+
+class OCRExecutor:
+    """Run OCR jobs on dedicated threads with a bounded wait queue.
+
+    At most `workers + max_queue` jobs are admitted at once; further jobs are
+    rejected immediately so callers can answer 503 instead of piling up. A job
+    that times out keeps its slot until its thread actually finishes.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue: int = 8,
+        timeout: float = 60.0,
+        retry_after: int = 5,
+    ):
+        """Configure worker count, queue bound, per-job timeout and Retry-After hint."""
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr")
+        return self._executor
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise OCRQueueFullError("OCR queue is full. Retry later.")
+            self._in_flight += 1
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _wrap(self, func: Callable[..., T], args: tuple[Any, ...]) -> Callable[[], T]:
+        """Wrap a job so queue wait time and running count are recorded."""
+        enqueued = time.perf_counter()
+
+        def job() -> T:
+            waited = time.perf_counter() - enqueued
+            with self._lock:
+                self._running += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        return job
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run `func(*args)` on an OCR worker and await its result."""
+        self._admit()
+        try:
+            future = self._get_executor().submit(self._wrap(func, args))
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError as exc:
+            with self._lock:
+                self._timeouts += 1
+            raise OCRTimeoutError(f"OCR did not finish within {self.timeout:g} seconds.") from exc
+
+    def stats(self) -> dict[str, float]:
+        """Return queue depth, throughput and wait-time counters."""
+        with self._lock:
+            started = self._running + self._completed
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "running": self._running,
+                "queued": max(0, self._in_flight - self._running),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": round(self._wait_total / started * 1e3, 3) if started else 0.0,
+                "max_wait_ms": round(self._wait_max * 1e3, 3),
+            }
+
+    def shutdown(self) -> None:
+        """Stop worker threads; a new pool is started on the next job."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
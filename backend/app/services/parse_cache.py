@@ -0,0 +1,114 @@
+"""Content-addressed cache of whole `/parse` responses.
+
+Parsing is deterministic, so a response is fully determined by the request
+inputs, the parser tables and the line gate. `parse_cache_key` hashes all three
+(the tables via `parser_fingerprint`) with the request-id token encoding; the
+key is checked before any parsing, doubles as the response `ETag`, and changes
+whenever `PATTERNS` or `NOISE_PATTERNS` change. Entries hold the rendered JSON body and
+are evicted least recently used once their total size passes `max_bytes`.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from app.parser import parser_fingerprint
+from app.parser.extractor import get_extraction_limits
+from app.services.request_id import RequestIdHasher
+
+
+class CachedParse(NamedTuple):
+    """Rendered `/parse` response body, its request id and where its `results` array sits in it."""
+
+    request_id: str
+    body: bytes
+    results_start: int
+    results_end: int
+
+    def results_json(self) -> str:
+        """Return the rendered `results` array, ready for `ResultStore.put_rendered`."""
+        return self.body[self.results_start:self.results_end].decode("utf-8")
+
+
+def parse_cache_key(content: str | None, contents: list[str] | None) -> str:
+    """Return the cache key (and ETag value) for one parse request's inputs."""
+    hasher = RequestIdHasher("parse-cache")
+    hasher.add_value(parser_fingerprint())
+    # The line gate changes which lines are parsed; the time budget never reaches
+    # cached bodies (truncated responses are not cached).
+    limits = get_extraction_limits()
+    hasher.add_value(limits.max_line_chars)
+    hasher.add_value(limits.max_line_run)
+    hasher.add_value(content)
+    hasher.add_texts(contents)
+    return hasher.hexdigest()
+
+
+class ParseCache:
+    """Thread-safe LRU of rendered parse responses, bounded by total body bytes."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        """Keep cached bodies up to `max_bytes` in total; 0 disables the cache."""
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries: OrderedDict[str, CachedParse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> CachedParse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, request_id: str, body: bytes, results_span: tuple[int, int]) -> None:
+        """Cache `body`; `results_span` is the byte range of its `results` array."""
+        # A body larger than the whole budget would only flush everything else.
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            self._entries[key] = CachedParse(request_id, body, *results_span)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, float]:
+        """Return hit/miss/eviction counters, hit rate and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,180 @@
+"""Batch parsing of text inputs, deduplicated and optionally in worker processes.
+
+Identical inputs in a batch are parsed once and the result is fanned out to
+every position. Inside each unit of work (the whole batch inline, one chunk in
+a worker process) identical candidate lines are extracted once as well.
+"""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from app.parser import configure_line_cache
+from app.parser.extractor import (
+    BatchExtractor,
+    ExtractionLimits,
+    ParsedLine,
+    configure_extraction_limits,
+    extract_batch,
+    get_extraction_limits,
+)
+
+COUNTERS = ("inputs", "duplicate_inputs", "lines", "duplicate_lines", "gated_lines", "truncated_documents")
+
+
+@dataclass
+class BatchStats:
+    """Counters for one batch (or, summed, for every batch of a pool).
+
+    `warnings` maps an input index to the extraction warnings of that input
+    (see `BatchExtractor.extract`); inputs without warnings are absent.
+    """
+
+    inputs: int = 0
+    duplicate_inputs: int = 0
+    lines: int = 0
+    duplicate_lines: int = 0
+    gated_lines: int = 0
+    truncated_documents: int = 0
+    warnings: dict[int, dict[str, int]] = field(default_factory=dict)
+
+    def add_counts(self, counts: dict[str, int]) -> None:
+        for name, value in counts.items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def counts(self) -> dict[str, int]:
+        return {name: getattr(self, name) for name in COUNTERS}
+
+
+def _init_worker(line_cache_size: int, limits: ExtractionLimits) -> None:
+    configure_line_cache(line_cache_size)
+    configure_extraction_limits(limits)
+
+
+class ParsePool:
+    """Run `extract_items` over a batch, in worker processes when enabled.
+
+    With `workers <= 1` every batch is parsed inline. Otherwise the executor is
+    created on first use and unique inputs are sent in chunks to amortize IPC
+    cost. Results are always returned in input order.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        chunk_size: int = 0,
+        line_cache_size: int = 0,
+        start_method: str = "spawn",
+        limits: ExtractionLimits | None = None,
+    ):
+        """Configure the pool; `chunk_size=0` picks about four chunks per worker.
+
+        Workers use `limits`, or the limits active in this process when the
+        workers start.
+        """
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.line_cache_size = line_cache_size
+        self.limits = limits
+        self.start_method = start_method
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._totals = BatchStats()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the worker processes lazily and reuse them for later batches."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                    initargs=(self.line_cache_size, self.limits or get_extraction_limits()),
+                )
+            return self._executor
+
+    def _chunk_size_for(self, count: int) -> int:
+        if self.chunk_size > 0:
+            return self.chunk_size
+        return max(1, math.ceil(count / (self.workers * 4)))
+
+    def _iter_unique(
+        self, unique: list[str], stats: BatchStats
+    ) -> Iterator[tuple[list[ParsedLine], dict[str, int]]]:
+        """Yield `(items, warnings)` for `unique` texts in order, counting lines into `stats`."""
+        if not self.enabled or len(unique) <= 1:
+            extractor = BatchExtractor()
+            for text in unique:
+                result = extractor.extract(text)
+                # One extractor covers the whole batch, so its totals are the batch totals.
+                for name, value in extractor.counts().items():
+                    setattr(stats, name, value)
+                yield result
+            return
+
+        size = self._chunk_size_for(len(unique))
+        chunks = [unique[start:start + size] for start in range(0, len(unique), size)]
+        for results, counts in self._get_executor().map(extract_batch, chunks):
+            stats.add_counts(counts)
+            yield from results
+
+    def iter_many(self, texts: list[str], stats: BatchStats | None = None) -> Iterator[list[ParsedLine]]:
+        """Yield item lists in input order as soon as each input is parsed.
+
+        Each distinct text is parsed once; `stats`, when given, is filled in as
+        results are produced and is complete once the iterator is exhausted.
+        """
+        stats = stats if stats is not None else BatchStats()
+        remaining = Counter(texts)
+        unique = list(remaining)
+        stats.inputs = len(texts)
+        stats.duplicate_inputs = len(texts) - len(unique)
+
+        parsed_unique = self._iter_unique(unique, stats)
+        # Results of texts that occur again later, released after their last use.
+        pending: dict[str, tuple[list[ParsedLine], dict[str, int]]] = {}
+        for index, text in enumerate(texts):
+            result = pending.get(text)
+            if result is None:
+                result = next(parsed_unique)
+                if remaining[text] > 1:
+                    pending[text] = result
+                items, warnings = result
+            else:
+                # A copy, so callers never see one list at two positions.
+                items, warnings = list(result[0]), result[1]
+            remaining[text] -= 1
+            if not remaining[text]:
+                pending.pop(text, None)
+            if warnings:
+                stats.warnings[index] = warnings
+            yield items
+
+        with self._lock:
+            self._totals.add_counts(stats.counts())
+
+    def parse_many(self, texts: list[str], stats: BatchStats | None = None) -> list[list[ParsedLine]]:
+        """Parse every text and return item lists aligned with `texts`."""
+        return list(self.iter_many(texts, stats))
+
+    def stats(self) -> dict[str, int]:
+        """Return input and line counters summed over every finished batch."""
+        with self._lock:
+            return self._totals.counts()
+
+    def shutdown(self) -> None:
+        """Stop worker processes; the pool is recreated if used again."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,213 @@
+"""Incremental parse sessions for live editing: re-parse only the lines an edit touches.
+
+A session keeps one document as its raw lines plus the parsed items (and gate
+warnings) of each line. Edits are `(start, delete, insert)` splices applied in
+order, like `list[start:start + delete] = insert`; only inserted lines are
+split and matched again. Because extraction is line-local, the items of a
+session are always those `extract_items("\n".join(lines))` would return.
+
+`SessionStore` bounds sessions by count and by total characters (least
+recently used first) and expires them `ttl_seconds` after their last use.
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+
+from app.parser.extractor import BatchExtractor, ParsedLine, split_candidate_lines
+from app.services.request_id import RequestIdHasher
+
+LineEdit = tuple[int, int, list[str]]
+
+
+class SessionEditError(ValueError):
+    """An edit is out of range or would produce an invalid document."""
+
+
+class SessionTooLargeError(SessionEditError):
+    """The document would exceed the session's character limit."""
+
+
+class SessionConflictError(Exception):
+    """The session moved past the `base_request_id` an edit was made against."""
+
+
+class ParseSession:
+    """One document's raw lines and per-line parse results."""
+
+    def __init__(self, session_id: str, content: str, max_chars: int):
+        """Parse `content` in full; documents may grow to at most `max_chars` characters."""
+        self.session_id = session_id
+        self.max_chars = max_chars
+        self.extractor = BatchExtractor(memoize=False)
+        self.lock = threading.Lock()
+        lines = content.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        self._check_size(lines)
+        self.lines = lines
+        self.results = [self._parse_line(line) for line in lines]
+        self.request_id = self._request_id()
+
+    @property
+    def chars(self) -> int:
+        """Document length in characters, counting line breaks."""
+        return sum(map(len, self.lines)) + len(self.lines) - 1
+
+    def apply(self, base_request_id: str, edits: Iterable[LineEdit]) -> list[int]:
+        """Apply splices made against `base_request_id`; return the indices of re-parsed lines.
+
+        Either every edit is applied or none is.
+        """
+        if base_request_id != self.request_id:
+            raise SessionConflictError(self.request_id)
+        lines = list(self.lines)
+        results = list(self.results)
+        changed: list[int] = []
+        for start, delete, insert in edits:
+            if start < 0 or delete < 0 or start + delete > len(lines):
+                raise SessionEditError(f"Edit at line {start} deleting {delete} is outside the document.")
+            if any("\n" in line or "\r" in line for line in insert):
+                raise SessionEditError("Inserted lines must not contain line breaks.")
+            shift = len(insert) - delete
+            changed = [
+                index + shift if index >= start + delete else index
+                for index in changed
+                if not start <= index < start + delete
+            ]
+            changed.extend(range(start, start + len(insert)))
+            lines[start:start + delete] = insert
+            results[start:start + delete] = [None] * len(insert)
+        if not lines:
+            lines, results = [""], [None]
+        self._check_size(lines)
+
+        changed = sorted(set(changed))
+        for index in changed:
+            results[index] = self._parse_line(lines[index])
+        self.lines = lines
+        self.results = results
+        self.request_id = self._request_id()
+        return changed
+
+    def items(self) -> Iterator[ParsedLine]:
+        """Yield the document's items in order."""
+        for line_items, _ in self.results:
+            yield from line_items
+
+    def line_items(self, indices: Iterable[int]) -> list[tuple[int, tuple[ParsedLine, ...]]]:
+        """Return `(line index, items)` for each of `indices`."""
+        return [(index, self.results[index][0]) for index in indices]
+
+    def warnings(self) -> dict[str, int]:
+        """Return gate warning counts summed over all lines."""
+        totals: dict[str, int] = {}
+        for _, line_warnings in self.results:
+            for code, count in line_warnings.items():
+                totals[code] = totals.get(code, 0) + count
+        return totals
+
+    def _check_size(self, lines: list[str]) -> None:
+        if sum(map(len, lines)) + len(lines) - 1 > self.max_chars:
+            raise SessionTooLargeError(f"Document exceeds max character limit ({self.max_chars}).")
+
+    def _parse_line(self, line: str) -> tuple[tuple[ParsedLine, ...], dict[str, int]]:
+        warnings: dict[str, int] = {}
+        items = []
+        for candidate in split_candidate_lines(line):
+            self.extractor.lines += 1
+            parsed = self.extractor.parse_line(candidate, warnings)
+            if parsed:
+                items.append(parsed)
+        return tuple(items), warnings
+
+    def _request_id(self) -> str:
+        """Return the id `/parse` gives `{"content": "\\n".join(lines)}`."""
+        hasher = RequestIdHasher("parse")
+        hasher.add_value("\n".join(self.lines))
+        hasher.add_texts(None)
+        hasher.add_result(0, self.items())
+        return hasher.hexdigest()
+
+
+class SessionStore:
+    """Bounded, expiring in-process map of session id to `ParseSession`."""
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        max_chars: int = 16_000_000,
+        ttl_seconds: float = 900,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Keep at most `max_sessions` sessions holding `max_chars` characters in total."""
+        self.max_sessions = max_sessions
+        self.max_chars = max_chars
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        # session id -> (last used, size in characters when stored, session)
+        self._sessions: OrderedDict[str, tuple[float, int, ParseSession]] = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, content: str, max_document_chars: int) -> ParseSession:
+        """Parse `content` into a new session and store it."""
+        session = ParseSession(secrets.token_hex(16), content, max_document_chars)
+        self.put(session)
+        return session
+
+    def get(self, session_id: str) -> ParseSession | None:
+        """Return a live session and refresh its expiry, or None when unknown or expired."""
+        now = self._clock()
+        with self._lock:
+            self._evict(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            self._sessions[session_id] = (now, entry[1], entry[2])
+            self._sessions.move_to_end(session_id)
+            return entry[2]
+
+    def put(self, session: ParseSession) -> None:
+        """Store `session`, or re-account it after an edit, as the most recently used."""
+        now = self._clock()
+        size = session.chars
+        with self._lock:
+            self._pop(session.session_id)
+            self._sessions[session.session_id] = (now, size, session)
+            self._chars += size
+            self._evict(now)
+
+    def delete(self, session_id: str) -> bool:
+        """Drop a session; return False when it was not stored."""
+        with self._lock:
+            return self._pop(session_id)
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of sessions and the characters they hold."""
+        with self._lock:
+            return {"sessions": len(self._sessions), "chars": self._chars}
+
+    def _pop(self, session_id: str) -> bool:
+        entry = self._sessions.pop(session_id, None)
+        if entry is None:
+            return False
+        self._chars -= entry[1]
+        return True
+
+    def _evict(self, now: float) -> None:
+        """Drop expired sessions, then least recently used ones beyond the caps; caller holds the lock."""
+        if self.ttl_seconds:
+            cutoff = now - self.ttl_seconds
+            while self._sessions:
+                session_id, (used_at, _, _) = next(iter(self._sessions.items()))
+                if used_at > cutoff:
+                    break
+                self._pop(session_id)
+        while len(self._sessions) > self.max_sessions or (self._chars > self.max_chars and len(self._sessions) > 1):
+            self._pop(next(iter(self._sessions)))
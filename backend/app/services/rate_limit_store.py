@@ -0,0 +1,196 @@
+"""GCRA rate limiting with pluggable per-client state stores.
+
+The generic cell rate algorithm is a token bucket that stores a single float
+per client: the theoretical arrival time (TAT) of the next request. A client
+whose TAT lies in the past has a full bucket, which is exactly the state of an
+unknown client, so idle clients can be forgotten without changing any decision.
+
+Stores only need an atomic read-modify-write of one float per key:
+
+- `MemoryRateLimitStore`: an ordered dict inside one process; a few idle clients are
+  evicted on every update.
+- `FileRateLimitStore`: a fixed-size open-addressing table in an mmap'd file,
+  guarded by `fcntl.flock`, shared by every worker that opens the same path.
+  Place it on tmpfs (for example `/dev/shm`) to keep it in shared memory.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, NamedTuple, Protocol
+
+# tat -> (new_tat, result); runs while the store holds the key's lock.
+Step = Callable[[float], tuple[float, Any]]
+
+
+class RateLimitDecision(NamedTuple):
+    """Outcome of one request against a client's bucket."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+    reset_after: float
+
+
+class RateLimitStore(Protocol):
+    """Atomic per-key storage of one theoretical arrival time."""
+
+    def update(self, key: str, step: Step, now: float) -> Any:
+        """Apply `step` to the key's TAT (0.0 when unknown) and store the new TAT."""
+
+
+class MemoryRateLimitStore:
+    """In-process TAT store with incremental idle-client eviction and a hard client cap.
+
+    Keys are kept in last-update order. Each update looks at no more than
+    `evict_batch` of the least recently seen clients and drops the ones whose
+    bucket has refilled, so eviction cost is constant per request. No request
+    ever waits for a pass over the whole table.
+    """
+
+    def __init__(self, max_clients: int = 1_000_000, evict_batch: int = 8):
+        """Keep at most `max_clients` keys; examine up to `evict_batch` old keys per update."""
+        self.max_clients = max_clients
+        self.evict_batch = evict_batch
+        self._tats: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def update(self, key: str, step: Step, now: float) -> Any:
+        with self._lock:
+            tats = self._tats
+            new_tat, result = step(tats.get(key, 0.0))
+            tats[key] = new_tat
+            tats.move_to_end(key)
+            self._evict(now)
+            return result
+
+    def _evict(self, now: float) -> None:
+        """Drop up to `evict_batch` idle clients from the least recently seen end, then enforce the cap.
+
+        A client seen long ago with a still-future TAT (a deep burst) stops the
+        scan; it expires within one burst window and is dropped on a later call.
+        """
+        tats = self._tats
+        for _ in range(self.evict_batch):
+            if not tats:
+                break
+            key, tat = next(iter(tats.items()))
+            if tat > now:
+                break
+            del tats[key]
+            self.evictions += 1
+        while len(tats) > self.max_clients:
+            tats.popitem(last=False)
+            self.evictions += 1
+
+
+class FileRateLimitStore:
+    """Fixed-size TAT table in a shared mmap'd file.
+
+    Each slot holds an 8-byte key hash and an 8-byte TAT. A key probes
+    `probe_length` consecutive slots; an expired slot is reused, and when all
+    are busy the slot with the oldest TAT (the client closest to a full bucket)
+    is overwritten. Memory is `slots * 16` bytes no matter how many clients.
+    """
+
+    _SLOT = struct.Struct("<Qd")
+
+    def __init__(self, path: str | os.PathLike[str], slots: int = 1 << 20, probe_length: int = 8):
+        """Open or create the table at `path`; every process must use the same `slots`."""
+        try:
+            import fcntl
+        except ModuleNotFoundError as exc:
+            raise RuntimeError("FileRateLimitStore requires fcntl (POSIX).") from exc
+        self._fcntl = fcntl
+        self.slots = slots
+        self.probe_length = min(probe_length, slots)
+        size = slots * self._SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key_hash(key: str) -> int:
+        # Python's hash() is salted per process; the table is shared across processes.
+        digest = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+        return digest or 1
+
+    def update(self, key: str, step: Step, now: float) -> Any:
+        key_hash = self._key_hash(key)
+        start = key_hash % self.slots
+        slot_struct = self._SLOT
+        with self._lock:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_EX)
+            try:
+                target = None
+                tat = 0.0
+                victim, victim_tat = start, math.inf
+                for probe in range(self.probe_length):
+                    offset = ((start + probe) % self.slots) * slot_struct.size
+                    slot_hash, slot_tat = slot_struct.unpack_from(self._map, offset)
+                    if slot_hash == key_hash:
+                        target, tat = offset, slot_tat
+                        break
+                    if target is None and (slot_hash == 0 or slot_tat <= now):
+                        target = offset
+                    if slot_tat < victim_tat:
+                        victim, victim_tat = offset, slot_tat
+                if target is None:
+                    target = victim
+                new_tat, result = step(tat)
+                slot_struct.pack_into(self._map, target, key_hash, new_tat)
+                return result
+            finally:
+                self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+
+class GCRARateLimiter:
+    """Allow `requests_per_minute` per client on average with bursts up to `burst`."""
+
+    def __init__(
+        self,
+        requests_per_minute: int = 60,
+        burst: int | None = None,
+        store: RateLimitStore | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Configure the rate and burst size; defaults to an in-process store."""
+        self.limit = burst or requests_per_minute
+        self.interval = 60.0 / requests_per_minute
+        self.store = store if store is not None else MemoryRateLimitStore()
+        self._clock = clock
+
+    def hit(self, key: str) -> RateLimitDecision:
+        """Count one request for `key` and return whether it is allowed."""
+        now = self._clock()
+        interval = self.interval
+        tolerance = self.limit * interval
+
+        def step(tat: float) -> tuple[float, RateLimitDecision]:
+            new_tat = max(tat, now) + interval
+            if new_tat - now > tolerance:
+                retry_after = new_tat - now - tolerance
+                return tat, RateLimitDecision(False, self.limit, 0, retry_after, tat - now)
+            remaining = int((tolerance - (new_tat - now)) / interval + 1e-9)
+            return new_tat, RateLimitDecision(True, self.limit, remaining, 0.0, new_tat - now)
+
+        return self.store.update(key, step, now)
@@ -0,0 +1,104 @@
+"""Streaming, versioned canonical hashing for deterministic response request ids.
+
+Encoding spec v1 (all integers big-endian):
+
+- The hash starts with `REQUEST_ID_SPEC` and the endpoint kind as a string token.
+- Each value is one self-delimiting token:
+  `N` (None), `S` + u64 byte length + UTF-8 bytes (str),
+  `F` + IEEE-754 float64 (int/float).
+- A text list is `L` + i64 count followed by one token per text.
+- A result is `R` + i64 input index, then per item `T` followed by the values
+  of `ITEM_FIELDS` in order, and finally `E`. It may be fed whole
+  (`add_result`) or item by item (`begin_result` / `add_item` / `end_result`);
+  both produce the same bytes.
+
+The same inputs and items always produce the same id, in any process, without
+building or serializing the full response first. Change the spec version when
+the encoding changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import struct
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+REQUEST_ID_SPEC = b"smart-invoice-parser/request-id/v1\x00"
+
+ITEM_FIELDS = (
+    "product_name",
+    "quantity",
+    "unit",
+    "price",
+    "price_type",
+    "derived_unit_price",
+    "raw_line",
+    "confidence",
+)
+
+_U64 = struct.Struct(">Q")
+_I64 = struct.Struct(">q")
+_F64_TOKEN = struct.Struct(">cd")
+
+
+def _encode(value: Any) -> bytes:
+    """Encode one scalar as a self-delimiting token."""
+    if value is None:
+        return b"N"
+    if isinstance(value, str):
+        encoded = value.encode("utf-8")
+        return b"S" + _U64.pack(len(encoded)) + encoded
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return _F64_TOKEN.pack(b"F", float(value))
+    raise TypeError(f"Unsupported value type for request id: {type(value).__name__}")
+
+
+class RequestIdHasher:
+    """Feed inputs and parsed items into SHA-256 as they are produced."""
+
+    def __init__(self, kind: str):
+        """Start a hash for one endpoint `kind` (for example `parse` or `image`)."""
+        self._sha = hashlib.sha256(REQUEST_ID_SPEC)
+        self.add_value(kind)
+
+    def add_value(self, value: Any) -> None:
+        """Append one scalar token (None, str, int or float)."""
+        self._sha.update(_encode(value))
+
+    def add_texts(self, values: list[str] | None) -> None:
+        """Append an optional list of texts (None is distinct from an empty list)."""
+        if values is None:
+            self.add_value(None)
+            return
+        self._sha.update(b"L" + _I64.pack(len(values)))
+        for value in values:
+            self.add_value(value)
+
+    def add_result(self, input_index: int, items: Iterable[Any]) -> None:
+        """Append one parsed result; items may be `ParsedLine` / `ParsedItem` objects or plain dicts."""
+        parts = [b"R", _I64.pack(input_index)]
+        for item in items:
+            parts.append(b"T")
+            if isinstance(item, Mapping):
+                parts.extend([_encode(item[field]) for field in ITEM_FIELDS])
+            else:
+                parts.extend([_encode(getattr(item, field)) for field in ITEM_FIELDS])
+        parts.append(b"E")
+        self._sha.update(b"".join(parts))
+
+    def begin_result(self, input_index: int) -> None:
+        """Open a result whose items will be fed one at a time with `add_item`."""
+        self._sha.update(b"R" + _I64.pack(input_index))
+
+    def add_item(self, item: Any) -> None:
+        """Append one item of the open result."""
+        self._sha.update(b"T" + b"".join([_encode(getattr(item, field)) for field in ITEM_FIELDS]))
+
+    def end_result(self) -> None:
+        """Close the result opened by `begin_result`."""
+        self._sha.update(b"E")
+
+    def hexdigest(self) -> str:
+        """Return the request id for everything fed so far."""
+        return self._sha.hexdigest()
@@ -0,0 +1,192 @@
+"""Server-side store of parse results keyed by `request_id`, for export without a request body.
+
+Results are kept as the rendered JSON array of the `ParseResult`-shaped dicts
+the parse endpoints return, and decoded again on `get`. Both implementations
+are bounded (oldest entries are evicted first) and expire entries after
+`ttl_seconds`; `ttl_seconds=0` keeps them until evicted. Bodies larger than
+`max_entry_bytes` are not stored; their exports answer 404 like expired ones.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Protocol
+
+from app.services.serialize import dump_json
+
+Results = list[dict[str, Any]]
+
+
+class ResultStore(Protocol):
+    """Bounded, expiring mapping of request id to parse results."""
+
+    max_entry_bytes: int
+
+    def put(self, request_id: str, results: Results) -> None:
+        """Store (or refresh) the results of one parse response."""
+
+    def put_rendered(self, request_id: str, body: str) -> None:
+        """Store results already rendered as a JSON array (skips a second `dump_json`)."""
+
+    def get(self, request_id: str) -> Results | None:
+        """Return stored results, or None when unknown or expired."""
+
+    def __contains__(self, request_id: str) -> bool:
+        """Return whether results are stored for `request_id`, without decoding them."""
+
+
+class MemoryResultStore:
+    """In-process result store: insertion-ordered dict with TTL, an entry cap and a byte cap."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 3600,
+        max_bytes: int = 64 * 1024 * 1024,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Keep at most `max_entries` responses, `max_bytes` of JSON in total, for at most `ttl_seconds` each."""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._bytes = 0
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_entry_bytes(self) -> int:
+        # A body larger than the whole budget would only flush everything else.
+        return self.max_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, request_id: str, results: Results) -> None:
+        self.put_rendered(request_id, dump_json(results))
+
+    def put_rendered(self, request_id: str, body: str) -> None:
+        if len(body) > self.max_entry_bytes:
+            return
+        now = self._clock()
+        with self._lock:
+            previous = self._entries.pop(request_id, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+            self._entries[request_id] = (now, body)
+            self._bytes += len(body)
+            self._evict(now)
+
+    def get(self, request_id: str) -> Results | None:
+        now = self._clock()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(request_id)
+        return json.loads(entry[1]) if entry is not None else None
+
+    def __contains__(self, request_id: str) -> bool:
+        now = self._clock()
+        with self._lock:
+            self._evict(now)
+            return request_id in self._entries
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries (oldest first) and any beyond the caps; caller holds the lock."""
+        if self.ttl_seconds:
+            cutoff = now - self.ttl_seconds
+            while self._entries:
+                oldest = next(iter(self._entries.values()))
+                if oldest[0] > cutoff:
+                    break
+                self._drop_oldest()
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._drop_oldest()
+
+    def _drop_oldest(self) -> None:
+        _, (_, body) = self._entries.popitem(last=False)
+        self._bytes -= len(body)
+
+
+class SQLiteResultStore:
+    """Local on-disk result store in one SQLite file, shared by workers on the same host."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 3600,
+        max_entry_bytes: int = 64 * 1024 * 1024,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Open (or create) the database at `path`."""
+        self.max_entries = max_entries
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "request_id TEXT PRIMARY KEY, stored_at REAL NOT NULL, payload TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_stored_at ON results (stored_at)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def put(self, request_id: str, results: Results) -> None:
+        self.put_rendered(request_id, dump_json(results))
+
+    def put_rendered(self, request_id: str, body: str) -> None:
+        if len(body) > self.max_entry_bytes:
+            return
+        now = self._clock()
+        with self._lock:
+            with self._db:
+                self._db.execute("BEGIN IMMEDIATE")
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (request_id, stored_at, payload) VALUES (?, ?, ?)",
+                    (request_id, now, body),
+                )
+                self._evict(now)
+
+    def get(self, request_id: str) -> Results | None:
+        now = self._clock()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT stored_at, payload FROM results WHERE request_id = ?", (request_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        if self.ttl_seconds and row[0] <= now - self.ttl_seconds:
+            return None
+        return json.loads(row[1])
+
+    def __contains__(self, request_id: str) -> bool:
+        cutoff = self._clock() - self.ttl_seconds if self.ttl_seconds else float("-inf")
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM results WHERE request_id = ? AND stored_at > ?", (request_id, cutoff)
+            ).fetchone()
+        return row is not None
+
+    def _evict(self, now: float) -> None:
+        """Delete expired rows and the oldest rows beyond the cap; caller holds the lock."""
+        if self.ttl_seconds:
+            self._db.execute("DELETE FROM results WHERE stored_at <= ?", (now - self.ttl_seconds,))
+        self._db.execute(
+            "DELETE FROM results WHERE request_id IN ("
+            "SELECT request_id FROM results ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def close(self) -> None:
+        self._db.close()
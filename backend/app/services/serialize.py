@@ -0,0 +1,42 @@
+"""Direct JSON rendering of parser output without re-validating typed data.
+
+`ParsedLine` values are already normalized by the parser, so handlers build
+plain dicts in response-model field order and serialize them once, instead of
+constructing `ParsedItem`/`ParseResult` models that FastAPI would dump and
+validate again. The output parses to the same value as the pydantic JSON
+rendering, but float spelling follows `json.dumps` (`1e+16` where pydantic
+writes `1e16`). Non-finite floats render as `null`, as pydantic does.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from collections.abc import Iterable
+from typing import Any
+
+from app.parser.extractor import ParsedLine
+
+
+def result_payload(input_index: int, items: Iterable[ParsedLine]) -> dict[str, Any]:
+    """Return one `ParseResult`-shaped dict for an input's parsed lines."""
+    return {"input_index": input_index, "items": [item.to_dict() for item in items]}
+
+
+def _finite(value: Any) -> Any:
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def dump_json(payload: Any) -> str:
+    """Serialize compactly like `JSONResponse`; NaN and infinities become `null` instead of a 500."""
+    try:
+        return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    except ValueError:
+        # Rare: only non-finite floats fail, so the common path never walks the payload.
+        return json.dumps(_finite(payload), ensure_ascii=False, allow_nan=False, separators=(",", ":"))
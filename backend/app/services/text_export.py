@@ -0,0 +1,81 @@
+"""CSV and NDJSON export of parsed results, streamed in constant memory.
+
+Both formats use the `HEADERS` column order of the XLSX export and are built
+row by row from `iter_rows`: encoded rows are buffered only until a chunk of
+about `CHUNK_SIZE` bytes is ready, so memory does not grow with the result
+count. `gzip_chunks` compresses any chunk stream incrementally.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import zlib
+from collections.abc import Iterable, Iterator
+
+from app.services.excel import CHUNK_SIZE, HEADERS, ExportResults, iter_rows
+from app.services.serialize import dump_json
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+GZIP_LEVEL = 6
+
+
+def iter_csv_chunks(results: ExportResults, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a UTF-8 CSV (header row first) in chunks of roughly `chunk_size` bytes."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n")
+    writer.writerow(HEADERS)
+    for row in iter_rows(results):
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_ndjson_chunks(results: ExportResults, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield one JSON object per item (keys in `HEADERS` order) per line, chunked."""
+    lines: list[str] = []
+    size = 0
+    for row in iter_rows(results):
+        line = dump_json(dict(zip(HEADERS, row))) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield "".join(lines).encode("utf-8")
+            lines.clear()
+            size = 0
+    if lines:
+        yield "".join(lines).encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    """Compress a chunk stream into one gzip member without buffering the whole body."""
+    # wbits=31 selects the gzip container (header and CRC trailer) instead of raw zlib.
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """Return True when an `Accept-Encoding` header value allows gzip (`q=0` refuses it)."""
+    if not accept_encoding:
+        return False
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        key, _, value = params.partition("=")
+        if key.strip().lower() != "q":
+            return True
+        try:
+            return float(value) > 0
+        except ValueError:
+            return False
+    return False
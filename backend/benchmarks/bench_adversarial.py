@@ -0,0 +1,75 @@
+"""Adversarial-input latency check for text extraction; exits non-zero on a budget miss.
+
+Each case is a document built to trigger regex backtracking in `PATTERNS`:
+single 50,000-character lines (the `MAX_CHARS_PER_ITEM` limit) and many lines
+just under the line gate, mixing `qty`, `/`, long whitespace and digit runs.
+Without the line gate and the `qty_price_slash_unit` tail hint, a 16,000-character
+`Oil qty 1 a ...` line took about 14 s and a 3,000-character whitespace line
+minutes. Every case is parsed the way `/parse` does it (`BatchExtractor`) and
+must finish within `--budget-ms`.
+
+Run from `backend/`: `python -m benchmarks.bench_adversarial [--budget-ms MS]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from app.parser.extractor import BatchExtractor, get_extraction_limits
+
+MAX_CHARS = 50_000
+
+
+def _fill(prefix: str, unit: str, suffix: str, length: int) -> str:
+    return prefix + unit * ((length - len(prefix) - len(suffix)) // len(unit)) + suffix
+
+
+def _lines(prefix: str, unit: str, suffix: str, line_length: int) -> str:
+    # Distinct lines (a numbered leading word), so per-batch line dedupe cannot help.
+    count = MAX_CHARS // (line_length + 1)
+    return "\n".join(_fill(f"L{index} {prefix}", unit, suffix, line_length) for index in range(count))
+
+
+def build_cases() -> dict[str, str]:
+    """Return adversarial documents of at most `MAX_CHARS` characters, by name."""
+    near_gate = get_extraction_limits().max_line_chars - 1
+    return {
+        # Single lines are refused by the length gate before any pattern runs.
+        "one line: qty repeats, bad tail": _fill("Oil ", "qty 1 a ", "/1x", MAX_CHARS),
+        "one line: whitespace run": _fill("Oil qty 5 ", " ", "/kg", MAX_CHARS),
+        "one line: words then price": _fill("Sugar - ", "a ", "- 5", MAX_CHARS),
+        "one line: digit run": _fill("Oil 5 kg ", "5", " 5 kg 10", MAX_CHARS),
+        "gate-sized: qty repeats": _lines("Oil ", "qty 1 a ", "/1x", near_gate),
+        "gate-sized: whitespace blocks": _lines("Oil qty 5", " " * 63 + "x", "/kg", near_gate),
+        "gate-sized: digit blocks": _lines("Oil 5 kg ", "1" * 63 + "-", "5", near_gate),
+        "gate-sized: separators": _lines("Sugar - ", "- ", "- 5", near_gate),
+        "gate-sized: name and units": _lines("A", " 1k", " 5", near_gate),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    failures = 0
+    for name, document in build_cases().items():
+        extractor = BatchExtractor()
+        started = time.perf_counter()
+        items, warnings = extractor.extract(document)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        ok = elapsed_ms <= args.budget_ms
+        failures += not ok
+        print(
+            f"{'ok  ' if ok else 'FAIL'} {name:34} {len(document):6,} chars {elapsed_ms:8.1f} ms"
+            f"  items {len(items):4}  warnings {warnings or '-'}"
+        )
+    if failures:
+        print(f"{failures} case(s) over the {args.budget_ms:g} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Bulk CLI throughput: inline parsing vs. a process pool, ordered and unordered.
+
+A concatenated text file of `--documents` synthetic invoices (form-feed
+separated) is parsed with `run_bulk` into a discarded NDJSON stream, first
+inline, then with `--workers` processes. The pool only pays off with more
+than one CPU; on a single core it measures the dispatch overhead.
+
+Run from `backend/`: `python -m benchmarks.bench_bulk [--documents N] [--workers N]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import os
+import tempfile
+import time
+
+from app.services.bulk import iter_documents, run_bulk
+from benchmarks.corpus import build_documents
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args()
+
+    documents = build_documents(args.documents, lines_per_doc=30)
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".txt", delete=False) as handle:
+        handle.write("\f".join(documents))
+    try:
+        size = os.path.getsize(handle.name)
+        print(f"input: {len(documents)} documents, {size / 1024 / 1024:.1f} MiB, {os.cpu_count()} CPUs")
+        digests = set()
+        for label, workers, ordered in (
+            ("inline", 0, True),
+            (f"{args.workers} workers", args.workers, True),
+            (f"{args.workers} workers, unordered", args.workers, False),
+        ):
+            output = io.BytesIO()
+            started = time.perf_counter()
+            stats = run_bulk(
+                iter_documents([handle.name]), output, workers=workers, chunk_size=args.chunk_size,
+                ordered=ordered, flush_seconds=3600,
+            )
+            elapsed = time.perf_counter() - started
+            if ordered:
+                digests.add(hashlib.sha256(output.getvalue()).hexdigest())
+            print(f"{label:28} {elapsed:7.2f} s  {stats.documents / elapsed:8.0f} docs/s  {stats.items} items")
+        assert len(digests) == 1, "ordered runs disagree"
+    finally:
+        os.unlink(handle.name)
+
+
+if __name__ == "__main__":
+    main()
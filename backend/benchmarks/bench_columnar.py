@@ -0,0 +1,254 @@
+"""Benchmark columnar batch extraction against per-document `extract_items`.
+
+`extract_columnar` splits every line of every input, keeps only the winning
+pattern's raw regex groups in per-field columns, and then runs numeric
+cleaning, unit canonicalization, derived unit price and confidence scoring once
+per column. The resulting `ParseBatch` matches `extract_items` item for item.
+
+This is an experiment, not a serving path: the column passes are plain Python
+loops (NumPy is not a dependency and its rounding differs from `round()`), and
+raw matches are selected by trying every pattern without the dispatcher's
+prefilters, so it does not beat `BatchExtractor`, which routes and pools use.
+
+Run from `backend/`: `python -m benchmarks.bench_columnar [--documents N]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+from app.parser import extract_items
+from app.parser.dispatch import populated_count, price_type_for, resolve_fields
+from app.parser.extractor import ParsedLine, gate_line, is_noise_line, split_candidate_lines
+from app.parser.postprocess import UNIT_MAP, compute_confidence, normalize_name
+from app.parser.regex_patterns import PATTERNS
+from benchmarks.corpus import build_documents
+
+# Same expression as `postprocess.clean_price` uses.
+_CURRENCY_RE = re.compile(r"(?i)(rs\.?|pkr|usd|\$)")
+
+
+@dataclass
+class ParseBatch:
+    """Parsed items for a whole batch stored as parallel columns."""
+
+    input_count: int = 0
+    input_index: list[int] = field(default_factory=list)
+    product_name: list[str | None] = field(default_factory=list)
+    quantity: list[float | None] = field(default_factory=list)
+    unit: list[str | None] = field(default_factory=list)
+    price: list[float | None] = field(default_factory=list)
+    price_type: list[str | None] = field(default_factory=list)
+    derived_unit_price: list[float | None] = field(default_factory=list)
+    raw_line: list[str] = field(default_factory=list)
+    confidence: list[float] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.raw_line)
+
+    def __iter__(self) -> Iterator[ParsedLine]:
+        return self.records()
+
+    def records(self) -> Iterator[ParsedLine]:
+        """Yield every row as a `ParsedLine`, in input order."""
+        for row in zip(
+            self.product_name,
+            self.quantity,
+            self.unit,
+            self.price,
+            self.price_type,
+            self.derived_unit_price,
+            self.raw_line,
+            self.confidence,
+        ):
+            yield ParsedLine(*row)
+
+    def grouped(self) -> list[list[ParsedLine]]:
+        """Return rows grouped per input, aligned with the batch inputs."""
+        groups: list[list[ParsedLine]] = [[] for _ in range(self.input_count)]
+        for index, record in zip(self.input_index, self.records()):
+            groups[index].append(record)
+        return groups
+
+
+def select_raw(line: str) -> tuple[str, dict[str, str | None]] | None:
+    """Return `(pattern_name, raw_groups)` of the match `PatternDispatcher.select` would pick.
+
+    Fields are only resolved when several patterns match, so the common
+    single-match line skips normalization until the column passes.
+    """
+    matches = []
+    for rank, (name, pattern) in enumerate(PATTERNS):
+        match = pattern.match(line)
+        if match:
+            matches.append((rank, name, match.groupdict()))
+    if not matches:
+        return None
+    if len(matches) > 1:
+
+        def score(candidate):
+            rank, name, groups = candidate
+            fields = resolve_fields(name, groups)
+            return (fields[6], populated_count(fields), -rank)
+
+        matches.sort(key=score, reverse=True)
+    _, name, groups = matches[0]
+    return name, groups
+
+
+def clean_prices(values: list[str | None]) -> list[float | None]:
+    """Column form of `clean_price`."""
+    sub = _CURRENCY_RE.sub
+    cleaned: list[float | None] = []
+    append = cleaned.append
+    for value in values:
+        if not value:
+            append(None)
+            continue
+        try:
+            append(float(sub("", value).replace(",", "").strip()))
+        except ValueError:
+            append(None)
+    return cleaned
+
+
+def normalize_units(values: list[str | None]) -> list[str | None]:
+    """Column form of `normalize_unit`."""
+    lookup = UNIT_MAP.get
+    lowered = [value.strip().lower() if value else None for value in values]
+    return [lookup(value, value) if value is not None else None for value in lowered]
+
+
+def maybe_numbers(values: list[str | None]) -> list[float | None]:
+    """Column form of `maybe_number`."""
+    numbers: list[float | None] = []
+    append = numbers.append
+    for value in values:
+        if not value:
+            append(None)
+            continue
+        try:
+            append(float(value))
+        except ValueError:
+            append(None)
+    return numbers
+
+
+# compute_confidence() only looks at which fields are present, so scores for a
+# whole column come from a small table keyed by pattern and presence flags.
+_CONFIDENCE_TABLE: dict[tuple, float] = {}
+
+
+def confidence_column(
+    pattern_names: list[str],
+    names: list[str | None],
+    quantities: list[float | None],
+    units: list[str | None],
+    prices: list[float | None],
+    price_types: list[str | None],
+) -> list[float]:
+    """Column form of `compute_confidence`, exact via a presence-flag lookup table."""
+    table = _CONFIDENCE_TABLE
+    scores: list[float] = []
+    append = scores.append
+    for row in zip(pattern_names, names, quantities, units, prices, price_types):
+        pattern_name, name, qty, unit, price, price_type = row
+        key = (pattern_name, bool(name), qty is not None, bool(unit), price is not None, bool(price_type))
+        score = table.get(key)
+        if score is None:
+            fields = {
+                "product_name": name,
+                "quantity": qty,
+                "unit": unit,
+                "price": price,
+                "price_type": price_type,
+            }
+            score = table[key] = compute_confidence(fields, pattern_name)
+        append(score)
+    return scores
+
+
+def extract_columnar(contents: list[str]) -> ParseBatch:
+    """Parse every input of a batch into one columnar `ParseBatch`."""
+    input_index: list[int] = []
+    pattern_names: list[str] = []
+    raw_names: list[str | None] = []
+    raw_qty: list[str | None] = []
+    raw_units: list[str | None] = []
+    raw_prices: list[str | None] = []
+    raw_lines: list[str] = []
+
+    for index, content in enumerate(contents):
+        for line in split_candidate_lines(content):
+            if gate_line(line) is not None or is_noise_line(line):
+                continue
+            selected = select_raw(line)
+            if selected is None:
+                continue
+            pattern_name, groups = selected
+            input_index.append(index)
+            pattern_names.append(pattern_name)
+            raw_names.append(groups.get("name"))
+            raw_qty.append(groups.get("qty"))
+            raw_units.append(groups.get("unit") or groups.get("price_unit"))
+            raw_prices.append(groups.get("price"))
+            raw_lines.append(line)
+
+    names = [normalize_name(value) for value in raw_names]
+    quantities = maybe_numbers(raw_qty)
+    units = normalize_units(raw_units)
+    prices = clean_prices(raw_prices)
+    price_types = [price_type_for(name, qty) for name, qty in zip(pattern_names, quantities)]
+    derived = [
+        round(price / qty, 4)
+        if price is not None and qty and qty > 0 and price_type == "total"
+        else None
+        for price, qty, price_type in zip(prices, quantities, price_types)
+    ]
+    confidence = confidence_column(pattern_names, names, quantities, units, prices, price_types)
+
+    return ParseBatch(
+        input_count=len(contents),
+        input_index=input_index,
+        product_name=names,
+        quantity=quantities,
+        unit=units,
+        price=prices,
+        price_type=price_types,
+        derived_unit_price=derived,
+        raw_line=raw_lines,
+        confidence=confidence,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=1_000)
+    parser.add_argument("--lines-per-doc", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    documents = build_documents(args.documents, lines_per_doc=args.lines_per_doc)
+
+    scalar = columnar = float("inf")
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        expected = [extract_items(doc) for doc in documents]
+        scalar = min(scalar, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        batch = extract_columnar(documents)
+        columnar = min(columnar, time.perf_counter() - started)
+
+    assert batch.grouped() == expected, "columnar results differ from scalar path"
+    print(f"documents: {len(documents)}  items: {len(batch)}")
+    print(f"scalar:    {scalar * 1e3:8.1f} ms")
+    print(f"columnar:  {columnar * 1e3:8.1f} ms  ({scalar / columnar:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
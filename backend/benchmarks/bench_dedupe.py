@@ -0,0 +1,64 @@
+"""Batch parsing with a 30% duplicate rate: per-input parsing vs. deduplicated batches.
+
+A batch of `--batch` inputs is built from distinct synthetic invoices, then
+`--duplicate-rate` of its positions are replaced by copies of earlier inputs
+(as in ERP exports that repeat an invoice). Distinct invoices already share
+many lines (products, headers, totals), which line-level deduplication picks up.
+
+Run from `backend/`: `python -m benchmarks.bench_dedupe [--batch N] [--duplicate-rate R]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from app.parser import extract_items
+from app.services.parse_pool import BatchStats, ParsePool
+from benchmarks.corpus import build_documents
+
+
+def build_batch(size: int, duplicate_rate: float, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    unique = build_documents(size - int(size * duplicate_rate), lines_per_doc=30)
+    batch = list(unique)
+    for _ in range(size - len(unique)):
+        batch.insert(rng.randrange(len(batch) + 1), rng.choice(unique))
+    return batch
+
+
+def best_of(rounds: int, run) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--duplicate-rate", type=float, default=0.3)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    batch = build_batch(args.batch, args.duplicate_rate)
+    pool = ParsePool()
+    stats = BatchStats()
+    assert pool.parse_many(batch, stats) == [extract_items(text) for text in batch]
+    print(
+        f"inputs: {stats.inputs}, duplicate inputs: {stats.duplicate_inputs}"
+        f" ({stats.duplicate_inputs / stats.inputs:.0%}), lines: {stats.lines},"
+        f" duplicate lines in unique inputs: {stats.duplicate_lines}"
+    )
+
+    per_input = best_of(args.rounds, lambda: [extract_items(text) for text in batch])
+    deduped = best_of(args.rounds, lambda: pool.parse_many(batch))
+    print(f"per-input parsing  {per_input * 1000:8.1f} ms")
+    print(f"deduplicated       {deduped * 1000:8.1f} ms  ({per_input / deduped:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark the pattern dispatcher against the legacy try-every-pattern engine.
+
+Run from `backend/`: `python -m benchmarks.bench_dispatch [--lines N]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.parser.dispatch import resolve_fields
+from app.parser.extractor import ParsedLine, extract_from_line, is_noise_line
+from app.parser.regex_patterns import PATTERNS
+from benchmarks.corpus import build_lines
+
+
+def legacy_extract_from_line(line: str) -> ParsedLine | None:
+    """Reference engine: run every pattern, build every candidate, sort them."""
+    if is_noise_line(line):
+        return None
+
+    candidates: list[ParsedLine] = []
+    for pattern_name, pattern in PATTERNS:
+        match = pattern.match(line)
+        if not match:
+            continue
+        name, qty, unit, price, price_type, derived, confidence = resolve_fields(
+            pattern_name, match.groupdict()
+        )
+        candidates.append(
+            ParsedLine(
+                product_name=name,
+                quantity=qty,
+                unit=unit,
+                price=price,
+                price_type=price_type,
+                derived_unit_price=derived,
+                raw_line=line,
+                confidence=confidence,
+            )
+        )
+
+    if not candidates:
+        return None
+
+    return sorted(
+        candidates,
+        key=lambda c: (
+            c.confidence,
+            sum(
+                value is not None and value != ""
+                for value in [c.product_name, c.quantity, c.unit, c.price, c.price_type]
+            ),
+        ),
+        reverse=True,
+    )[0]
+
+
+def _time(func, lines: list[str], repeat: int) -> float:
+    """Return the best wall time of `repeat` passes of `func` over `lines`."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for line in lines:
+            func(line)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    lines = build_lines(args.lines)
+    mismatches = sum(extract_from_line(line) != legacy_extract_from_line(line) for line in lines)
+
+    legacy = _time(legacy_extract_from_line, lines, args.repeat)
+    dispatched = _time(extract_from_line, lines, args.repeat)
+
+    print(f"lines:       {len(lines)}")
+    print(f"mismatches:  {mismatches}")
+    print(f"legacy:      {legacy * 1e3:8.1f} ms  ({legacy / len(lines) * 1e6:.2f} us/line)")
+    print(f"dispatched:  {dispatched * 1e3:8.1f} ms  ({dispatched / len(lines) * 1e6:.2f} us/line)")
+    print(f"speedup:     {legacy / dispatched:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Memory profile of XLSX export for 100k rows: regular workbook vs. write-only, spooled chunks.
+
+The legacy path builds a normal openpyxl `Workbook`, saves it into a `BytesIO`
+and copies the bytes into a second `BytesIO` for the response. The streaming
+path writes a write-only workbook into a spooled temp file, then yields chunks.
+Peak traced allocations exclude the input `ParseResult` objects; timings include
+tracemalloc overhead and are only comparable with each other.
+
+Run from `backend/`: `python -m benchmarks.bench_excel [--rows N]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from io import BytesIO
+
+from openpyxl import Workbook
+
+from app.parser import extract_items
+from app.schemas import ParseResult
+from app.services.excel import HEADERS, iter_xlsx_chunks
+from app.services.serialize import result_payload
+from benchmarks.corpus import build_documents
+
+
+def legacy_export(results: list[ParseResult]) -> int:
+    """Previous in-memory workbook + `BytesIO(xlsx_bytes)` response body; returns bytes sent."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "parsed_items"
+    ws.append(HEADERS)
+    for group in results:
+        for item in group.items:
+            ws.append(
+                [
+                    group.input_index,
+                    item.product_name,
+                    item.quantity,
+                    item.unit,
+                    item.price,
+                    item.price_type,
+                    item.derived_unit_price,
+                    item.raw_line,
+                    item.confidence,
+                ]
+            )
+    output = BytesIO()
+    wb.save(output)
+    body = BytesIO(output.getvalue())
+    return sum(len(chunk) for chunk in iter(lambda: body.read(64 * 1024), b""))
+
+
+def streaming_export(results: list[ParseResult]) -> int:
+    return sum(len(chunk) for chunk in iter_xlsx_chunks(results))
+
+
+def build_results(rows: int) -> list[ParseResult]:
+    results: list[ParseResult] = []
+    count = 0
+    for index, document in enumerate(build_documents(rows // 8 + 1, lines_per_doc=20)):
+        items = extract_items(document)[: rows - count]
+        results.append(ParseResult.model_validate(result_payload(index, items)))
+        count += len(items)
+        if count >= rows:
+            break
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    results = build_results(args.rows)
+    print(f"rows: {sum(len(group.items) for group in results):,}")
+    for label, export in (("legacy workbook", legacy_export), ("write-only stream", streaming_export)):
+        gc.collect()
+        tracemalloc.start()
+        started = time.perf_counter()
+        size = export(results)
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(
+            f"{label:18} {elapsed:6.2f} s  file {size / 2**20:5.1f} MiB"
+            f"  peak traced {peak / 2**20:7.1f} MiB ({peak / size:4.1f}x file size)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Export formats for the same 100k rows: XLSX stream vs. CSV and NDJSON, plain and gzip.
+
+Each exporter consumes the same `ParseResult` list and its chunks are counted
+and discarded, as the HTTP response would. Reported are wall time, body size
+and peak traced allocations (run separately from the timing pass, so the
+timings carry no tracemalloc overhead).
+
+Run from `backend/`: `python -m benchmarks.bench_export_formats [--rows N]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+
+from app.schemas import ParseResult
+from app.services.excel import iter_xlsx_chunks
+from app.services.text_export import gzip_chunks, iter_csv_chunks, iter_ndjson_chunks
+from benchmarks.bench_excel import build_results
+
+Exporter = Callable[[list[ParseResult]], Iterator[bytes]]
+
+EXPORTERS: list[tuple[str, Exporter]] = [
+    ("xlsx", iter_xlsx_chunks),
+    ("csv", iter_csv_chunks),
+    ("csv + gzip", lambda results: gzip_chunks(iter_csv_chunks(results))),
+    ("ndjson", iter_ndjson_chunks),
+    ("ndjson + gzip", lambda results: gzip_chunks(iter_ndjson_chunks(results))),
+]
+
+
+def drain(chunks: Iterator[bytes]) -> int:
+    return sum(len(chunk) for chunk in chunks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    results = build_results(args.rows)
+    print(f"rows: {sum(len(group.items) for group in results):,}")
+    for label, exporter in EXPORTERS:
+        gc.collect()
+        started = time.perf_counter()
+        size = drain(exporter(results))
+        elapsed = time.perf_counter() - started
+
+        gc.collect()
+        tracemalloc.start()
+        drain(exporter(results))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(
+            f"{label:14} {elapsed:6.2f} s  body {size / 2**20:6.2f} MiB"
+            f"  {args.rows / elapsed / 1000:7.1f}k rows/s  peak traced {peak / 2**20:5.2f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
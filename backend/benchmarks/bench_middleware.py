@@ -0,0 +1,129 @@
+"""Requests per second through the middleware stack: BaseHTTPMiddleware vs. raw ASGI.
+
+Builds the same tiny FastAPI app (GET /health, POST /parse-like JSON echo) with
+no middleware, with the previous `BaseHTTPMiddleware` payload limit + fixed-window
+rate limit, and with the current raw ASGI pair, then drives each in-process via
+httpx's ASGI transport.
+
+Run from `backend/`: `python -m benchmarks.bench_middleware [--requests N]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import defaultdict, deque
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from app.middleware.payload_limit import PayloadLimitMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+
+
+class LegacyPayloadLimitMiddleware(BaseHTTPMiddleware):
+    """The previous buffering payload limiter."""
+
+    def __init__(self, app, max_bytes: int = 200_000):
+        super().__init__(app)
+        self.max_bytes = max_bytes
+
+    async def dispatch(self, request, call_next):
+        content_length = request.headers.get("content-length")
+        if content_length and int(content_length) > self.max_bytes:
+            return JSONResponse(status_code=413, content={"detail": "Payload too large."})
+        body = await request.body()
+        if len(body) > self.max_bytes:
+            return JSONResponse(status_code=413, content={"detail": "Payload too large."})
+        request._body = body
+        return await call_next(request)
+
+
+class LegacyFixedWindowRateLimitMiddleware(BaseHTTPMiddleware):
+    """The previous per-IP deque fixed-window limiter."""
+
+    def __init__(self, app, requests_per_minute: int = 60):
+        super().__init__(app)
+        self.requests_per_minute = requests_per_minute
+        self.hits: dict[str, deque[float]] = defaultdict(deque)
+
+    async def dispatch(self, request, call_next):
+        ip = request.client.host if request.client else "unknown"
+        now = time.time()
+        bucket = self.hits[ip]
+        while bucket and bucket[0] < now - 60:
+            bucket.popleft()
+        if len(bucket) >= self.requests_per_minute:
+            return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded."})
+        bucket.append(now)
+        return await call_next(request)
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    @app.post("/parse")
+    async def parse(request: Request):
+        payload = await request.json()
+        return {"length": len(payload["content"])}
+
+    limit = 10**9  # never throttle; measure bookkeeping cost only
+    if stack == "legacy":
+        app.add_middleware(LegacyPayloadLimitMiddleware, max_bytes=200_000)
+        app.add_middleware(LegacyFixedWindowRateLimitMiddleware, requests_per_minute=limit)
+    elif stack == "asgi":
+        app.add_middleware(PayloadLimitMiddleware, max_bytes=200_000)
+        app.add_middleware(RateLimitMiddleware, requests_per_minute=limit)
+    return app
+
+
+async def drive(app: FastAPI, requests: int, body: dict) -> tuple[float, float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):
+            await client.get("/health")
+        started = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/health")
+        health_rps = requests / (time.perf_counter() - started)
+        started = time.perf_counter()
+        for _ in range(requests):
+            await client.post("/parse", json=body)
+        parse_rps = requests / (time.perf_counter() - started)
+    return health_rps, parse_rps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--body-bytes", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    body = {"content": "Sugar – Rs. 6,000 (50 kg)\n" * (args.body_bytes // 27)}
+    stacks = ("none", "legacy", "asgi")
+    best = {stack: (0.0, 0.0) for stack in stacks}
+    # Interleave rounds so warm-up and CPU frequency drift hit every stack alike.
+    for _ in range(args.rounds):
+        for stack in stacks:
+            rps = asyncio.run(drive(build_app(stack), args.requests, body))
+            best[stack] = tuple(max(pair) for pair in zip(best[stack], rps))
+
+    baseline = best["none"]
+    for stack in stacks:
+        health_rps, parse_rps = best[stack]
+        print(
+            f"{stack:7} GET /health {health_rps:8.0f} req/s ({health_rps / baseline[0]:4.0%})"
+            f"   POST /parse {parse_rps:8.0f} req/s ({parse_rps / baseline[1]:4.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark the combined noise classifier against the per-pattern noise loop.
+
+Run from `backend/`: `python -m benchmarks.bench_noise [--lines N]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.parser.extractor import is_noise_line, noise_statistics
+from app.parser.regex_patterns import NOISE_PATTERNS
+from benchmarks.corpus import build_lines
+
+
+def legacy_is_noise_line(line: str) -> bool:
+    """Reference filter: length check, letter scan, then one search per rule."""
+    lowered = line.lower().strip()
+    if len(lowered) < 3:
+        return True
+    if all(not ch.isalpha() for ch in lowered):
+        return True
+    return any(pattern.search(lowered) for _, pattern in NOISE_PATTERNS)
+
+
+def _time(func, lines: list[str], repeat: int) -> float:
+    """Return the best wall time of `repeat` passes of `func` over `lines`."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for line in lines:
+            func(line)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--noise-ratio", type=float, default=0.6)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    lines = build_lines(args.lines, noise_ratio=args.noise_ratio)
+    mismatches = sum(is_noise_line(line) != legacy_is_noise_line(line) for line in lines)
+
+    legacy = _time(legacy_is_noise_line, lines, args.repeat)
+    combined = _time(is_noise_line, lines, args.repeat)
+
+    print(f"lines:       {len(lines)}")
+    print(f"mismatches:  {mismatches}")
+    print(f"legacy:      {legacy * 1e3:8.1f} ms  ({legacy / len(lines) * 1e6:.2f} us/line)")
+    print(f"combined:    {combined * 1e3:8.1f} ms  ({combined / len(lines) * 1e6:.2f} us/line)")
+    print(f"speedup:     {legacy / combined:.2f}x")
+    print("rules fired:", dict(noise_statistics(lines).most_common()))
+
+
+if __name__ == "__main__":
+    main()
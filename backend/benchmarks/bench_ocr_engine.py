@@ -0,0 +1,66 @@
+"""Per-image OCR latency: warm tesserocr handles vs. a pytesseract subprocess per call.
+
+Renders small synthetic receipt images, then times the first (cold) call and
+the steady-state median per engine. Engines whose dependencies are missing are
+reported as unavailable instead of failing the run.
+
+Run from `backend/`: `python -m benchmarks.bench_ocr_engine [--images N]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from PIL import Image, ImageDraw
+
+from app.services.ocr import OCRUnavailableError, create_ocr_engine
+from benchmarks.corpus import build_lines
+
+
+def render_receipts(count: int, lines_per_image: int = 6) -> list[Image.Image]:
+    """Draw `count` grayscale receipt images from corpus lines."""
+    lines = build_lines(count * lines_per_image, seed=7)
+    images = []
+    for index in range(count):
+        image = Image.new("L", (640, 24 * lines_per_image + 16), 255)
+        draw = ImageDraw.Draw(image)
+        for row, line in enumerate(lines[index * lines_per_image:(index + 1) * lines_per_image]):
+            draw.text((8, 8 + row * 24), line, fill=0)
+        images.append(image)
+    return images
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=30)
+    parser.add_argument("--engines", nargs="+", default=["tesserocr", "pytesseract"])
+    args = parser.parse_args()
+
+    images = render_receipts(args.images)
+    print(f"images: {len(images)}  size: {images[0].size[0]}x{images[0].size[1]}")
+
+    for name in args.engines:
+        try:
+            engine = create_ocr_engine(name, size=1)
+            started = time.perf_counter()
+            engine.image_to_text(images[0])
+            cold = time.perf_counter() - started
+            timings = []
+            for image in images[1:]:
+                started = time.perf_counter()
+                engine.image_to_text(image)
+                timings.append(time.perf_counter() - started)
+            engine.close()
+        except OCRUnavailableError as exc:
+            print(f"{name:12} unavailable: {exc}")
+            continue
+        print(
+            f"{name:12} cold {cold * 1e3:8.1f} ms   median {statistics.median(timings) * 1e3:8.1f} ms"
+            f"   p95 {statistics.quantiles(timings, n=20)[-1] * 1e3:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Scaling benchmark for process-pool batch parsing with 1, 2, 4 and 8 workers.
+
+Run from `backend/`: `python -m benchmarks.bench_parse_pool [--documents N]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from app.services.parse_pool import ParsePool
+from benchmarks.corpus import build_documents
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--lines-per-doc", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    documents = build_documents(args.documents, lines_per_doc=args.lines_per_doc)
+    expected = ParsePool(workers=0).parse_many(documents)
+    print(f"documents: {len(documents)}  lines/doc: {args.lines_per_doc}  cpus: {os.cpu_count()}")
+
+    baseline = None
+    for workers in args.workers:
+        pool = ParsePool(workers=workers)
+        if pool.enabled:
+            pool.parse_many(documents[:workers * 2])  # start and warm up the workers
+        started = time.perf_counter()
+        results = pool.parse_many(documents)
+        elapsed = time.perf_counter() - started
+        pool.shutdown()
+
+        assert results == expected, "pool results differ from inline parsing"
+        baseline = baseline or elapsed
+        print(f"workers={workers:<2} {elapsed * 1e3:9.1f} ms  speedup {baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Memory and throughput of 100k parsed items: dict-backed models vs. compact lines.
+
+Legacy path: `ParsedLine` with a per-instance `__dict__`, converted to
+`ParsedItem` models, wrapped in `ParseResponse` and dumped/validated the way
+FastAPI handles a returned model. New path: tuple-based `ParsedLine` rendered
+directly with `result_payload` + `dump_json`.
+
+Run from `backend/`: `python -m benchmarks.bench_parsed_line [--items N]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from app.parser.extractor import ParsedLine
+from app.schemas import ParsedItem, ParseResponse, ParseResult
+from app.services.serialize import dump_json, result_payload
+
+
+@dataclass
+class LegacyParsedLine:
+    product_name: str | None
+    quantity: float | None
+    unit: str | None
+    price: float | None
+    price_type: str | None
+    derived_unit_price: float | None
+    raw_line: str
+    confidence: float
+
+
+def _fields(i: int) -> dict:
+    return {
+        "product_name": f"Product {i % 500}",
+        "quantity": float(i % 50 + 1),
+        "unit": "kg",
+        "price": float(i % 9000 + 100),
+        "price_type": "total",
+        "derived_unit_price": round((i % 9000 + 100) / (i % 50 + 1), 4),
+        "raw_line": f"Product {i % 500} - {i % 9000 + 100} ({i % 50 + 1} kg)",
+        "confidence": 1.0,
+    }
+
+
+def _measure(build, render, count: int) -> tuple[float, float, float]:
+    """Return (build MiB, build seconds, render seconds) for `count` items."""
+    rows = [_fields(i) for i in range(count)]
+    tracemalloc.start()
+    started = time.perf_counter()
+    items = build(rows)
+    built = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    render(items)
+    rendered = time.perf_counter() - started
+    return size / 2**20, built, rendered
+
+
+def legacy_build(rows):
+    return [LegacyParsedLine(**row) for row in rows]
+
+
+def legacy_render(items):
+    results = [ParseResult(input_index=0, items=[ParsedItem(**item.__dict__) for item in items])]
+    response = ParseResponse(request_id="0" * 64, results=results)
+    # FastAPI: dump the returned model, validate against response_model, serialize.
+    return ParseResponse.model_validate(response.model_dump()).model_dump_json()
+
+
+def compact_build(rows):
+    return [ParsedLine(**row) for row in rows]
+
+
+def compact_render(items):
+    return dump_json({"request_id": "0" * 64, "results": [result_payload(0, items)]})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100_000)
+    args = parser.parse_args()
+
+    legacy = _measure(legacy_build, legacy_render, args.items)
+    compact = _measure(compact_build, compact_render, args.items)
+
+    print(f"items: {args.items}")
+    print(f"{'':10}{'memory MiB':>12}{'build ms':>12}{'render ms':>12}{'bytes/item':>12}")
+    for label, (mib, built, rendered) in (("legacy", legacy), ("compact", compact)):
+        per_item = mib * 2**20 / args.items
+        print(f"{label:10}{mib:12.1f}{built * 1e3:12.1f}{rendered * 1e3:12.1f}{per_item:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
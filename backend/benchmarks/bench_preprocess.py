@@ -0,0 +1,105 @@
+"""OCR preprocessing benchmark on synthetic 12 MP "phone photo" invoices.
+
+Each image is a rendered invoice (header, product lines, footer) on a 4000x3000
+JPEG that is slightly rotated and carries an EXIF orientation tag, like a photo
+taken in portrait. Configurations are timed for preprocessing and, when an OCR
+engine is installed, for OCR plus extraction quality: the share of items that
+`extract_items` finds in the ground-truth text and also finds, with the same
+name and price, in the OCR text.
+
+Run from `backend/`: `python -m benchmarks.bench_preprocess [--images N]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import random
+import statistics
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.parser import extract_items
+from app.services.ocr import OCRUnavailableError, create_ocr_engine
+from app.services.preprocess import PreprocessConfig, preprocess_image
+from benchmarks.corpus import noise_line, product_line
+
+CONFIGS = {
+    "none": PreprocessConfig(enabled=False),
+    "default": PreprocessConfig(),
+    "deskew+binarize": PreprocessConfig(deskew=True, binarize=True),
+}
+
+
+def render_photo(rng: random.Random, lines: int = 14) -> tuple[bytes, str]:
+    """Return `(jpeg_bytes, ground_truth_text)` for one synthetic phone photo."""
+    text_lines = [noise_line(rng), noise_line(rng)]
+    text_lines += [product_line(rng) for _ in range(lines)]
+    text_lines.append(noise_line(rng))
+
+    font = ImageFont.load_default(size=64)
+    page = Image.new("RGB", (3000, 4000), (236, 232, 224))
+    draw = ImageDraw.Draw(page)
+    for row, line in enumerate(text_lines):
+        draw.text((180, 220 + row * 200), line, fill=(20, 20, 24), font=font)
+    page = page.rotate(rng.uniform(-3, 3), Image.Resampling.BICUBIC, fillcolor=(236, 232, 224))
+
+    # Stored sideways with orientation 6, as cameras do for portrait shots.
+    stored = page.transpose(Image.Transpose.ROTATE_90)
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buffer = io.BytesIO()
+    stored.save(buffer, format="JPEG", quality=90, exif=exif.tobytes(), dpi=(72, 72))
+    return buffer.getvalue(), "\n".join(text_lines)
+
+
+def item_keys(text: str) -> set[tuple]:
+    return {(item.product_name, item.price) for item in extract_items(text)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=5)
+    parser.add_argument("--engine", default="auto")
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    photos = [render_photo(rng) for _ in range(args.images)]
+    try:
+        engine = create_ocr_engine(args.engine, size=1)
+        engine.image_to_text(Image.new("L", (64, 32), 255))
+    except OCRUnavailableError as exc:
+        engine = None
+        print(f"OCR unavailable ({exc}); reporting preprocessing only.")
+    print(f"images: {len(photos)}  jpeg bytes: {statistics.mean(len(p) for p, _ in photos):,.0f} avg")
+
+    for label, config in CONFIGS.items():
+        prep_times, ocr_times, found, expected = [], [], 0, 0
+        for jpeg, truth in photos:
+            started = time.perf_counter()
+            image, _ = preprocess_image(Image.open(io.BytesIO(jpeg)), config)
+            prep_times.append(time.perf_counter() - started)
+            if engine is None:
+                continue
+            started = time.perf_counter()
+            text = engine.image_to_text(image)
+            ocr_times.append(time.perf_counter() - started)
+            wanted = item_keys(truth)
+            expected += len(wanted)
+            found += len(wanted & item_keys(text))
+
+        line = (
+            f"{label:16} preprocess {statistics.mean(prep_times) * 1e3:8.1f} ms"
+            f"  output {image.width}x{image.height} {image.mode}"
+        )
+        if engine is not None:
+            line += (
+                f"  ocr {statistics.mean(ocr_times) * 1e3:8.1f} ms"
+                f"  items found {found}/{expected} ({found / max(expected, 1):.0%})"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
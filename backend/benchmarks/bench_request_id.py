@@ -0,0 +1,70 @@
+"""Benchmark streaming request-id hashing against dump-everything JSON hashing.
+
+Run from `backend/`: `python -m benchmarks.bench_request_id [--documents N]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import time
+
+from app.parser import extract_items
+from app.schemas import ParsedItem, ParseResult
+from app.services.request_id import RequestIdHasher
+from benchmarks.corpus import build_documents
+
+
+def legacy_request_id(contents: list[str], results: list[ParseResult]) -> str:
+    """Previous scheme: dump every result, serialize canonically, then hash."""
+    payload = {
+        "content": None,
+        "contents": contents,
+        "results": [result.model_dump() for result in results],
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def streaming_request_id(contents: list[str], parsed: list[list]) -> str:
+    hasher = RequestIdHasher("parse")
+    hasher.add_value(None)
+    hasher.add_texts(contents)
+    for index, items in enumerate(parsed):
+        hasher.add_result(index, items)
+    return hasher.hexdigest()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--lines-per-doc", type=int, default=50)
+    args = parser.parse_args()
+
+    contents = build_documents(args.documents, lines_per_doc=args.lines_per_doc)
+    started = time.perf_counter()
+    parsed = [extract_items(text) for text in contents]
+    parse_time = time.perf_counter() - started
+    results = [
+        ParseResult(input_index=i, items=[ParsedItem(**item.to_dict()) for item in items])
+        for i, items in enumerate(parsed)
+    ]
+
+    started = time.perf_counter()
+    legacy_request_id(contents, results)
+    legacy = time.perf_counter() - started
+
+    started = time.perf_counter()
+    streaming_request_id(contents, parsed)
+    streaming = time.perf_counter() - started
+
+    items = sum(len(items) for items in parsed)
+    print(f"documents: {len(contents)}  items: {items}")
+    print(f"parse:      {parse_time * 1e3:8.1f} ms")
+    print(f"legacy id:  {legacy * 1e3:8.1f} ms")
+    print(f"stream id:  {streaming * 1e3:8.1f} ms  ({legacy / streaming:.2f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Live-editing cost: full re-parse of a document vs. a one-line edit in a parse session.
+
+A `--lines`-line document (about the `/parse` 50k-character limit by default)
+is edited one line at a time, as the frontend does on each keystroke. The full
+path runs `extract_items` plus the `/parse` request id on the whole text; the
+session path applies one `(start, 1, [line])` splice.
+
+Run from `backend/`: `python -m benchmarks.bench_sessions [--lines N] [--edits N]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from app.parser import extract_items
+from app.services.parse_session import ParseSession
+from app.services.request_id import RequestIdHasher
+from benchmarks.corpus import build_lines, product_line
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=1500)
+    parser.add_argument("--edits", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    session = ParseSession("bench", "\n".join(build_lines(args.lines)), max_chars=10**9)
+    # Some corpus entries span several lines; edits index the session's physical lines.
+    lines = list(session.lines)
+    edits = [(rng.randrange(len(lines)), product_line(rng)) for _ in range(args.edits)]
+
+    started = time.perf_counter()
+    for index, line in edits:
+        lines[index] = line
+        content = "\n".join(lines)
+        hasher = RequestIdHasher("parse")
+        hasher.add_value(content)
+        hasher.add_texts(None)
+        hasher.add_result(0, extract_items(content))
+        hasher.hexdigest()
+    full = (time.perf_counter() - started) / args.edits
+
+    started = time.perf_counter()
+    for index, line in edits:
+        session.apply(session.request_id, [(index, 1, [line])])
+    incremental = (time.perf_counter() - started) / args.edits
+
+    assert list(session.items()) == extract_items("\n".join(lines))
+    print(f"document: {len(lines)} lines, {session.chars} chars")
+    print(f"full re-parse  {full * 1000:8.2f} ms/edit")
+    print(f"session edit   {incremental * 1000:8.2f} ms/edit  ({full / incremental:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
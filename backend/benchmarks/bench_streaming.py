@@ -0,0 +1,68 @@
+"""Peak memory of parsing one multi-megabyte document: whole-text vs. chunked `iter_items`.
+
+The document (`--megabytes` of synthetic invoice lines) is written to a temp
+file. The whole-text path reads it into one string and builds the item list;
+the streaming path reads the file `CHUNK_CHARS` at a time and counts items as
+they are yielded. Peak Python allocations are measured with `tracemalloc`.
+
+Run from `backend/`: `python -m benchmarks.bench_streaming [--megabytes N]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+from app.parser import extract_items, iter_items
+from app.parser.extractor import configure_extraction_limits, get_extraction_limits
+from benchmarks.corpus import build_documents
+
+
+def measure(run) -> tuple[int, float, int]:
+    """Return (result, seconds, peak traced bytes) for one call."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--megabytes", type=int, default=8)
+    args = parser.parse_args()
+
+    # One long document: lift the per-document CPU budget for the comparison.
+    configure_extraction_limits(get_extraction_limits()._replace(document_budget=0))
+    block = "\n".join(build_documents(50, lines_per_doc=30)) + "\n"
+    repeats = max(1, args.megabytes * 1024 * 1024 // len(block.encode("utf-8")))
+
+    with tempfile.NamedTemporaryFile("w+", encoding="utf-8", suffix=".txt") as handle:
+        for _ in range(repeats):
+            handle.write(block)
+        handle.flush()
+        size = handle.tell()
+
+        def whole() -> int:
+            handle.seek(0)
+            return len(extract_items(handle.read()))
+
+        def streamed() -> int:
+            handle.seek(0)
+            return sum(1 for _ in iter_items(handle))
+
+        whole_items, whole_seconds, whole_peak = measure(whole)
+        streamed_items, streamed_seconds, streamed_peak = measure(streamed)
+
+    assert whole_items == streamed_items
+    print(f"document: {size / 1024 / 1024:.1f} MiB, {whole_items} items")
+    print(f"whole text   {whole_seconds:7.2f} s  peak {whole_peak / 1024 / 1024:8.1f} MiB")
+    print(f"iter_items   {streamed_seconds:7.2f} s  peak {streamed_peak / 1024 / 1024:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Deterministic synthetic invoice corpus shared by benchmarks and equivalence tests."""
+
+from __future__ import annotations
+
+import random
+
+PRODUCTS = [
+    "Sugar",
+    "Wheat Flour",
+    "Cooking Oil",
+    "Basmati Rice",
+    "Milk",
+    "Green Tea",
+    "Detergent 2in1",
+    "Salt & Pepper",
+    "Soap Bar",
+    "Mineral Water",
+]
+UNITS = ["kg", "kgs", "g", "pcs", "piece", "bottles", "bottle", "l", "ltr", "ml", "packs", "box"]
+CURRENCIES = ["", "Rs. ", "Rs ", "PKR ", "$", "rs."]
+SEPARATORS = [" – ", " - ", ": ", " -", "-"]
+
+NOISE_LINES = [
+    "Invoice # INV-{n}",
+    "INVOICE NUMBER {n}",
+    "NTN: 12345-{n}",
+    "STRN 3277876{n}",
+    "Sales Tax 17%",
+    "GST included",
+    "Total Amount: {n}",
+    "TOTAL DUE",
+    "Address: Plot {n}, Main Street",
+    "{d}/{m}/2024",
+    "{d}-{m}-24",
+    "----",
+    "12",
+    "{n}",
+    "Thank you for your business",
+    "Customer: Ali Traders",
+]
+
+EDGE_LINES = [
+    "",
+    "  ",
+    "ab",
+    "Item",
+    "Sugar",
+    "Sugar 50",
+    "Sugar - ,",
+    "Sugar – Rs. , (50 kg)",
+    "Oil: Qty 0 bottles Price 0/bottle",
+    "Oil qty 3 Price 100/ltr",
+    "Quantıty check 5 kg 300",
+    "Kelvin Qty 2 K Price 10/K",
+    "Straße 5 kg 900",
+    "Çay – Rs. 500 (2 kg)",
+    "Rice ٣ kg ١٢٠",
+    "Milk (2 l @ Rs. 200)",
+    "Milk (2l@200)  ",
+    "Tea\t-\t$15",
+    "Box 12 pcs 1,200.50",
+    "A1 - 10, B2 - 20",
+    "Bread; Eggs 12 pcs 300; Butter - 450",
+    "Sugar\r\nWheat Flour (10kg @ 950)\rRice - 3000",
+    "X" * 300 + " 5 kg 100",
+]
+
+
+def product_line(rng: random.Random) -> str:
+    """Return one product line in a randomly chosen supported layout."""
+    name = rng.choice(PRODUCTS)
+    unit = rng.choice(UNITS)
+    qty = rng.choice([1, 2, 5, 10, 25, 50, 0.5, 1.25])
+    price = rng.choice(["950", "1,200", "6,000", "45.50", "3000", "12,500.75"])
+    currency = rng.choice(CURRENCIES)
+    sep = rng.choice(SEPARATORS)
+    layout = rng.randrange(7)
+    if layout == 0:
+        return f"{name}{sep}{currency}{price} ({qty} {unit})"
+    if layout == 1:
+        return f"{name} ({qty}{unit} @ {currency}{price})"
+    if layout == 2:
+        return f"{name}: Qty {qty} {unit} Price {currency}{price}/{unit}"
+    if layout == 3:
+        return f"{name} {qty} {unit} {currency}{price}"
+    if layout == 4:
+        return f"{name}{sep}{currency}{price}"
+    if layout == 5:
+        return f"{name} quantity {qty} {unit} @ {currency}{price}/{unit}"
+    return f"{name.upper()} x{qty} {unit} total {price}"
+
+
+def noise_line(rng: random.Random) -> str:
+    """Return one header/footer style line that should be filtered out."""
+    template = rng.choice(NOISE_LINES)
+    return template.format(n=rng.randrange(1000, 9999), d=rng.randrange(1, 29), m=rng.randrange(1, 13))
+
+
+def build_lines(count: int, seed: int = 7, noise_ratio: float = 0.4) -> list[str]:
+    """Build `count` candidate lines mixing product, noise and edge-case lines."""
+    rng = random.Random(seed)
+    lines: list[str] = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < noise_ratio:
+            lines.append(noise_line(rng))
+        elif roll < noise_ratio + 0.05:
+            lines.append(rng.choice(EDGE_LINES))
+        else:
+            lines.append(product_line(rng))
+    return lines
+
+
+def build_documents(count: int, lines_per_doc: int = 20, seed: int = 11) -> list[str]:
+    """Build `count` invoice-like text documents of roughly `lines_per_doc` lines."""
+    rng = random.Random(seed)
+    return [
+        "\n".join(build_lines(lines_per_doc, seed=rng.randrange(1 << 30)))
+        for _ in range(count)
+    ]
@@ -0,0 +1,90 @@
+"""Load test: `/parse` and `/health` latency while OCR is saturated.
+
+OCR is replaced by a stub that blocks its thread for `--ocr-seconds`, the way a
+slow Tesseract run would. The script fires more uploads than the OCR pool
+admits and concurrently polls `/health` and `/parse`, then reports latencies
+and how many uploads were shed with 503.
+
+Run from `backend/`: `python -m benchmarks.load_ocr`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import statistics
+import time
+
+import httpx
+from PIL import Image
+
+import app.main as main
+
+
+def _png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), "white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def _timed(coro) -> tuple[float, httpx.Response]:
+    started = time.perf_counter()
+    response = await coro
+    return time.perf_counter() - started, response
+
+
+async def run(args: argparse.Namespace) -> None:
+    def slow_ocr(image_bytes: bytes, page: int = 0) -> str:
+        time.sleep(args.ocr_seconds)
+        return "Sugar – Rs. 6,000 (50 kg)"
+
+    main.extract_text_from_image_bytes = slow_ocr
+    image = _png_bytes()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def upload():
+            files = {"file": ("invoice.png", image, "image/png")}
+            return await _timed(client.post("/parse-image", files=files))
+
+        async def probe(path: str, **kwargs):
+            timings = []
+            for _ in range(args.probes):
+                if kwargs:
+                    elapsed, _ = await _timed(client.post(path, **kwargs))
+                else:
+                    elapsed, _ = await _timed(client.get(path))
+                timings.append(elapsed)
+                await asyncio.sleep(args.ocr_seconds / args.probes)
+            return timings
+
+        uploads = [asyncio.create_task(upload()) for _ in range(args.uploads)]
+        await asyncio.sleep(0.01)
+        health, parse = await asyncio.gather(
+            probe("/health"),
+            probe("/parse", json={"content": "Wheat Flour (10kg @ 950)"}),
+        )
+        upload_results = await asyncio.gather(*uploads)
+        metrics = (await client.get("/metrics")).json()["ocr"]
+
+    statuses = [response.status_code for _, response in upload_results]
+    print(f"uploads: {len(statuses)}  ok: {statuses.count(200)}  shed (503): {statuses.count(503)}")
+    for label, timings in (("/health", health), ("/parse", parse)):
+        print(
+            f"{label:8} p50 {statistics.median(timings) * 1e3:7.2f} ms"
+            f"   max {max(timings) * 1e3:7.2f} ms   (ocr job {args.ocr_seconds * 1e3:.0f} ms)"
+        )
+    print("ocr metrics:", metrics)
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uploads", type=int, default=30)
+    parser.add_argument("--ocr-seconds", type=float, default=0.5)
+    parser.add_argument("--probes", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
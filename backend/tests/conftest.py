@@ -3,6 +3,26 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True)
+def fresh_ocr_cache(monkeypatch):
+    """Give every test an empty OCR cache so cached uploads never leak between tests."""
+    import app.main as main
+    from app.services.ocr_cache import OCRCache
+
+    monkeypatch.setattr(main, 'ocr_cache', OCRCache(memory_entries=main.OCR_CACHE_SIZE))
+
+
+@pytest.fixture(autouse=True)
+def fresh_parse_cache(monkeypatch):
+    """Give every test an empty whole-response parse cache."""
+    import app.main as main
+    from app.services.parse_cache import ParseCache
+
+    monkeypatch.setattr(main, 'parse_cache', ParseCache(max_bytes=main.PARSE_CACHE_MAX_BYTES))
@@ -1,3 +1,5 @@
+import json
+
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -57,3 +59,24 @@ def test_export_xlsx_returns_binary_workbook():
         'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     )
     assert response.content[:2] == b'PK'
+
+
+def test_metrics_endpoint_reports_disabled_line_cache():
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.json()['line_cache'] is None
+
+
+def test_parse_stream_emits_results_then_trailer():
+    payload = {'contents': ['Sugar – Rs. 6,000 (50 kg)', 'Invoice # 1', 'Wheat Flour (10kg @ 950)']}
+    response = client.post('/parse/stream', json=payload)
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line['input_index'] for line in lines[:-1]] == [0, 1, 2]
+    assert lines[1]['items'] == []
+
+    batch = client.post('/parse', json=payload).json()
+    assert lines[:-1] == batch['results']
+    assert lines[-1] == {'request_id': batch['request_id'], 'result_count': 3, 'warnings': []}
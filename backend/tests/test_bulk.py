@@ -0,0 +1,195 @@
+import csv
+import io
+import itertools
+import json
+
+import pytest
+
+from app import cli
+from app.parser import extract_items, extractor
+from app.parser.extractor import ExtractionLimits, configure_extraction_limits, get_extraction_limits
+from app.services.bulk import (
+    BulkOptions,
+    Progress,
+    iter_documents,
+    load_checkpoint,
+    parse_chunk,
+    run_bulk,
+    run_fingerprint,
+)
+
+DOCUMENTS = [
+    'Sugar – Rs. 6,000 (50 kg)\nInvoice # INV-1001',
+    'Rice - Rs. 3000 (25 kg); Milk: Qty 2 l Price 200/l',
+    'Wheat Flour (10kg @ 950)',
+    'Cooking Oil: Qty 5 bottles Price 1200/bottle',
+    'Tea 2 kg Rs. 900\nSalt 1 kg Rs. 50',
+]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    directory = tmp_path / 'archive'
+    (directory / 'nested').mkdir(parents=True)
+    (directory / 'a.txt').write_text(DOCUMENTS[0], encoding='utf-8')
+    (directory / 'nested' / 'b.txt').write_text(DOCUMENTS[1], encoding='utf-8')
+    (directory / 'skip.pdf').write_bytes(b'%PDF')
+    exports = tmp_path / 'exports.jsonl'
+    exports.write_text(
+        json.dumps({'id': 'INV-3', 'content': DOCUMENTS[2]}) + '\n\n'
+        + json.dumps({'id': 'INV-4', 'content': DOCUMENTS[3]}) + '\n',
+        encoding='utf-8',
+    )
+    dump = tmp_path / 'dump.txt'
+    dump.write_text(DOCUMENTS[4] + '\f\f', encoding='utf-8')
+    return [str(directory), str(exports), str(dump)]
+
+
+def expected_records():
+    ids = ['a.txt', 'nested/b.txt', 'INV-3', 'INV-4', 'dump.txt#0']
+    return [
+        {'input_index': index, 'document': ids[index], 'items': [item.to_dict() for item in extract_items(text)]}
+        for index, text in enumerate(DOCUMENTS)
+    ]
+
+
+def records(data: bytes):
+    return [json.loads(line) for line in data.decode('utf-8').splitlines()]
+
+
+def test_iter_documents_covers_every_input_format(archive):
+    refs = list(iter_documents(archive))
+
+    assert [ref.index for ref in refs] == [0, 1, 2, 3, 4]
+    assert [ref.document for ref in refs] == [
+        'a.txt', 'nested/b.txt', 'exports.jsonl:1', 'exports.jsonl:3', 'dump.txt#0',
+    ]
+    assert [ref.kind for ref in refs] == ['file', 'file', 'jsonl', 'jsonl', 'text']
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_ordered_output_matches_extract_items(archive, workers):
+    output = io.BytesIO()
+    stats = run_bulk(
+        iter_documents(archive), output, BulkOptions(id_field='id'), workers=workers, chunk_size=2
+    )
+
+    assert records(output.getvalue()) == expected_records()
+    assert (stats.documents, stats.errors) == (5, 0)
+
+
+def test_unordered_output_has_every_document(archive):
+    output = io.BytesIO()
+    run_bulk(iter_documents(archive), output, BulkOptions(id_field='id'), workers=2, chunk_size=1, ordered=False)
+
+    written = sorted(records(output.getvalue()), key=lambda record: record['input_index'])
+    assert written == expected_records()
+
+
+def test_csv_rows_carry_document_ids(archive):
+    output = io.BytesIO()
+    run_bulk(iter_documents(archive), output, BulkOptions(output_format='csv', id_field='id'))
+
+    rows = list(csv.reader(io.StringIO(output.getvalue().decode('utf-8'))))
+    assert [row[:3] for row in rows] == [
+        ['0', 'a.txt', 'Sugar'], ['1', 'nested/b.txt', 'Rice'], ['1', 'nested/b.txt', 'Milk'],
+        ['2', 'INV-3', 'Wheat Flour'], ['3', 'INV-4', 'Cooking Oil'],
+        ['4', 'dump.txt#0', 'Tea'], ['4', 'dump.txt#0', 'Salt'],
+    ]
+
+
+def test_bad_jsonl_lines_are_reported_not_fatal(tmp_path):
+    exports = tmp_path / 'bad.jsonl'
+    exports.write_text('not json\n{"body": "x"}\n{"content": 5}\n', encoding='utf-8')
+
+    result = parse_chunk(list(iter_documents([exports])), BulkOptions())
+    assert result.errors == 3
+    assert [record['error'].split(':')[0] for record in records(result.body)] == [
+        'JSONDecodeError', 'KeyError', "Field 'content' is not a string.",
+    ]
+
+
+def test_truncated_and_gated_documents_are_counted_in_csv_mode(tmp_path, monkeypatch):
+    dump = tmp_path / 'dump.txt'
+    dump.write_text(f'{DOCUMENTS[0]}\f{"x" * 3000}\n{DOCUMENTS[2]}', encoding='utf-8')
+    previous = get_extraction_limits()
+    configure_extraction_limits(ExtractionLimits(max_line_chars=2000, document_budget=0))
+    try:
+        output = io.BytesIO()
+        stats = run_bulk(iter_documents([dump]), output, BulkOptions(output_format='csv'))
+    finally:
+        configure_extraction_limits(previous)
+
+    assert (stats.documents, stats.gated, stats.truncated) == (2, 1, 0)
+    assert '1 with gated lines' in stats.summary()
+
+    ticks = itertools.count()
+    monkeypatch.setattr(extractor.time, 'thread_time', lambda: float(next(ticks)))
+    configure_extraction_limits(ExtractionLimits(document_budget=1e-12))
+    try:
+        stats = run_bulk(iter_documents([dump]), io.BytesIO(), BulkOptions(output_format='csv'))
+    finally:
+        configure_extraction_limits(previous)
+    assert stats.truncated == 2
+
+
+def test_cli_disables_the_time_budget_by_default():
+    assert cli.build_parser().parse_args(['in.txt']).document_budget_ms == 0
+
+
+def test_fingerprint_changes_when_inputs_change(archive):
+    before = run_fingerprint(archive)
+    assert run_fingerprint(archive) == before
+
+    with open(f'{archive[0]}/nested/c.txt', 'w', encoding='utf-8') as handle:
+        handle.write(DOCUMENTS[2])
+    assert run_fingerprint(archive) != before
+    after_add = run_fingerprint(archive)
+    with open(archive[2], 'a', encoding='utf-8') as handle:
+        handle.write('\fRice - 3000')
+    assert run_fingerprint(archive) != after_add
+
+
+def test_progress_tracks_out_of_order_completion():
+    progress = Progress()
+    progress.mark([2, 3])
+    assert (progress.watermark, progress.done) == (0, {2, 3})
+    progress.mark([0, 1])
+    assert (progress.watermark, progress.done) == (4, set())
+    assert progress.is_done(3) and not progress.is_done(4)
+
+
+def test_cli_resumes_from_checkpoint(archive, tmp_path, monkeypatch):
+    output = tmp_path / 'parsed.ndjson'
+    checkpoint = tmp_path / 'parsed.ckpt'
+    argv = [*archive, '--id-field', 'id', '--workers', '0', '--chunk-size', '1', '--flush-seconds', '0',
+            '-o', str(output), '--checkpoint', str(checkpoint)]
+
+    real_iter = cli.iter_documents
+
+    def interrupted(*args, **kwargs):
+        for ref in real_iter(*args, **kwargs):
+            if ref.index == 3:
+                raise KeyboardInterrupt
+            yield ref
+
+    monkeypatch.setattr(cli, 'iter_documents', interrupted)
+    assert cli.main(argv) == 130
+    assert json.loads(checkpoint.read_text())['watermark'] == 3
+    with output.open('ab') as handle:  # a partial record written after the last checkpoint
+        handle.write(b'{"input_index": 3, "docu')
+
+    monkeypatch.setattr(cli, 'iter_documents', real_iter)
+    assert cli.main(argv) == 0
+    assert records(output.read_bytes()) == expected_records()
+    assert json.loads(checkpoint.read_text())['documents'] == 5
+
+
+def test_checkpoint_from_another_run_is_rejected(archive, tmp_path):
+    checkpoint = tmp_path / 'parsed.ckpt'
+    cli.main([*archive, '--workers', '0', '-o', str(tmp_path / 'out.ndjson'), '--checkpoint', str(checkpoint)])
+
+    with pytest.raises(ValueError):
+        load_checkpoint(checkpoint, run_fingerprint(archive[:1]))
+    with pytest.raises(SystemExit):
+        cli.main([*archive, '--format', 'csv', '-o', str(tmp_path / 'out.csv'), '--checkpoint', str(checkpoint)])
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from app.parser.cache import LineCache
+from app.parser.extractor import (
+    cached_extract_from_line,
+    configure_line_cache,
+    extract_from_line,
+    extract_items,
+)
+from benchmarks.corpus import build_documents
+
+
+@pytest.fixture
+def line_cache():
+    cache = configure_line_cache(64)
+    yield cache
+    configure_line_cache(None)
+
+
+def test_lru_evicts_least_recently_used_entry():
+    cache = LineCache(maxsize=2)
+    cache.get_or_compute("a", str.upper)
+    cache.get_or_compute("b", str.upper)
+    cache.get_or_compute("a", str.upper)
+    cache.get_or_compute("c", str.upper)
+
+    assert cache.stats() == {"hits": 1, "misses": 3, "evictions": 1, "size": 2, "maxsize": 2}
+    assert cache.get_or_compute("a", lambda key: "recomputed") == "A"
+    assert cache.get_or_compute("b", lambda key: "recomputed") == "recomputed"
+
+
+def test_cached_results_match_uncached_extraction(line_cache):
+    documents = build_documents(20)
+    cached = [extract_items(doc) for doc in documents]
+    configure_line_cache(None)
+    assert cached == [extract_items(doc) for doc in documents]
+    assert line_cache.hits > 0
+
+
+def test_cached_result_is_immutable_and_keeps_raw_line(line_cache):
+    item = cached_extract_from_line("Sugar – Rs. 6,000 (50 kg)")
+    with pytest.raises(AttributeError):
+        item.price = 1
+
+    padded = cached_extract_from_line("  Sugar – Rs. 6,000 (50 kg)  ")
+    assert padded.raw_line == "  Sugar – Rs. 6,000 (50 kg)  "
+    assert padded == extract_from_line("  Sugar – Rs. 6,000 (50 kg)  ")
+    assert line_cache.hits == 1
+
+
+def test_cache_is_consistent_under_concurrent_use():
+    cache = LineCache(maxsize=50)
+    keys = [f"line {i % 80}" for i in range(4_000)]
+
+    def worker():
+        for key in keys:
+            assert cache.get_or_compute(key, str.upper) == key.upper()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 8 * len(keys)
+    assert stats["size"] == 50
+    # Concurrent misses on one key both count, but store a single entry.
+    assert stats["misses"] - stats["evictions"] >= 50
@@ -0,0 +1,25 @@
+from app.parser import extract_items
+from app.parser.postprocess import clean_price, normalize_unit
+from benchmarks.bench_columnar import clean_prices, extract_columnar, normalize_units
+from benchmarks.corpus import EDGE_LINES, build_documents
+
+
+def test_batch_matches_scalar_path_exactly():
+    documents = build_documents(40) + EDGE_LINES
+    batch = extract_columnar(documents)
+
+    assert batch.grouped() == [extract_items(doc) for doc in documents]
+    assert len(batch) == sum(len(extract_items(doc)) for doc in documents)
+
+
+def test_column_helpers_match_scalar_helpers():
+    prices = ["Rs. 6,000", "$45.50", ",", None, "", "PKR 1,200.75", "usd 9"]
+    units = ["KGS", " Bottle ", "litre", None, ""]
+    assert clean_prices(prices) == [clean_price(value) for value in prices]
+    assert normalize_units(units) == [normalize_unit(value) for value in units]
+
+
+def test_empty_batch_keeps_input_alignment():
+    batch = extract_columnar(["Invoice # 1", ""])
+    assert len(batch) == 0
+    assert batch.grouped() == [[], []]
@@ -0,0 +1,28 @@
+from app.parser.dispatch import PatternDispatcher
+from app.parser.extractor import extract_from_line
+from benchmarks.bench_dispatch import legacy_extract_from_line
+from benchmarks.corpus import EDGE_LINES, build_lines
+
+
+def test_dispatcher_matches_legacy_engine_on_corpus():
+    for line in build_lines(5_000) + EDGE_LINES:
+        assert extract_from_line(line) == legacy_extract_from_line(line), line
+
+
+def test_reordering_does_not_change_winner():
+    dispatcher = PatternDispatcher(reorder_interval=0)
+    lines = build_lines(2_000, seed=3, noise_ratio=0.0)
+    before = [dispatcher.select(line) for line in lines]
+
+    original_order = dispatcher.order
+    dispatcher.reorder()
+    assert dispatcher.order != original_order
+    after = [dispatcher.select(line) for line in lines]
+    assert before == after
+
+
+def test_prefilter_keeps_casefolded_non_ascii_lines():
+    # Dotless i folds onto "i" under IGNORECASE, so the "quantity" literal is absent.
+    line = "Oil: Quantıty 5 bottles Price 1200/bottle"
+    assert extract_from_line(line) == legacy_extract_from_line(line)
+    assert extract_from_line(line).price_type == "unit"
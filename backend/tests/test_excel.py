@@ -0,0 +1,49 @@
+from io import BytesIO
+
+from openpyxl import load_workbook
+
+from app.schemas import ParseResult
+from app.services.excel import HEADERS, iter_xlsx_chunks
+
+
+def _results():
+    return [
+        ParseResult(
+            input_index=index,
+            items=[
+                {
+                    'product_name': 'Sugar',
+                    'quantity': 50,
+                    'unit': 'kg',
+                    'price': 6000 + index,
+                    'price_type': 'total',
+                    'derived_unit_price': 120,
+                    'raw_line': 'Sugar – Rs. 6,000 (50 kg)',
+                    'confidence': 1.0,
+                },
+                {'raw_line': 'Rice', 'product_name': 'Rice', 'confidence': 0.3},
+            ],
+        )
+        for index in range(3)
+    ]
+
+
+def test_streamed_workbook_has_typed_columns_and_widths():
+    chunks = list(iter_xlsx_chunks(_results(), chunk_size=1024))
+    assert len(chunks) > 1
+    assert all(len(chunk) == 1024 for chunk in chunks[:-1])
+
+    sheet = load_workbook(BytesIO(b''.join(chunks)))['parsed_items']
+    rows = list(sheet.iter_rows(values_only=True))
+    assert list(rows[0]) == HEADERS
+    assert rows[1] == (0, 'Sugar', 50, 'kg', 6000, 'total', 120, 'Sugar – Rs. 6,000 (50 kg)', 1)
+    assert rows[2] == (0, 'Rice', None, None, None, None, None, 'Rice', 0.3)
+    assert rows[5][4] == 6002
+    assert len(rows) == 7
+
+    assert sheet['A1'].font.bold
+    assert sheet['E2'].number_format == '#,##0.00'
+    assert sheet['I3'].number_format == '0.00'
+    assert sheet['B2'].number_format == 'General'
+    assert sheet.column_dimensions['H'].width == 48
+    assert sheet.freeze_panes == 'A2'
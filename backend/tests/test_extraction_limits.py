@@ -0,0 +1,97 @@
+import itertools
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parser import extractor
+from app.parser.extractor import (
+    LINE_TOO_COMPLEX,
+    LINE_TOO_LONG,
+    TIME_BUDGET_EXCEEDED,
+    BatchExtractor,
+    ExtractionLimits,
+    configure_extraction_limits,
+    extract_items,
+    get_extraction_limits,
+)
+from app.services import ocr
+from benchmarks.bench_adversarial import build_cases
+from tests.test_parse_images import WidthEngine, _png, _tiff
+
+GOOD_LINE = 'Sugar – Rs. 6,000 (50 kg)'
+
+
+@pytest.fixture
+def limits():
+    previous = get_extraction_limits()
+    yield configure_extraction_limits
+    configure_extraction_limits(previous)
+
+
+def test_gate_skips_long_and_complex_lines(limits):
+    limits(ExtractionLimits(max_line_chars=100, max_line_run=8))
+    content = '\n'.join([GOOD_LINE, 'Oil qty 5 ' + 'a ' * 60 + '/kg', 'Oil 5 kg ' + '1' * 9 + ' 5', GOOD_LINE])
+
+    items, warnings = BatchExtractor().extract(content)
+    assert [item.raw_line for item in items] == [GOOD_LINE, GOOD_LINE]
+    assert warnings == {LINE_TOO_LONG: 1, LINE_TOO_COMPLEX: 1}
+
+
+def test_time_budget_keeps_partial_results(limits, monkeypatch):
+    limits(ExtractionLimits(document_budget=2.5))
+    ticks = itertools.count()
+    monkeypatch.setattr(extractor.time, 'thread_time', lambda: float(next(ticks)))
+
+    items, warnings = BatchExtractor().extract('\n'.join(f'Item{i} - {i}' for i in range(1, 6)))
+    # Budget starts at tick 0 and is checked before each line: lines at ticks 1-2 are parsed.
+    assert [item.price for item in items] == [1, 2]
+    assert warnings == {TIME_BUDGET_EXCEEDED: 3}
+
+
+def test_extract_items_is_never_cut_short(limits, monkeypatch):
+    limits(ExtractionLimits(document_budget=2.5))
+    ticks = itertools.count()
+    monkeypatch.setattr(extractor.time, 'thread_time', lambda: float(next(ticks)))
+    content = '\n'.join(f'Item{i} - {i}' for i in range(1, 6))
+
+    assert [item.price for item in extract_items(content)] == [1, 2, 3, 4, 5]
+    assert [item.price for item in BatchExtractor().extract_items(content)] == [1, 2, 3, 4, 5]
+
+
+def test_adversarial_documents_stay_fast():
+    for name, document in build_cases().items():
+        started = time.perf_counter()
+        extract_items(document)
+        assert time.perf_counter() - started < 1.0, name
+
+
+def test_parse_reports_warnings_and_skips_etag_when_truncated(limits, monkeypatch):
+    client = TestClient(main.app)
+    long_line = 'Oil qty 5 ' + ' ' * 600 + '/kg'
+    response = client.post('/parse', json={'contents': [GOOD_LINE, f'{GOOD_LINE}\n{long_line}']})
+    assert response.json()['warnings'] == [{'input_index': 1, 'code': LINE_TOO_LONG, 'lines': 1}]
+    assert 'etag' in response.headers
+
+    limits(ExtractionLimits(document_budget=1e-12))
+    ticks = itertools.count()
+    monkeypatch.setattr(extractor.time, 'thread_time', lambda: float(next(ticks)))
+    response = client.post('/parse', json={'content': f'{GOOD_LINE}\nRice - 3000'})
+    assert response.json()['warnings'] == [{'input_index': 0, 'code': TIME_BUDGET_EXCEEDED, 'lines': 2}]
+    assert 'etag' not in response.headers
+    assert len(main.parse_cache) == 1
+
+
+def test_parse_images_reports_page_warnings(limits, monkeypatch):
+    monkeypatch.setattr(ocr, '_engine', WidthEngine())
+    limits(ExtractionLimits(max_line_chars=20))
+    files = [('files', ('note.tiff', _tiff([40, 50]), 'image/tiff')), ('files', ('r.png', _png(60), 'image/png'))]
+    body = TestClient(main.app).post('/parse-images', files=files).json()
+
+    # Pages 0 and 1 are longer than 20 characters; page 2 ('Rice - 3000') is parsed.
+    assert body['warnings'] == [
+        {'input_index': 0, 'code': LINE_TOO_LONG, 'lines': 1},
+        {'input_index': 1, 'code': LINE_TOO_LONG, 'lines': 1},
+    ]
+    assert [len(page['items']) for f in body['files'] for page in f['pages']] == [0, 0, 1]
@@ -0,0 +1,230 @@
+import base64
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.services import ocr
+from app.services.jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, JobKind, JobRunner, SQLiteJobStore
+from tests.test_parse_images import WidthEngine, _png, _tiff
+
+CONTENTS = ['Sugar – Rs. 6,000 (50 kg)', 'Invoice # INV-1001', 'Wheat Flour (10kg @ 950)']
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def counting_kind(calls, concurrency=0):
+    def run(job, done):
+        for index in range(job.total):
+            if index not in done:
+                calls.append(index)
+                yield index, {'input_index': index, 'items': []}, {}
+
+    return JobKind(run=run, finish=lambda job, results: f'{job.job_id}:{len(results)}', concurrency=concurrency)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteJobStore(tmp_path / 'jobs.sqlite3')
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def api_jobs(tmp_path, monkeypatch):
+    store = SQLiteJobStore(tmp_path / 'api-jobs.sqlite3')
+    runner = JobRunner(store, main.JOB_KINDS, workers=0)
+    monkeypatch.setattr(main, 'job_store', store)
+    monkeypatch.setattr(main, 'job_runner', runner)
+    yield runner
+    store.close()
+
+
+def test_jobs_run_by_priority_then_age(store):
+    submitted = [store.submit('count', {}, total=1, priority=priority) for priority in (0, 5, 0, 5)]
+    claimed = []
+    while (job := store.claim(['count'])) is not None:
+        claimed.append(job.job_id)
+
+    assert claimed == [submitted[i].job_id for i in (1, 3, 0, 2)]
+
+
+def test_status_reads_skip_the_payload(store):
+    job = store.submit('ocr', {'images': ['x' * 1000]}, total=1)
+    assert job.payload is None
+    assert store.get(job.job_id).payload is None
+    assert store.claim(['ocr']).payload == {'images': ['x' * 1000]}
+
+
+def test_per_kind_concurrency_limit(store):
+    runner = JobRunner(store, {'ocr': counting_kind([], concurrency=1), 'parse': counting_kind([])}, workers=0)
+    store.submit('ocr', {}, total=1)
+    store.submit('ocr', {}, total=1)
+    store.submit('parse', {}, total=1)
+
+    assert runner._claim().kind == 'ocr'
+    assert runner._claim().kind == 'parse'
+    assert runner._claim() is None
+    assert runner.stats() == {'ocr': 1, 'parse': 1}
+
+
+def test_job_resumes_after_restart_from_stored_results(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / 'jobs.sqlite3'
+    store = SQLiteJobStore(path, lease_seconds=60, clock=clock)
+    job = store.submit('count', {}, total=5)
+    store.claim(['count'])
+    store.add_results(job.job_id, [(index, {'input_index': index, 'items': []}, {}) for index in (0, 1)])
+    store.close()  # the process dies with the job still running
+
+    clock.now += 61
+    restarted = SQLiteJobStore(path, lease_seconds=60, clock=clock)
+    calls = []
+    assert JobRunner(restarted, {'count': counting_kind(calls)}, workers=0).run_pending() == 1
+
+    finished = restarted.get(job.job_id)
+    assert calls == [2, 3, 4]
+    assert (finished.status, finished.completed, finished.request_id) == (SUCCEEDED, 5, f'{job.job_id}:5')
+    assert [result['input_index'] for result in restarted.results(job.job_id)] == [0, 1, 2, 3, 4]
+    restarted.close()
+
+
+def test_worker_threads_run_submitted_jobs(store):
+    runner = JobRunner(store, {'count': counting_kind([])}, workers=2, poll_seconds=0.05)
+    job = store.submit('count', {}, total=3)
+    runner.start()
+    try:
+        deadline = time.monotonic() + 5
+        while store.get(job.job_id).status != SUCCEEDED and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        runner.shutdown()
+    assert store.get(job.job_id).completed == 3
+
+
+def test_running_job_within_lease_is_not_claimed_twice(store):
+    store.submit('count', {}, total=1)
+    assert store.claim(['count']).status == RUNNING
+    assert store.claim(['count']) is None
+
+
+def test_heartbeat_renews_the_lease_during_a_slow_input(tmp_path):
+    clock = FakeClock()
+    store = SQLiteJobStore(tmp_path / 'jobs.sqlite3', lease_seconds=60, clock=clock)
+    reclaimed = []
+
+    def run(job, done):
+        clock.now += 61  # one input outlasts the lease
+        time.sleep(0.2)
+        reclaimed.append(store.claim(['slow']))
+        yield 0, {'input_index': 0, 'items': []}, {}
+
+    job = store.submit('slow', {}, total=1)
+    runner = JobRunner(store, {'slow': JobKind(run=run, finish=lambda job, results: '')}, heartbeat_seconds=0.01)
+    runner.run_pending()
+
+    assert reclaimed == [None]
+    assert store.get(job.job_id).status == SUCCEEDED
+    store.close()
+
+
+def test_job_reclaimed_after_an_expired_lease_finishes_on_both_workers(tmp_path):
+    clock = FakeClock()
+    store = SQLiteJobStore(tmp_path / 'jobs.sqlite3', lease_seconds=60, clock=clock)
+    calls = []
+    second = JobRunner(store, {'count': counting_kind(calls)}, workers=0, heartbeat_seconds=3600)
+
+    def run(job, done):
+        clock.now += 61  # the lease lapses mid-input and another worker takes the job over
+        assert second.run_pending() == 1
+        for index in range(job.total):
+            yield index, {'input_index': index, 'items': []}, {}
+
+    job = store.submit('count', {}, total=3)
+    first = JobRunner(store, {'count': JobKind(run=run, finish=lambda job, results: 'first')}, heartbeat_seconds=3600)
+    assert first.run_pending() == 1
+
+    finished = store.get(job.job_id)
+    assert calls == [0, 1, 2]
+    assert (finished.status, finished.completed, finished.request_id) == (SUCCEEDED, 3, 'first')
+    assert [result['input_index'] for result in store.results(job.job_id)] == [0, 1, 2]
+    store.close()
+
+
+def test_failing_job_is_marked_failed(store):
+    def run(job, done):
+        yield 0, {'input_index': 0, 'items': []}, {}
+        raise RuntimeError('engine exploded')
+
+    job = store.submit('boom', {}, total=2)
+    JobRunner(store, {'boom': JobKind(run=run, finish=lambda job, results: '')}, workers=0).run_pending()
+
+    failed = store.get(job.job_id)
+    assert failed.status == FAILED
+    assert failed.error == 'RuntimeError: engine exploded'
+
+
+def test_parse_job_api_matches_parse_endpoint(api_jobs):
+    client = TestClient(main.app)
+    submitted = client.post('/jobs', json={'kind': 'parse', 'contents': CONTENTS, 'priority': 3})
+    assert submitted.status_code == 202
+    job_id = submitted.json()['job_id']
+    assert submitted.json()['status'] == QUEUED
+    assert client.get(f'/jobs/{job_id}/result').status_code == 409
+
+    api_jobs.run_pending()
+    status = client.get(f'/jobs/{job_id}', params={'offset': 1}).json()
+    assert (status['status'], status['completed'], status['total']) == (SUCCEEDED, 3, 3)
+    assert [result['input_index'] for result in status['results']] == [1, 2]
+
+    result = client.get(f'/jobs/{job_id}/result').json()
+    assert result == client.post('/parse', json={'contents': CONTENTS}).json()
+    assert client.get(f"/export/{result['request_id']}.csv").status_code == 200
+
+
+def test_ocr_job_api_matches_parse_images(api_jobs, monkeypatch):
+    monkeypatch.setattr(ocr, '_engine', WidthEngine())
+    tiff, png = _tiff([40, 50]), _png(70)
+    client = TestClient(main.app)
+    images = [
+        {'filename': 'note.tiff', 'data': base64.b64encode(tiff).decode()},
+        {'filename': 'receipt.png', 'data': base64.b64encode(png).decode()},
+    ]
+    submitted = client.post('/jobs', json={'kind': 'ocr', 'images': images})
+    assert submitted.json()['total'] == 3
+
+    api_jobs.run_pending()
+    result = client.get(f"/jobs/{submitted.json()['job_id']}/result").json()
+    direct = client.post(
+        '/parse-images',
+        files=[('files', ('note.tiff', tiff, 'image/tiff')), ('files', ('receipt.png', png, 'image/png'))],
+    ).json()
+    assert result['request_id'] == direct['request_id']
+    assert [item['product_name'] for r in result['results'] for item in r['items']] == [
+        'Sugar', 'Wheat Flour', 'Milk',
+    ]
+
+
+def test_job_request_validation(api_jobs):
+    client = TestClient(main.app)
+    assert client.post('/jobs', json={'kind': 'ocr', 'contents': CONTENTS}).status_code == 422
+    bad_image = {'kind': 'ocr', 'images': [{'filename': 'x.png', 'data': 'not base64!'}]}
+    assert client.post('/jobs', json=bad_image).status_code == 422
+    assert client.get('/jobs/unknown').status_code == 404
+
+
+def test_jobs_are_disabled_without_a_store_path(monkeypatch):
+    monkeypatch.setattr(main, 'JOB_STORE_PATH', '')
+    monkeypatch.setattr(main, 'job_store', None)
+    monkeypatch.setattr(main, 'job_runner', None)
+    client = TestClient(main.app)
+
+    assert client.post('/jobs', json={'kind': 'parse', 'contents': CONTENTS}).status_code == 503
+    assert client.get('/metrics').json()['jobs'] is None
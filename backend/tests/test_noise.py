@@ -0,0 +1,24 @@
+from app.parser.extractor import classify_noise, is_noise_line, noise_statistics
+from benchmarks.bench_noise import legacy_is_noise_line
+from benchmarks.corpus import EDGE_LINES, build_lines
+
+
+def test_classifier_matches_legacy_filter_on_generated_corpus():
+    extra = ["½½½", "²³ 12", "ⅫⅫ", "Tax-free Sugar 5 kg 100", "Totals", "INVOİCE 12"]
+    for line in build_lines(20_000, seed=5, noise_ratio=0.6) + EDGE_LINES + extra:
+        assert is_noise_line(line) == legacy_is_noise_line(line), line
+
+
+def test_classifier_reports_rule_names():
+    assert classify_noise("ab") == "too_short"
+    assert classify_noise("12/05/2024") == "no_letters"
+    assert classify_noise("Invoice # INV-1001") == "invoice_number"
+    assert classify_noise("NTN: 12345") == "tax_id"
+    assert classify_noise("Total Amount: 900") == "total"
+    assert classify_noise("Address: Main Street") == "address"
+    assert classify_noise("Sugar – Rs. 6,000 (50 kg)") is None
+
+
+def test_noise_statistics_counts_rules():
+    stats = noise_statistics(["Invoice 1", "Tax 17%", "VAT", "Sugar - 100"])
+    assert stats == {"invoice_number": 1, "tax_id": 2}
@@ -0,0 +1,120 @@
+import io
+import sys
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import app.main as main
+from app.services import ocr
+from app.services.ocr import (
+    OCRInputError,
+    PytesseractEngine,
+    TesserocrEngine,
+    create_ocr_engine,
+    extract_text_from_image_bytes,
+)
+
+
+class FakeEngine:
+    name = 'fake'
+
+    def __init__(self, text='Sugar – Rs. 6,000 (50 kg)\n'):
+        self.text = text
+        self.calls = 0
+        self.closed = False
+
+    def image_to_text(self, image):
+        self.calls += 1
+        return self.text
+
+    def warm(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def _png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), 'white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _fake_tesserocr():
+    created = []
+
+    class PyTessBaseAPI:
+        def __init__(self, lang):
+            self.lang = lang
+            self.busy = False
+            created.append(self)
+
+        def SetImage(self, image):
+            assert not self.busy
+            self.busy = True
+
+        def GetUTF8Text(self):
+            return 'Rice 5kg 1200\n'
+
+        def Clear(self):
+            self.busy = False
+
+        def End(self):
+            pass
+
+    return types.SimpleNamespace(PyTessBaseAPI=PyTessBaseAPI), created
+
+
+def test_extract_text_uses_configured_engine(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(ocr, '_engine', engine)
+    assert extract_text_from_image_bytes(_png_bytes()) == 'Sugar – Rs. 6,000 (50 kg)'
+    assert engine.calls == 1
+    with pytest.raises(OCRInputError):
+        extract_text_from_image_bytes(b'not an image')
+
+
+def test_auto_engine_falls_back_to_pytesseract(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'tesserocr', None)
+    assert isinstance(create_ocr_engine('auto'), PytesseractEngine)
+    with pytest.raises(ocr.OCRUnavailableError):
+        create_ocr_engine('tesserocr')
+    with pytest.raises(ValueError):
+        create_ocr_engine('bogus')
+
+
+def test_tesserocr_engine_reuses_warm_handles(monkeypatch):
+    module, created = _fake_tesserocr()
+    monkeypatch.setitem(sys.modules, 'tesserocr', module)
+    engine = create_ocr_engine('auto', size=2)
+    assert isinstance(engine, TesserocrEngine)
+
+    engine.warm()
+    assert len(created) == 2
+
+    image = Image.new('L', (8, 8))
+    barrier = threading.Barrier(4)
+
+    def run(_):
+        barrier.wait()
+        return engine.image_to_text(image)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        texts = list(pool.map(run, range(40)))
+    assert texts == ['Rice 5kg 1200\n'] * 40
+    assert len(created) == 2
+
+
+def test_parse_image_with_fake_engine(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(ocr, '_engine', engine)
+    client = TestClient(main.app)
+    response = client.post('/parse-image', files={'file': ('invoice.png', _png_bytes(), 'image/png')})
+    assert response.status_code == 200
+    body = response.json()
+    assert body['extracted_text'] == 'Sugar – Rs. 6,000 (50 kg)'
+    assert body['results'][0]['items'][0]['price'] == 6000
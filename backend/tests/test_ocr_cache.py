@@ -0,0 +1,87 @@
+import io
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import app.main as main
+from app.services.ocr_cache import OCRCache, ocr_cache_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_key_depends_on_image_and_settings():
+    assert ocr_cache_key('abc', 'tesserocr:eng') == ocr_cache_key('abc', 'tesserocr:eng')
+    assert ocr_cache_key('abc', 'tesserocr:eng') != ocr_cache_key('abc', 'pytesseract:eng')
+    assert ocr_cache_key('abc', 'tesserocr:eng') != ocr_cache_key('abd', 'tesserocr:eng')
+
+
+def test_disk_tier_survives_new_instance_and_expires(tmp_path):
+    clock = Clock()
+    cache = OCRCache(memory_entries=2, disk_dir=tmp_path, ttl_seconds=60, clock=clock)
+    cache.put('k1', 'Rice 5kg 1200\nSugar 1kg')
+    assert cache.get('k1') == 'Rice 5kg 1200\nSugar 1kg'
+
+    reopened = OCRCache(memory_entries=2, disk_dir=tmp_path, ttl_seconds=60, clock=clock)
+    assert reopened.get('k1') == 'Rice 5kg 1200\nSugar 1kg'
+    assert reopened.stats()['disk_hits'] == 1
+    assert reopened.get('k1') is not None
+    assert reopened.stats()['memory_hits'] == 1
+
+    clock.now += 61
+    assert reopened.get('k1') is None
+    assert OCRCache(disk_dir=tmp_path, ttl_seconds=60, clock=clock).get('k1') is None
+    assert reopened.stats()['expired'] == 1
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = OCRCache(memory_entries=0, disk_dir=tmp_path, disk_max_bytes=400)
+    for index in range(8):
+        cache.put(f'{index:02d}key', 'x' * 80)
+    stats = cache.stats()
+    assert stats['disk_bytes'] <= 400
+    assert stats['evictions'] > 0
+    assert cache.get('07key') == 'x' * 80
+    assert cache.get('00key') is None
+    assert cache.purge() > 0
+    assert cache.get('07key') is None
+
+
+def test_parse_image_cache_hit_skips_ocr(monkeypatch):
+    calls = []
+
+    def fake_ocr(image_bytes, page=0):
+        calls.append(image_bytes)
+        return 'Sugar – Rs. 6,000 (50 kg)'
+
+    monkeypatch.setattr(main, 'extract_text_from_image_bytes', fake_ocr)
+    monkeypatch.setattr(main, 'ocr_settings_key', lambda: 'fake')
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), 'white').save(buffer, format='PNG')
+    client = TestClient(main.app)
+
+    first = client.post('/parse-image', files={'file': ('a.png', buffer.getvalue(), 'image/png')})
+    second = client.post('/parse-image', files={'file': ('a.png', buffer.getvalue(), 'image/png')})
+
+    assert first.json() == second.json()
+    assert len(calls) == 1
+    metrics = client.get('/metrics').json()['ocr_cache']
+    assert metrics['memory_hits'] == 1
+    assert metrics['hit_rate'] == 0.5
+
+
+def test_admin_purge_requires_token(monkeypatch):
+    client = TestClient(main.app)
+    monkeypatch.setattr(main, 'ADMIN_TOKEN', '')
+    assert client.delete('/admin/ocr-cache').status_code == 403
+
+    monkeypatch.setattr(main, 'ADMIN_TOKEN', 'secret')
+    main.ocr_cache.put('k1', 'text')
+    assert client.delete('/admin/ocr-cache', headers={'X-Admin-Token': 'nope'}).status_code == 401
+    response = client.delete('/admin/ocr-cache', headers={'X-Admin-Token': 'secret'})
+    assert response.json() == {'removed': 1}
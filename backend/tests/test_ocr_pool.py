@@ -0,0 +1,89 @@
+import asyncio
+import io
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import app.main as main
+from app.services.ocr_pool import OCRExecutor, OCRQueueFullError, OCRTimeoutError
+
+
+def _png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), 'white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def test_executor_rejects_jobs_beyond_workers_plus_queue():
+    executor = OCRExecutor(workers=1, max_queue=1, timeout=5)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.create_task(executor.run(release.wait))
+        second = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        assert executor.stats()['running'] == 1
+        assert executor.stats()['queued'] == 1
+        with pytest.raises(OCRQueueFullError):
+            await executor.run(release.wait)
+        release.set()
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(scenario()) == [True, True]
+    stats = executor.stats()
+    assert stats['rejected'] == 1
+    assert stats['completed'] == 2
+    assert stats['in_flight'] == 0
+    executor.shutdown()
+
+
+def test_timed_out_job_keeps_its_slot_until_it_finishes():
+    executor = OCRExecutor(workers=1, max_queue=0, timeout=0.05)
+
+    async def scenario():
+        with pytest.raises(OCRTimeoutError):
+            await executor.run(time.sleep, 0.3)
+        assert executor.stats()['in_flight'] == 1
+        with pytest.raises(OCRQueueFullError):
+            await executor.run(time.sleep, 0)
+
+    asyncio.run(scenario())
+    time.sleep(0.4)
+    assert executor.stats()['in_flight'] == 0
+    assert executor.stats()['timeouts'] == 1
+    executor.shutdown()
+
+
+def test_parse_image_runs_stub_ocr_on_executor(monkeypatch):
+    calls = []
+
+    def fake_ocr(image_bytes, page=0):
+        calls.append(threading.current_thread().name)
+        return 'Sugar – Rs. 6,000 (50 kg)'
+
+    monkeypatch.setattr(main, 'extract_text_from_image_bytes', fake_ocr)
+    response = TestClient(main.app).post(
+        '/parse-image',
+        files={'file': ('invoice.png', _png_bytes(), 'image/png')},
+    )
+
+    assert response.status_code == 200
+    assert response.json()['results'][0]['items'][0]['product_name'] == 'Sugar'
+    assert calls[0].startswith('ocr')
+
+
+def test_parse_image_returns_503_with_retry_after_when_queue_full(monkeypatch):
+    async def full(*args):
+        raise OCRQueueFullError('OCR queue is full. Retry later.')
+
+    monkeypatch.setattr(main.ocr_executor, 'run', full)
+    response = TestClient(main.app).post(
+        '/parse-image',
+        files={'file': ('invoice.png', _png_bytes(), 'image/png')},
+    )
+
+    assert response.status_code == 503
+    assert response.headers['retry-after'] == str(main.ocr_executor.retry_after)
@@ -0,0 +1,75 @@
+import re
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parser import regex_patterns
+from app.services.parse_cache import ParseCache, parse_cache_key
+
+BODY = {'content': 'Sugar – Rs. 6,000 (50 kg)'}
+
+
+def test_key_depends_on_inputs_and_parser_tables(monkeypatch):
+    key = parse_cache_key('Sugar 50 kg', None)
+    assert key == parse_cache_key('Sugar 50 kg', None)
+    assert key != parse_cache_key(None, ['Sugar 50 kg'])
+
+    patterns = [*regex_patterns.PATTERNS[:-1], ('fallback_name_price', re.compile(r'^(?P<name>\w+)$'))]
+    monkeypatch.setattr(regex_patterns, 'PATTERNS', patterns)
+    assert parse_cache_key('Sugar 50 kg', None) != key
+    monkeypatch.undo()
+
+    noise = [*regex_patterns.NOISE_PATTERNS, ('discount', re.compile(r'\bdiscount\b'))]
+    monkeypatch.setattr(regex_patterns, 'NOISE_PATTERNS', noise)
+    assert parse_cache_key('Sugar 50 kg', None) != key
+
+
+def test_cache_is_bounded_by_body_bytes():
+    cache = ParseCache(max_bytes=10)
+    cache.put('a', 'id-a', b'12345', (0, 5))
+    cache.put('b', 'id-b', b'12345', (0, 5))
+    assert cache.get('a') is not None
+    cache.put('c', 'id-c', b'12345', (0, 5))
+    cache.put('huge', 'id-huge', b'x' * 11, (0, 11))
+
+    assert cache.get('b') is None
+    assert cache.get('huge') is None
+    assert cache.get('c').request_id == 'id-c'
+    assert cache.stats()['bytes'] == 10
+    assert cache.stats()['evictions'] == 1
+
+
+def test_repeat_parse_is_served_from_cache(monkeypatch):
+    client = TestClient(main.app)
+    first = client.post('/parse', json=BODY)
+
+    def fail(inputs):
+        raise AssertionError('cached request must not be parsed again')
+
+    monkeypatch.setattr(main.parse_pool, 'parse_many', fail)
+    second = client.post('/parse', json=BODY)
+
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers['etag'] == first.headers['etag']
+    stats = client.get('/metrics').json()['parse_cache']
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_if_none_match_returns_304_without_parsing(monkeypatch):
+    client = TestClient(main.app)
+    etag = client.post('/parse', json=BODY).headers['etag']
+    monkeypatch.setattr(main, 'parse_cache', ParseCache(max_bytes=0))
+
+    response = client.post('/parse', json=BODY, headers={'If-None-Match': f'W/{etag}, "other"'})
+    assert response.status_code == 304
+    assert response.headers['etag'] == etag
+    assert response.content == b''
+
+    assert client.post('/parse', json=BODY, headers={'If-None-Match': '"stale"'}).status_code == 200
+
+
+def test_if_none_match_wildcard_is_ignored():
+    response = TestClient(main.app).post('/parse', json=BODY, headers={'If-None-Match': '*'})
+    assert response.status_code == 200
+    assert response.json()['request_id']
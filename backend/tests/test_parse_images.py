@@ -0,0 +1,149 @@
+import asyncio
+import io
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import app.main as main
+from app.parser.extractor import BatchExtractor
+from app.services import ocr
+
+PAGE_TEXTS = {
+    40: 'Sugar – Rs. 6,000 (50 kg)',
+    50: 'Wheat Flour (10kg @ 950)',
+    60: 'Rice - 3000',
+    70: 'Milk (2 l @ Rs. 200)',
+}
+
+
+class WidthEngine:
+    """Fake OCR that identifies a page by its pixel width."""
+
+    name = 'width'
+
+    def image_to_text(self, image):
+        return PAGE_TEXTS[image.width]
+
+
+def _tiff(widths) -> bytes:
+    pages = [Image.new('L', (width, 20), 255) for width in widths]
+    buffer = io.BytesIO()
+    pages[0].save(buffer, format='TIFF', save_all=True, append_images=pages[1:])
+    return buffer.getvalue()
+
+
+def _png(width) -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, 20), 'white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def test_parse_images_returns_per_file_and_per_page_results(monkeypatch):
+    monkeypatch.setattr(ocr, '_engine', WidthEngine())
+    files = [
+        ('files', ('note.tiff', _tiff([40, 50, 60]), 'image/tiff')),
+        ('files', ('receipt.png', _png(70), 'image/png')),
+    ]
+    client = TestClient(main.app)
+    response = client.post('/parse-images', files=files)
+    assert response.status_code == 200
+    body = response.json()
+
+    assert [f['filename'] for f in body['files']] == ['note.tiff', 'receipt.png']
+    assert [f['page_count'] for f in body['files']] == [3, 1]
+    pages = [page for f in body['files'] for page in f['pages']]
+    assert [page['input_index'] for page in pages] == [0, 1, 2, 3]
+    assert [page['page_index'] for page in pages] == [0, 1, 2, 0]
+    assert [page['extracted_text'] for page in pages] == [PAGE_TEXTS[w] for w in (40, 50, 60, 70)]
+    assert [page['items'][0]['product_name'] for page in pages] == ['Sugar', 'Wheat Flour', 'Rice', 'Milk']
+    assert client.post('/parse-images', files=files).json()['request_id'] == body['request_id']
+
+
+def test_parse_images_limits_concurrency_per_request(monkeypatch):
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def fake_ocr(image_bytes, page=0):
+        with lock:
+            active.append(page)
+            peak.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.remove(page)
+        return 'Rice - 3000'
+
+    monkeypatch.setattr(main, 'extract_text_from_image_bytes', fake_ocr)
+    monkeypatch.setattr(main, 'ocr_settings_key', lambda: 'fake')
+    monkeypatch.setattr(main, 'IMAGE_BATCH_CONCURRENCY', 1)
+    files = [('files', ('note.tiff', _tiff([40, 50, 60, 70]), 'image/tiff'))]
+    response = TestClient(main.app).post('/parse-images', files=files)
+
+    assert response.status_code == 200
+    assert max(peak) == 1
+    assert len(peak) == 4
+
+
+def test_parse_images_rejects_too_many_pages_and_bad_files(monkeypatch):
+    client = TestClient(main.app)
+    monkeypatch.setattr(main, 'IMAGE_BATCH_MAX_PAGES', 2)
+    response = client.post('/parse-images', files=[('files', ('a.tiff', _tiff([40, 50, 60]), 'image/tiff'))])
+    assert response.status_code == 413
+
+    response = client.post('/parse-images', files=[('files', ('a.png', b'not an image', 'image/png'))])
+    assert response.status_code == 422
+    assert response.json()['detail'].startswith('a.png')
+
+
+def test_image_routes_have_their_own_payload_limit(monkeypatch):
+    monkeypatch.setattr(main, 'extract_text_from_image_bytes', lambda image_bytes, page=0: 'Rice - 3000')
+    monkeypatch.setattr(main, 'ocr_settings_key', lambda: 'fake')
+    client = TestClient(main.app)
+    large = _png(40) + b'\0' * 300_000
+
+    response = client.post('/parse-image', files={'file': ('big.png', large, 'image/png')})
+    assert response.status_code == 200
+    assert client.post('/parse', json={'content': 'x' * 300_000}).status_code == 413
+
+
+def test_image_text_is_parsed_off_the_event_loop(monkeypatch):
+    on_loop = []
+    real_extract = BatchExtractor.extract
+
+    def extract(self, content):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return real_extract(self, content)
+
+    monkeypatch.setattr(BatchExtractor, 'extract', extract)
+    monkeypatch.setattr(ocr, '_engine', WidthEngine())
+    client = TestClient(main.app)
+    assert client.post('/parse-image', files={'file': ('r.png', _png(60), 'image/png')}).status_code == 200
+    files = [('files', ('note.tiff', _tiff([40, 50]), 'image/tiff'))]
+    assert client.post('/parse-images', files=files).status_code == 200
+
+    assert on_loop == [False, False, False]
+
+
+def test_image_routes_render_non_finite_floats_as_null(monkeypatch):
+    real_extract = BatchExtractor.extract
+
+    def extract(self, content):
+        items, warnings = real_extract(self, content)
+        return [item._replace(price=float('nan'), derived_unit_price=float('inf')) for item in items], warnings
+
+    monkeypatch.setattr(BatchExtractor, 'extract', extract)
+    monkeypatch.setattr(ocr, '_engine', WidthEngine())
+    client = TestClient(main.app)
+    response = client.post('/parse-image', files={'file': ('r.png', _png(60), 'image/png')})
+    assert response.status_code == 200
+    assert response.json()['results'][0]['items'][0]['price'] is None
+
+    response = client.post('/parse-images', files=[('files', ('r.png', _png(60), 'image/png'))])
+    assert response.status_code == 200
+    assert response.json()['files'][0]['pages'][0]['items'][0]['derived_unit_price'] is None
@@ -0,0 +1,69 @@
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parser import extract_items, extractor
+from app.services.parse_pool import BatchStats, ParsePool
+from benchmarks.corpus import build_documents
+
+
+def test_pool_preserves_input_order_and_results():
+    documents = build_documents(12, lines_per_doc=10)
+    pool = ParsePool(workers=2, chunk_size=3)
+    try:
+        assert pool.parse_many(documents) == [extract_items(doc) for doc in documents]
+    finally:
+        pool.shutdown()
+
+
+def test_single_input_skips_the_pool():
+    pool = ParsePool(workers=4)
+    assert pool.parse_many(["Sugar – Rs. 6,000 (50 kg)"])[0][0].price == 6000
+    assert pool._executor is None
+
+
+def test_shutdown_is_idempotent_and_pool_restarts():
+    pool = ParsePool(workers=2)
+    pool.shutdown()
+    assert len(pool.parse_many(["Rice - 3000", "Milk - 200"])) == 2
+    pool.shutdown()
+    pool.shutdown()
+    assert pool._executor is None
+
+
+def test_duplicate_inputs_and_lines_are_parsed_once(monkeypatch):
+    documents = build_documents(4, lines_per_doc=10)
+    batch = [documents[0], documents[1], documents[0], documents[2], documents[0], documents[3]]
+    expected = [extract_items(doc) for doc in batch]
+
+    calls = []
+    original = extractor.cached_extract_from_line
+    monkeypatch.setattr(extractor, 'cached_extract_from_line', lambda line: calls.append(line) or original(line))
+    stats = BatchStats()
+    assert ParsePool().parse_many(batch, stats) == expected
+
+    assert stats.inputs == 6
+    assert stats.duplicate_inputs == 2
+    assert len(calls) == len(set(calls)) == stats.lines - stats.duplicate_lines
+
+
+def test_pool_fans_out_duplicates_in_order():
+    documents = build_documents(6, lines_per_doc=10)
+    batch = documents + documents[::2]
+    pool = ParsePool(workers=2, chunk_size=2)
+    try:
+        stats = BatchStats()
+        assert pool.parse_many(batch, stats) == [extract_items(doc) for doc in batch]
+        assert stats.duplicate_inputs == 3
+        assert pool.stats()['duplicate_inputs'] == 3
+    finally:
+        pool.shutdown()
+
+
+def test_parse_reports_duplicate_counts():
+    client = TestClient(main.app)
+    line = 'Sugar – Rs. 6,000 (50 kg)'
+    response = client.post('/parse', json={'contents': [line, f'{line}\nRice - 3000', line]})
+
+    assert [len(result['items']) for result in response.json()['results']] == [1, 2, 1]
+    assert response.headers['x-duplicate-inputs'] == '1'
+    assert response.headers['x-duplicate-lines'] == '1'
@@ -0,0 +1,130 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parser import extract_items
+from app.services.parse_session import (
+    ParseSession,
+    SessionConflictError,
+    SessionEditError,
+    SessionStore,
+    SessionTooLargeError,
+)
+
+DOCUMENT = '\n'.join([
+    'Invoice # INV-1001',
+    'Sugar – Rs. 6,000 (50 kg)',
+    'Rice - Rs. 3000 (25 kg); Milk: Qty 2 l Price 200/l',
+    '',
+    'Cooking Oil: Qty 5 bottles Price 1200/bottle',
+])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def fresh_sessions(monkeypatch):
+    monkeypatch.setattr(main, 'parse_sessions', SessionStore())
+
+
+def test_session_matches_full_parse_after_edits():
+    session = ParseSession('s', DOCUMENT, max_chars=10_000)
+    assert list(session.items()) == extract_items(DOCUMENT)
+
+    changed = session.apply(session.request_id, [
+        (1, 1, ['Sugar – Rs. 7,000 (50 kg)']),
+        (3, 0, ['Tea 2 kg Rs. 900', 'Salt 1 kg Rs. 50']),
+        (0, 1, []),
+    ])
+    assert changed == [0, 2, 3]
+    assert list(session.items()) == extract_items('\n'.join(session.lines))
+
+    parsed = TestClient(main.app).post('/parse', json={'content': '\n'.join(session.lines)}).json()
+    assert parsed['request_id'] == session.request_id
+
+
+def test_only_inserted_lines_are_parsed():
+    session = ParseSession('s', DOCUMENT, max_chars=10_000)
+    before = session.extractor.lines
+
+    session.apply(session.request_id, [(4, 1, ['Cooking Oil: Qty 6 bottles Price 1200/bottle'])])
+    assert session.extractor.lines - before == 1
+
+
+def test_edit_against_stale_request_id_conflicts():
+    session = ParseSession('s', DOCUMENT, max_chars=10_000)
+    base = session.request_id
+    session.apply(base, [(0, 1, [])])
+
+    with pytest.raises(SessionConflictError):
+        session.apply(base, [(0, 1, [])])
+
+
+def test_invalid_edits_leave_session_unchanged():
+    session = ParseSession('s', DOCUMENT, max_chars=200)
+    lines, request_id = list(session.lines), session.request_id
+
+    with pytest.raises(SessionEditError):
+        session.apply(request_id, [(0, 1, []), (10, 1, [])])
+    with pytest.raises(SessionEditError):
+        session.apply(request_id, [(0, 0, ['two\nlines'])])
+    with pytest.raises(SessionTooLargeError):
+        session.apply(request_id, [(0, 0, ['x' * 200])])
+    assert session.lines == lines
+    assert session.request_id == request_id
+
+
+def test_store_expires_and_bounds_sessions():
+    clock = FakeClock()
+    store = SessionStore(max_sessions=2, max_chars=10_000, ttl_seconds=60, clock=clock)
+    first = store.create(DOCUMENT, 10_000)
+    second = store.create(DOCUMENT, 10_000)
+    clock.now += 30
+    assert store.get(first.session_id) is first
+
+    store.create(DOCUMENT, 10_000)
+    assert store.get(second.session_id) is None
+    clock.now += 61
+    assert store.get(first.session_id) is None
+    assert store.stats() == {'sessions': 0, 'chars': 0}
+
+
+def test_store_evicts_by_total_characters():
+    store = SessionStore(max_chars=len(DOCUMENT) * 2)
+    sessions = [store.create(DOCUMENT, 10_000) for _ in range(3)]
+
+    assert store.get(sessions[0].session_id) is None
+    assert store.stats() == {'sessions': 2, 'chars': len(DOCUMENT) * 2}
+
+
+def test_session_api_round_trip():
+    client = TestClient(main.app)
+    created = client.post('/parse/sessions', json={'content': DOCUMENT})
+    assert created.status_code == 201
+    body = created.json()
+    assert [line['line'] for line in body['lines']] == [1, 2, 4]
+    session_url = f"/parse/sessions/{body['session_id']}"
+
+    patch = {
+        'base_request_id': body['request_id'],
+        'edits': [{'start': 3, 'delete': 1, 'insert': ['Tea 2 kg Rs. 900']}, {'start': 0, 'delete': 1}],
+    }
+    edited = client.patch(session_url, json=patch)
+    assert edited.status_code == 200
+    lines = edited.json()['lines']
+    assert [(line['line'], line['items'][0]['product_name']) for line in lines] == [(2, 'Tea')]
+    assert edited.json()['line_count'] == 4
+
+    stale = client.patch(session_url, json=patch)
+    assert stale.status_code == 409
+    assert stale.headers['x-request-id'] == edited.json()['request_id']
+
+    assert client.get(session_url).json()['request_id'] == edited.json()['request_id']
+    assert client.delete(session_url).status_code == 204
+    assert client.get(session_url).status_code == 404
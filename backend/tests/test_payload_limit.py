@@ -0,0 +1,61 @@
+import asyncio
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.middleware.payload_limit import PayloadLimitMiddleware
+
+
+def _app(**limits):
+    app = FastAPI()
+    app.add_middleware(PayloadLimitMiddleware, **limits)
+
+    @app.post('/echo')
+    async def echo(request: Request):
+        return {'size': len(await request.body())}
+
+    @app.post('/upload')
+    async def upload(request: Request):
+        return {'size': len(await request.body())}
+
+    return app
+
+
+def _chunks(count, size=1000):
+    for _ in range(count):
+        yield b'x' * size
+
+
+def test_declared_and_streamed_bodies_over_limit_are_rejected():
+    client = TestClient(_app(max_bytes=5000, route_limits={'/upload': 20_000}))
+
+    assert client.post('/echo', content=b'x' * 5000).json() == {'size': 5000}
+    assert client.post('/echo', content=b'x' * 5001).status_code == 413
+    # Chunked bodies carry no Content-Length and are counted as they arrive.
+    response = client.post('/echo', content=_chunks(8))
+    assert response.status_code == 413
+    assert response.json()['detail'] == 'Payload too large. Maximum allowed is 5000 bytes.'
+    assert client.post('/upload', content=_chunks(8)).json() == {'size': 8000}
+
+
+def test_streamed_body_is_aborted_at_the_limit():
+    pulled = []
+
+    async def receive():
+        pulled.append(1)
+        return {'type': 'http.request', 'body': b'x' * 1000, 'more_body': len(pulled) < 100}
+
+    async def app(scope, receive, send):
+        while (await receive()).get('more_body'):
+            pass
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'path': '/echo', 'headers': [], 'method': 'POST'}
+    asyncio.run(PayloadLimitMiddleware(app, max_bytes=2500)(scope, receive, send))
+
+    assert len(pulled) == 3
+    assert sent[0]['status'] == 413
@@ -0,0 +1,70 @@
+import io
+
+from PIL import Image, ImageDraw
+
+from app.services import ocr
+from app.services.preprocess import PreprocessConfig, estimate_skew, otsu_threshold, preprocess_image
+
+
+def _jpeg(size, orientation=None, dpi=None) -> Image.Image:
+    image = Image.new('RGB', size, 'white')
+    ImageDraw.Draw(image).rectangle((10, 10, 200, 40), fill='black')
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    options = {'dpi': dpi} if dpi else {}
+    image.save(buffer, format='JPEG', exif=exif.tobytes(), **options)
+    return Image.open(io.BytesIO(buffer.getvalue()))
+
+
+def _lines(angle: float) -> Image.Image:
+    image = Image.new('L', (600, 400), 255)
+    draw = ImageDraw.Draw(image)
+    for y in range(40, 360, 30):
+        draw.rectangle((40, y, 560, y + 8), fill=0)
+    return image.rotate(angle, Image.Resampling.BICUBIC, fillcolor=255)
+
+
+def test_phone_photo_is_transposed_gray_and_downscaled():
+    image, timings = preprocess_image(_jpeg((4000, 3000), orientation=6, dpi=(72, 72)), PreprocessConfig())
+    assert image.mode == 'L'
+    assert image.size == (2475, 3300)
+    assert set(timings) == {'decode', 'exif', 'grayscale', 'downscale'}
+
+
+def test_high_dpi_scan_is_scaled_to_target_dpi():
+    image, _ = preprocess_image(_jpeg((1200, 800), dpi=(600, 600)), PreprocessConfig())
+    assert image.size == (600, 400)
+
+
+def test_disabled_preprocessing_keeps_image():
+    image, timings = preprocess_image(_jpeg((4000, 3000)), PreprocessConfig(enabled=False))
+    assert image.size == (4000, 3000)
+    assert image.mode == 'RGB'
+    assert set(timings) == {'decode'}
+
+
+def test_deskew_and_binarize():
+    assert abs(estimate_skew(_lines(3.0)) + 3.0) <= 0.5
+    assert estimate_skew(_lines(0.0)) == 0.0
+
+    image, timings = preprocess_image(_lines(-2.0), PreprocessConfig(deskew=True, binarize=True))
+    assert set(image.getdata()) <= {0, 255}
+    assert 'deskew' in timings and 'binarize' in timings
+
+
+def test_otsu_threshold_splits_bimodal_histogram():
+    image = Image.new('L', (100, 100), 30)
+    image.paste(220, (50, 0, 100, 100))
+    assert 30 <= otsu_threshold(image) < 220
+
+
+def test_preprocessing_settings_change_ocr_cache_key(monkeypatch):
+    class FakeEngine:
+        name = 'fake'
+
+    monkeypatch.setattr(ocr, '_engine', FakeEngine())
+    default_key = ocr.ocr_settings_key()
+    monkeypatch.setattr(ocr, '_preprocess_config', PreprocessConfig(binarize=True))
+    assert ocr.ocr_settings_key() != default_key
@@ -0,0 +1,96 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.services.rate_limit_store import FileRateLimitStore, GCRARateLimiter, MemoryRateLimitStore
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_refills_at_rate():
+    clock = Clock()
+    limiter = GCRARateLimiter(60, burst=3, clock=clock)
+
+    decisions = [limiter.hit('1.1.1.1') for _ in range(4)]
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert [d.remaining for d in decisions] == [2, 1, 0, 0]
+    assert decisions[-1].retry_after == 1.0
+
+    clock.now += 1.0
+    assert limiter.hit('1.1.1.1').allowed
+    assert not limiter.hit('1.1.1.1').allowed
+    assert limiter.hit('2.2.2.2').allowed
+
+
+def test_memory_store_stays_bounded_for_one_million_ips():
+    clock = Clock()
+    store = MemoryRateLimitStore(max_clients=1_000_000)
+    limiter = GCRARateLimiter(120, store=store, clock=clock)
+    peak = 0
+    for i in range(1_000_000):
+        clock.now += 1e-5
+        limiter.hit(f'10.{i >> 16}.{(i >> 8) & 255}.{i & 255}')
+        if i % 4096 == 0:
+            peak = max(peak, len(store))
+    # Only clients seen within the last interval (0.5 s = 50k requests) are still limited.
+    assert peak <= 110_000
+    assert store.evictions >= 850_000
+
+    capped = MemoryRateLimitStore(max_clients=10_000)
+    limiter = GCRARateLimiter(120, store=capped, clock=Clock())
+    for i in range(100_000):
+        limiter.hit(f'ip-{i}')
+    assert len(capped) <= 10_000
+
+
+def test_memory_store_evicts_a_bounded_batch_per_update():
+    store = MemoryRateLimitStore(max_clients=1_000, evict_batch=4)
+    for i in range(100):
+        store.update(f'ip-{i}', lambda tat: (1.0, None), now=0.0)
+    assert len(store) == 100
+
+    store.update('late', lambda tat: (10.0, None), now=5.0)
+    assert (len(store), store.evictions) == (97, 4)
+    store.update('late', lambda tat: (10.0, None), now=5.0)
+    assert list(store._tats)[:2] == ['ip-8', 'ip-9']
+
+
+def test_file_store_is_shared_between_workers(tmp_path):
+    clock = Clock()
+    path = tmp_path / 'rate-limit.bin'
+    worker_a = GCRARateLimiter(60, burst=2, store=FileRateLimitStore(path, slots=64), clock=clock)
+    worker_b = GCRARateLimiter(60, burst=2, store=FileRateLimitStore(path, slots=64), clock=clock)
+
+    assert worker_a.hit('1.1.1.1').allowed
+    assert worker_b.hit('1.1.1.1').allowed
+    assert not worker_a.hit('1.1.1.1').allowed
+    assert path.stat().st_size == 64 * 16
+
+    for i in range(1000):
+        worker_b.hit(f'ip-{i}')
+    assert path.stat().st_size == 64 * 16
+
+
+def test_middleware_sets_headers_and_retry_after():
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, requests_per_minute=60, burst=2)
+
+    @app.get('/ping')
+    def ping():
+        return {'ok': True}
+
+    client = TestClient(app)
+    first = client.get('/ping')
+    assert first.headers['x-ratelimit-limit'] == '2'
+    assert first.headers['x-ratelimit-remaining'] == '1'
+    client.get('/ping')
+    limited = client.get('/ping')
+    assert limited.status_code == 429
+    assert limited.headers['retry-after'] == '1'
+    assert limited.headers['x-ratelimit-remaining'] == '0'
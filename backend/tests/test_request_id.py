@@ -0,0 +1,54 @@
+import subprocess
+import sys
+
+from app.parser import extract_items
+from app.schemas import ParsedItem
+from app.services.request_id import RequestIdHasher
+from conftest import ROOT
+
+CONTENT = "Sugar – Rs. 6,000 (50 kg)\nWheat Flour (10kg @ 950)"
+
+HASH_IN_SUBPROCESS = """
+from app.parser import extract_items
+from app.services.request_id import RequestIdHasher
+hasher = RequestIdHasher("parse")
+hasher.add_value(CONTENT)
+hasher.add_texts(None)
+hasher.add_result(0, extract_items(CONTENT))
+print(hasher.hexdigest())
+"""
+
+
+def _parse_id(content, contents, results) -> str:
+    hasher = RequestIdHasher("parse")
+    hasher.add_value(content)
+    hasher.add_texts(contents)
+    for index, items in enumerate(results):
+        hasher.add_result(index, items)
+    return hasher.hexdigest()
+
+
+def test_request_id_is_stable_across_processes():
+    local = _parse_id(CONTENT, None, [extract_items(CONTENT)])
+    script = f"CONTENT = {CONTENT!r}\n" + HASH_IN_SUBPROCESS
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+        env={"PYTHONHASHSEED": "123"},
+    )
+    assert output.stdout.strip() == local
+
+
+def test_parsed_lines_and_response_items_hash_identically():
+    parsed = extract_items(CONTENT)
+    items = [ParsedItem(**item.to_dict()) for item in parsed]
+    assert _parse_id(CONTENT, None, [parsed]) == _parse_id(CONTENT, None, [items])
+
+
+def test_encoding_distinguishes_ambiguous_inputs():
+    assert _parse_id(None, [], []) != _parse_id(None, None, [])
+    assert _parse_id(None, ["ab", "c"], [[], []]) != _parse_id(None, ["a", "bc"], [[], []])
+    assert _parse_id(None, ["a", "b"], [[], []]) != _parse_id(None, ["a", "b"], [[]])
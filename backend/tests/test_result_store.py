@@ -0,0 +1,144 @@
+from io import BytesIO
+
+import pytest
+from fastapi.testclient import TestClient
+from openpyxl import load_workbook
+
+import app.main as main
+from app.services.result_store import MemoryResultStore, SQLiteResultStore
+from app.services.serialize import dump_json
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _results(index):
+    return [{'input_index': index, 'items': [{'product_name': 'Sugar', 'raw_line': 'Sugar', 'confidence': 0.5}]}]
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_store(request, tmp_path):
+    stores = []
+
+    def factory(**kwargs):
+        if request.param == 'memory':
+            store = MemoryResultStore(**kwargs)
+        else:
+            store = SQLiteResultStore(tmp_path / 'results.db', **kwargs)
+        stores.append(store)
+        return store
+
+    yield factory
+    for store in stores:
+        if isinstance(store, SQLiteResultStore):
+            store.close()
+
+
+def test_store_round_trips_and_expires(make_store):
+    clock = FakeClock()
+    store = make_store(max_entries=10, ttl_seconds=60, clock=clock)
+    store.put('a', _results(0))
+    assert store.get('a') == _results(0)
+    assert store.get('missing') is None
+    assert 'a' in store and 'missing' not in store
+
+    clock.now += 61
+    assert store.get('a') is None
+    assert 'a' not in store
+
+
+def test_store_evicts_oldest_beyond_cap(make_store):
+    clock = FakeClock()
+    store = make_store(max_entries=2, ttl_seconds=0, clock=clock)
+    for index, key in enumerate(['a', 'b', 'c']):
+        clock.now += 1
+        store.put(key, _results(index))
+
+    assert store.get('a') is None
+    assert store.get('b') == _results(1)
+    assert store.get('c') == _results(2)
+    assert len(store) == 2
+
+
+def test_memory_store_evicts_oldest_beyond_byte_budget():
+    size = len(dump_json(_results(0)))
+    store = MemoryResultStore(max_entries=10, ttl_seconds=0, max_bytes=size * 2)
+    for key in ['a', 'b', 'c']:
+        store.put(key, _results(0))
+
+    assert [store.get(key) is not None for key in ['a', 'b', 'c']] == [False, True, True]
+    store.put('huge', _results(0) * 3)
+    assert store.get('huge') is None
+    assert len(store) == 2
+
+
+def test_sqlite_store_is_shared_across_instances(tmp_path):
+    path = tmp_path / 'results.db'
+    writer = SQLiteResultStore(path)
+    reader = SQLiteResultStore(path)
+    writer.put('a', _results(0))
+    assert reader.get('a') == _results(0)
+    writer.close()
+    reader.close()
+
+
+def test_export_by_request_id(monkeypatch):
+    monkeypatch.setattr(main, 'result_store', MemoryResultStore())
+    client = TestClient(main.app)
+
+    parsed = client.post('/parse', json={'contents': ['Sugar – Rs. 6,000 (50 kg)', 'Rice – Rs. 1,200 (10 kg)']})
+    request_id = parsed.json()['request_id']
+
+    response = client.get(f'/export/{request_id}.xlsx')
+    assert response.status_code == 200
+    assert f'filename={request_id}.xlsx' in response.headers['content-disposition']
+    rows = list(load_workbook(BytesIO(response.content))['parsed_items'].iter_rows(values_only=True))
+    assert [row[0] for row in rows[1:]] == [0, 1]
+    assert rows[1][1] == parsed.json()['results'][0]['items'][0]['product_name']
+
+    assert client.get('/export/unknown.xlsx').status_code == 404
+
+
+def test_parse_cache_hit_restores_the_rendered_results(monkeypatch):
+    client = TestClient(main.app)
+    body = {'contents': ['Sugar – Rs. 6,000 (50 kg)', 'Naïve Rice – Rs. 1,200 (10 kg)']}
+    first = client.post('/parse', json=body).json()
+    store = MemoryResultStore()
+    monkeypatch.setattr(main, 'result_store', store)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('a cache hit must not decode or re-render the body')
+
+    monkeypatch.setattr(store, 'get', fail)
+    monkeypatch.setattr(store, 'put', fail)
+    assert client.post('/parse', json=body).json() == first
+
+    assert MemoryResultStore.get(store, first['request_id']) == first['results']
+
+
+def test_streamed_parse_is_exportable(monkeypatch):
+    monkeypatch.setattr(main, 'result_store', MemoryResultStore())
+    client = TestClient(main.app)
+
+    lines = client.post('/parse/stream', json={'content': 'Sugar 50 kg'}).text.splitlines()
+    request_id = main.ParseStreamTrailer.model_validate_json(lines[-1]).request_id
+
+    assert client.get(f'/export/{request_id}.xlsx').status_code == 200
+
+
+def test_stream_too_large_for_the_store_is_not_kept(monkeypatch):
+    monkeypatch.setattr(main, 'result_store', MemoryResultStore(max_bytes=600))
+    client = TestClient(main.app)
+    content = 'Sugar – Rs. 6,000 (50 kg)'
+
+    small = client.post('/parse/stream', json={'content': content}).text.splitlines()
+    large = client.post('/parse/stream', json={'contents': [content] * 5}).text.splitlines()
+
+    assert main.result_store.get(main.ParseStreamTrailer.model_validate_json(small[-1]).request_id) is not None
+    assert main.result_store.get(main.ParseStreamTrailer.model_validate_json(large[-1]).request_id) is None
+    assert len(large) == 6
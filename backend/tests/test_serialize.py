@@ -0,0 +1,39 @@
+import pickle
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.parser import extract_items
+from app.schemas import ParsedItem, ParseResponse, ParseResult
+from app.services.serialize import dump_json, result_payload
+from benchmarks.corpus import build_documents
+
+
+def test_direct_rendering_matches_pydantic_json():
+    for index, document in enumerate(build_documents(30)):
+        parsed = extract_items(document)
+        validated = ParseResult(
+            input_index=index,
+            items=[ParsedItem(**item.to_dict()) for item in parsed],
+        )
+        assert dump_json(result_payload(index, parsed)) == validated.model_dump_json()
+
+
+def test_non_finite_floats_render_as_null_like_pydantic():
+    item = extract_items("Sugar – Rs. 6,000 (50 kg)")[0]._replace(price=float('inf'), quantity=float('nan'))
+    payload = result_payload(0, [item])
+    validated = ParseResult(input_index=0, items=[ParsedItem(**item.to_dict())])
+    assert dump_json(payload) == validated.model_dump_json()
+
+
+def test_parse_response_body_is_valid_response_model_json():
+    client = TestClient(app)
+    response = client.post('/parse', json={'contents': build_documents(3)})
+    model = ParseResponse.model_validate_json(response.content)
+    assert response.content == model.model_dump_json().encode()
+
+
+def test_parsed_line_is_compact_and_picklable():
+    item = extract_items("Sugar – Rs. 6,000 (50 kg)")[0]
+    assert not hasattr(item, '__dict__')
+    assert pickle.loads(pickle.dumps(item)) == item
@@ -0,0 +1,145 @@
+import io
+import itertools
+import json
+import random
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parser import extractor
+from app.parser.extractor import (
+    LINE_TOO_LONG,
+    TIME_BUDGET_EXCEEDED,
+    BatchExtractor,
+    ExtractionLimits,
+    ItemStream,
+    LineSplitter,
+    configure_extraction_limits,
+    extract_items,
+    get_extraction_limits,
+    iter_items,
+    split_candidate_lines,
+)
+from app.services.request_id import RequestIdHasher
+
+LINES = [
+    'Sugar – Rs. 6,000 (50 kg)',
+    'Rice - Rs. 3000 (25 kg); Milk: Qty 2 l Price 200/l',
+    'Invoice # INV-1001',
+    'Cooking Oil 5 ltr @ 850',
+    '',
+    '   Flour 10 kg Rs 1,200   ',
+]
+TEXT = '\r\n'.join(LINES * 40) + '\nTea 2 kg Rs. 900'
+
+
+def random_chunks(text, seed):
+    rng = random.Random(seed)
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 40)
+        yield text[position:position + size]
+        position += size
+
+
+def test_splitter_matches_whole_text_for_any_chunking():
+    expected = split_candidate_lines(TEXT)
+    for seed in range(20):
+        splitter = LineSplitter()
+        lines = []
+        for chunk in random_chunks(TEXT, seed):
+            lines.extend(splitter.feed(chunk))
+        lines.extend(splitter.close())
+        assert lines == expected
+
+
+def test_splitter_handles_crlf_split_across_chunks():
+    splitter = LineSplitter()
+    assert splitter.feed('Tea 2 kg Rs. 900\r') == ['Tea 2 kg Rs. 900']
+    assert splitter.feed('\nSalt 1 kg Rs. 50') == []
+    assert splitter.close() == ['Salt 1 kg Rs. 50']
+
+
+def test_iter_items_reads_file_like_objects_and_chunk_iterables():
+    expected = extract_items(TEXT)
+    assert expected
+
+    assert list(iter_items(io.StringIO(TEXT), chunk_size=7)) == expected
+    assert list(iter_items(random_chunks(TEXT, 1))) == expected
+
+
+def test_iter_items_is_lazy():
+    chunks = iter(['Sugar – Rs. 6,000 (50 kg)\n', 'Tea 2 kg Rs. 900\n'])
+    items = iter_items(chunks)
+
+    assert next(items).product_name == 'Sugar'
+    assert next(chunks) == 'Tea 2 kg Rs. 900\n'
+
+
+def test_iter_items_streams_past_the_document_budget(monkeypatch):
+    expected = len(list(ItemStream(budget=0).feed(TEXT))) + 1  # the unterminated 'Tea' line
+    previous = get_extraction_limits()
+    configure_extraction_limits(ExtractionLimits(document_budget=5))
+    ticks = itertools.count()
+    monkeypatch.setattr(extractor.time, 'thread_time', lambda: float(next(ticks)))
+    try:
+        assert BatchExtractor().extract(TEXT)[1][TIME_BUDGET_EXCEEDED] > 0
+        assert len(list(iter_items(io.StringIO(TEXT), chunk_size=64))) == expected
+    finally:
+        configure_extraction_limits(previous)
+
+
+def test_overlong_raw_line_is_dropped_with_warning():
+    stream = ItemStream()
+    splitter_limit = stream._splitter.max_raw_line_chars
+    items = stream.feed('Tea 2 kg Rs. 900\n')
+    for _ in range(splitter_limit // 1000 + 1):
+        items += stream.feed('x' * 1000)
+    items += stream.feed('\nSalt 1 kg Rs. 50')
+    items += stream.close()
+
+    assert [item.product_name for item in items] == ['Tea', 'Salt']
+    assert stream.warnings == {LINE_TOO_LONG: 1}
+
+
+def test_streamed_hash_matches_add_result():
+    items = extract_items(TEXT)
+    whole = RequestIdHasher('upload')
+    whole.add_result(0, items)
+    streamed = RequestIdHasher('upload')
+    streamed.begin_result(0)
+    for item in items:
+        streamed.add_item(item)
+    streamed.end_result()
+
+    assert streamed.hexdigest() == whole.hexdigest()
+
+
+def test_upload_streams_items_and_trailer():
+    body = TEXT.encode('utf-8')
+    client = TestClient(main.app)
+
+    def chunks():
+        for position in range(0, len(body), 333):
+            yield body[position:position + 333]
+
+    response = client.post('/parse/upload', content=chunks())
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+
+    *items, trailer = [json.loads(line) for line in response.text.splitlines()]
+    assert items == [item.to_dict() for item in extract_items(TEXT)]
+    assert trailer['item_count'] == len(items)
+    assert trailer['warnings'] == []
+
+    again = client.post('/parse/upload', content=body)
+    assert again.text.splitlines()[-1] == response.text.splitlines()[-1]
+
+
+def test_upload_accepts_bodies_above_the_default_payload_limit():
+    body = ('Tea 2 kg Rs. 900\n' * 20_000).encode('utf-8')
+    assert len(body) > 200_000
+
+    response = TestClient(main.app).post('/parse/upload', content=body)
+    assert response.status_code == 200
+    assert json.loads(response.text.splitlines()[-1])['item_count'] == 20_000
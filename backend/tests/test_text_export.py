@@ -0,0 +1,96 @@
+import csv
+import gzip
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.services.excel import HEADERS
+from app.services.result_store import MemoryResultStore
+from app.services.text_export import accepts_gzip, gzip_chunks, iter_csv_chunks, iter_ndjson_chunks
+
+RESULTS = [
+    {
+        'input_index': index,
+        'items': [
+            {
+                'product_name': 'Sugar, white',
+                'quantity': 50.0,
+                'unit': 'kg',
+                'price': 6000.0 + index,
+                'price_type': 'total',
+                'derived_unit_price': 120.0,
+                'raw_line': 'Sugar, white – Rs. 6,000 (50 kg)',
+                'confidence': 1.0,
+            },
+            {'product_name': 'Rice', 'raw_line': 'Rice', 'confidence': 0.3},
+        ],
+    }
+    for index in range(200)
+]
+
+
+def test_csv_chunks_follow_headers_and_quote_fields():
+    chunks = list(iter_csv_chunks(RESULTS, chunk_size=1024))
+    assert len(chunks) > 1
+
+    rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+    assert rows[0] == HEADERS
+    assert rows[1] == ['0', 'Sugar, white', '50.0', 'kg', '6000.0', 'total', '120.0', 'Sugar, white – Rs. 6,000 (50 kg)', '1.0']
+    assert rows[2] == ['0', 'Rice', '', '', '', '', '', 'Rice', '0.3']
+    assert len(rows) == 1 + 2 * len(RESULTS)
+
+
+def test_ndjson_chunks_are_one_object_per_item():
+    lines = b''.join(iter_ndjson_chunks(RESULTS, chunk_size=1024)).decode('utf-8').splitlines()
+    assert len(lines) == 2 * len(RESULTS)
+    first = json.loads(lines[0])
+    assert list(first) == HEADERS
+    assert first['price'] == 6000.0
+    assert json.loads(lines[1])['quantity'] is None
+
+
+def test_gzip_chunks_round_trip():
+    body = b''.join(iter_csv_chunks(RESULTS))
+    assert gzip.decompress(b''.join(gzip_chunks(iter_csv_chunks(RESULTS)))) == body
+
+
+def test_accepts_gzip():
+    assert accepts_gzip('gzip, deflate, br')
+    assert accepts_gzip('br;q=1.0, gzip;q=0.5')
+    assert accepts_gzip('*')
+    assert not accepts_gzip('gzip;q=0')
+    assert not accepts_gzip('identity')
+    assert not accepts_gzip(None)
+
+
+def test_export_endpoints_stream_and_compress(monkeypatch):
+    monkeypatch.setattr(main, 'result_store', MemoryResultStore())
+    client = TestClient(main.app)
+
+    plain = client.post('/export/csv', json={'results': RESULTS[:2]}, headers={'Accept-Encoding': 'identity'})
+    assert plain.status_code == 200
+    assert plain.headers['content-type'].startswith('text/csv')
+    assert 'content-encoding' not in plain.headers
+
+    compressed = client.post('/export/csv', json={'results': RESULTS[:2]}, headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['content-encoding'] == 'gzip'
+    assert compressed.content == plain.content
+
+    ndjson = client.post('/export/ndjson', json={'results': RESULTS[:2]})
+    assert ndjson.headers['content-type'] == 'application/x-ndjson'
+    assert len(ndjson.text.splitlines()) == 4
+
+
+def test_stored_results_export_as_csv_and_ndjson(monkeypatch):
+    monkeypatch.setattr(main, 'result_store', MemoryResultStore())
+    client = TestClient(main.app)
+
+    request_id = client.post('/parse', json={'content': 'Sugar – Rs. 6,000 (50 kg)'}).json()['request_id']
+
+    rows = list(csv.reader(io.StringIO(client.get(f'/export/{request_id}.csv').text)))
+    assert rows[0] == HEADERS
+    assert rows[1][1] == 'Sugar'
+    assert json.loads(client.get(f'/export/{request_id}.ndjson').text)['product_name'] == 'Sugar'
+    assert client.get('/export/unknown.csv').status_code == 404
@@ -1,5 +1,12 @@
 import { useMemo, useRef, useState } from 'react'
-import { exportResultsXlsx, parseInvoice, parseInvoiceImage } from './api'
+import {
+  editParseSession,
+  exportResultsXlsx,
+  lineEdit,
+  openParseSession,
+  parseInvoiceImage,
+  parseInvoiceStream,
+} from './api'
 import PasteBox from './components/PasteBox'
 import ResultsTable from './components/ResultsTable'
 
@@ -8,6 +15,9 @@ Sugar – Rs. 6,000 (50 kg)
 Wheat Flour (10kg @ 950)
 Cooking Oil: Qty 5 bottles Price 1200/bottle`
 
+// Pause after the last keystroke before edits are sent to the parse session.
+const LIVE_EDIT_DELAY_MS = 300
+
 export default function App() {
   const [content, setContent] = useState(sample)
   const [results, setResults] = useState([])
@@ -17,6 +27,11 @@ export default function App() {
   const [error, setError] = useState('')
   const [ocrText, setOcrText] = useState('')
   const controllerRef = useRef(null)
+  // Live editing: { id, requestId, text, lineItems } of the server-side parse session.
+  const sessionRef = useRef(null)
+  const liveRef = useRef(false)
+  const editTimerRef = useRef(null)
+  const syncRef = useRef(Promise.resolve())
 
   const canCopy = results.length > 0
 
@@ -30,10 +45,19 @@ export default function App() {
     setLoading(true)
     setError('')
     setOcrText('')
+    setResults([])
+    clearTimeout(editTimerRef.current)
+    sessionRef.current = null
+    liveRef.current = false
 
     try {
-      const data = await parseInvoice(content, controller.signal)
-      setResults(data.results || [])
+      // Rows render as soon as each streamed result arrives.
+      await parseInvoiceStream(
+        content,
+        (result) => setResults((prev) => [...prev, result]),
+        controller.signal,
+      )
+      liveRef.current = true
     } catch (err) {
       setError(err.message || 'Failed to parse')
     } finally {
@@ -41,6 +65,48 @@ export default function App() {
     }
   }
 
+  // Sends only the changed lines; the session re-parses just those and returns them.
+  async function syncSession(text) {
+    let session = sessionRef.current
+    let data
+    if (!session) {
+      data = await openParseSession(text)
+      session = { id: data.session_id, text, lineItems: new Array(data.line_count).fill([]) }
+    } else {
+      const edit = lineEdit(session.text, text)
+      if (!edit) return
+      try {
+        data = await editParseSession(session.id, session.requestId, [edit])
+      } catch (err) {
+        // Expired session (404) or edits out of step with it (409): start a new one.
+        if (err.status !== 404 && err.status !== 409) throw err
+        sessionRef.current = null
+        return syncSession(text)
+      }
+      session.lineItems.splice(edit.start, edit.delete, ...edit.insert.map(() => []))
+      session.text = text
+    }
+    session.requestId = data.request_id
+    data.lines.forEach(({ line, items }) => {
+      session.lineItems[line] = items
+    })
+    sessionRef.current = session
+    if (liveRef.current) setResults([{ input_index: 0, items: session.lineItems.flat() }])
+  }
+
+  function handleContentChange(value) {
+    setContent(value)
+    if (!liveRef.current) return
+    clearTimeout(editTimerRef.current)
+    editTimerRef.current = setTimeout(() => {
+      // Chained so each edit is diffed against the text the session last accepted.
+      syncRef.current = syncRef.current
+        .then(() => syncSession(value))
+        .then(() => setError(''))
+        .catch((err) => setError(err.message || 'Failed to update parse'))
+    }, LIVE_EDIT_DELAY_MS)
+  }
+
   async function runImageParse() {
     if (!selectedImage) return
 
@@ -50,6 +116,8 @@ export default function App() {
 
     setLoading(true)
     setError('')
+    clearTimeout(editTimerRef.current)
+    liveRef.current = false
 
     try {
       const data = await parseInvoiceImage(selectedImage, controller.signal)
@@ -117,7 +185,7 @@ export default function App() {
 
       <PasteBox
         value={content}
-        onChange={setContent}
+        onChange={handleContentChange}
         onSubmit={runParse}
         onImageSelect={setSelectedImage}
         onImageSubmit={runImageParse}
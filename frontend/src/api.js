@@ -1,10 +1,55 @@
 const API_BASE = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000'
 
-export async function parseInvoice(content, signal) {
-  const response = await fetch(`${API_BASE}/parse`, {
+export async function parseInvoiceStream(contents, onResult, signal) {
+  const response = await fetch(`${API_BASE}/parse/stream`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ content }),
+    body: JSON.stringify(Array.isArray(contents) ? { contents } : { content: contents }),
+    signal,
+  })
+
+  if (!response.ok) {
+    const data = await response.json().catch(() => ({}))
+    const message = data?.detail || `Request failed with ${response.status}`
+    const error = new Error(message)
+    error.status = response.status
+    throw error
+  }
+
+  // Each NDJSON line is one ParseResult; the final line is the request-id trailer.
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  let trailer = null
+
+  const handleLine = (line) => {
+    if (!line.trim()) return
+    const record = JSON.parse(line)
+    if ('request_id' in record) {
+      trailer = record
+    } else {
+      onResult(record)
+    }
+  }
+
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    const lines = buffer.split('\n')
+    buffer = lines.pop()
+    lines.forEach(handleLine)
+  }
+  handleLine(buffer + decoder.decode())
+
+  return trailer
+}
+
+async function sessionRequest(path, method, body, signal) {
+  const response = await fetch(`${API_BASE}${path}`, {
+    method,
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
     signal,
   })
 
@@ -19,6 +64,38 @@ export async function parseInvoice(content, signal) {
   return response.json()
 }
 
+export function openParseSession(content, signal) {
+  return sessionRequest('/parse/sessions', 'POST', { content }, signal)
+}
+
+// Sends the edits made since `baseRequestId`; a 409 error means the session must be re-opened or re-fetched.
+export function editParseSession(sessionId, baseRequestId, edits, signal) {
+  return sessionRequest(
+    `/parse/sessions/${sessionId}`,
+    'PATCH',
+    { base_request_id: baseRequestId, edits },
+    signal,
+  )
+}
+
+// One line splice turning `previous` into `next` (common leading and trailing lines kept), or null if equal.
+export function lineEdit(previous, next) {
+  const before = previous.split(/\r\n|\r|\n/)
+  const after = next.split(/\r\n|\r|\n/)
+  let start = 0
+  while (start < before.length && start < after.length && before[start] === after[start]) start += 1
+  let end = 0
+  while (
+    end < before.length - start &&
+    end < after.length - start &&
+    before[before.length - 1 - end] === after[after.length - 1 - end]
+  ) {
+    end += 1
+  }
+  if (start === before.length && start === after.length) return null
+  return { start, delete: before.length - start - end, insert: after.slice(start, after.length - end) }
+}
+
 export async function parseInvoiceImage(file, signal) {
   const formData = new FormData()
   formData.append('file', file)